@@ -0,0 +1,84 @@
+"""
+Microbenchmark of the transfer size and decode time of MQL server responses.
+
+Compares the size of a representative `mqlQuery` status response with and
+without gzip compression, and the time taken by each installed JSON library
+to decode it.
+
+Usage:
+    python benchmarks/bench_json_decode.py [--points 1000] [--repeat 200]
+"""
+import argparse
+import gzip
+import json
+import timeit
+
+from prefect_transform.serialization import JSON_LIBRARIES, get_json_decoder
+
+
+def build_status_payload(points: int) -> bytes:
+    """
+    Build a `GetMqlQueriesStatus` response carrying the SQL, warnings and
+    `points` result series of a materialization query.
+    """
+    sql = " UNION ALL ".join(
+        f"SELECT ds, metric_{i} FROM schema.table_{i} WHERE ds >= '2022-01-01'"
+        for i in range(50)
+    )
+    mql_query = {
+        "status": "SUCCESSFUL",
+        "error": None,
+        "sql": sql,
+        "resultSource": "METRICFLOW",
+        "resultPrimaryTimeGranularity": "DAY",
+        "result": [
+            {"value": i * 1.5, "pctChange": 0.01 * i, "delta": float(i)}
+            for i in range(points)
+        ],
+        "chartValueMin": 0.0,
+        "chartValueMax": points * 1.5,
+        "warnings": ["Query results were truncated"] * 3,
+    }
+    return json.dumps({"data": {"q0": mql_query}}).encode("utf-8")
+
+
+def main() -> None:
+    """
+    Run the benchmark and print its results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = build_status_payload(args.points)
+    compressed = gzip.compress(payload, compresslevel=5)
+
+    print(f"payload: {len(payload):>10,} bytes")
+    print(
+        f"gzip:    {len(compressed):>10,} bytes "
+        f"({len(compressed) / len(payload):.1%} of payload)"
+    )
+    print()
+
+    timings = {}
+    for library in JSON_LIBRARIES[1:]:
+        try:
+            decoder = get_json_decoder(library)
+        except ImportError:
+            print(f"{library:<8} not installed")
+            continue
+        seconds = min(
+            timeit.repeat(lambda: decoder(payload), number=args.repeat, repeat=5)
+        )
+        timings[library] = seconds / args.repeat * 1e6
+
+    for library, per_call in timings.items():
+        print(
+            f"{library:<8} {per_call:>10.1f} us/decode "
+            f"({timings['json'] / per_call:.1f}x json)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Benchmark suite of materialization throughput and latency.
+
+Runs against a local `FakeMQLServer`, so the real MQL client, pooled
+transport and polling loop are measured without a Transform account:
+- `create_materialization` throughput, waiting for the creation (sync) or
+  not (async), at several concurrency levels.
+- Latency of `TransformCredentials.get_client` followed by a first status
+  request, through a new pooled session (cold) or a reused one (warm).
+- CPU time spent by the polling loop of `wait_for_completion` per poll.
+- Import time of `prefect_transform.tasks`, with and without dependencies.
+
+Results are printed and can be written as JSON with `--output`; `--save-baseline`
+replaces the committed baseline compared against by `check_regressions.py`.
+
+The reference environment is the `ubuntu-latest` runner with Python 3.10 of
+the Benchmarks workflow, which records `baseline.json` with `--save-baseline`
+when run manually and uploads it as the `baseline` artifact, to be committed.
+On pull requests, that workflow benchmarks the base branch and the pull
+request on the same runner and compares them with `check_regressions.py`.
+
+Usage:
+    python benchmarks/bench_materializations.py [--quick] [--output results.json]
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from prefect import flow
+from prefect.settings import PREFECT_LOGGING_LEVEL, temporary_settings
+
+from prefect_transform.credentials import TransformCredentials
+from prefect_transform.fake_server import FakeMQLServer
+from prefect_transform.instrumentation import PhaseTimer
+from prefect_transform.queries import (
+    STATUS_ONLY_FIELDS,
+    get_status,
+    submit_materializations,
+    wait_for_completion,
+)
+from prefect_transform.tasks import create_materialization
+from prefect_transform.transport import close_pooled_sessions
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+CONCURRENCY_LEVELS = (1, 4, 16)
+
+# fixed server behaviour, so that runs are comparable
+SERVER_SETTINGS = {"run_latency": 0.05, "request_latency": 0.001, "seed": 0}
+
+
+def _metric(value: float, unit: str, higher_is_better: bool) -> Dict[str, Any]:
+    """
+    Describe a measured value.
+    """
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+@flow(name="bench-create-materialization")
+def _materialize_concurrently(
+    credentials: TransformCredentials,
+    count: int,
+    concurrency: int,
+    wait_for_creation: bool,
+) -> float:
+    """
+    Run `count` materializations from `concurrency` threads,
+    and return the seconds taken.
+    """
+    # threads do not inherit the context of the flow run
+    context = contextvars.copy_context()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        futures = [
+            pool.submit(
+                context.copy().run,
+                create_materialization.fn,
+                credentials=credentials,
+                materialization_name=f"mt_{index % 10}",
+                wait_for_creation=wait_for_creation,
+                return_mode="compact",
+            )
+            for index in range(count)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - started
+
+
+def bench_throughput(
+    credentials: TransformCredentials,
+    count: int,
+    concurrency: int,
+    wait_for_creation: bool,
+) -> float:
+    """
+    Run `count` materializations from `concurrency` threads of one flow run,
+    and return the number of materializations per second.
+    """
+    seconds = _materialize_concurrently(
+        credentials, count, concurrency, wait_for_creation
+    )
+    return count / seconds
+
+
+def bench_get_client(
+    credentials: TransformCredentials, query_id: str, repeat: int, cold: bool
+) -> float:
+    """
+    Return the median seconds taken by `get_client` and a first status
+    request for `query_id` through the client. If `cold`, the pooled
+    sessions are closed before each call, so the request opens a new
+    connection; otherwise it reuses the connection of the previous one.
+    """
+    # open the pooled session, so that the first warm call reuses it
+    get_status(credentials.get_client(), query_id, fields=STATUS_ONLY_FIELDS)
+    durations = []
+    for _ in range(repeat):
+        if cold:
+            close_pooled_sessions()
+        started = time.perf_counter()
+        mql_client = credentials.get_client()
+        get_status(mql_client, query_id, fields=STATUS_ONLY_FIELDS)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+
+def bench_poll_cpu(config_dir: str, seconds: float) -> float:
+    """
+    Poll a materialization running for `seconds` on a dedicated fake server
+    as fast as possible, and return the CPU seconds spent by the polling
+    thread per poll.
+    """
+    settings = {**SERVER_SETTINGS, "run_latency": seconds}
+    with FakeMQLServer(**settings) as server:
+        server.write_transform_config(config_dir)
+        credentials = TransformCredentials(
+            api_key="tfdk-bench-key", mql_server_url=server.url
+        )
+        mql_client = credentials.get_client()
+        (query_id,) = submit_materializations(
+            mql_client, [{"materializationName": "mt_0"}]
+        )
+        timer = PhaseTimer()
+        started = time.thread_time()
+        wait_for_completion(
+            mql_client,
+            query_id,
+            poll_interval=0.001,
+            max_poll_interval=0.001,
+            timer=timer,
+        )
+        return (time.thread_time() - started) / timer.counts["polls"]
+
+
+def bench_import(repeat: int) -> Dict[str, float]:
+    """
+    Return the smallest seconds taken to import `prefect_transform.tasks`
+    in a new interpreter, including its dependencies (`total`) or only
+    the modules of this collection (`own`).
+    """
+    pattern = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+    totals, owns = [], []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                "import prefect_transform.tasks",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total = own = 0
+        for line in process.stderr.splitlines():
+            match = pattern.match(line)
+            if match is None:
+                continue
+            own_us, cumulative_us, indent, module = match.groups()
+            if module.startswith("prefect_transform"):
+                own += int(own_us)
+            if module == "prefect_transform.tasks":
+                total = int(cumulative_us)
+        totals.append(total / 1e6)
+        owns.append(own / 1e6)
+    return {"total": min(totals), "own": min(owns)}
+
+
+def _run_server_benchmarks(
+    config_dir: str, count: int, repeat: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the throughput and `get_client` benchmarks against a fake server.
+    """
+    metrics = {}
+    with FakeMQLServer(**SERVER_SETTINGS) as server:
+        server.write_transform_config(config_dir)
+        credentials = TransformCredentials(
+            api_key="tfdk-bench-key", mql_server_url=server.url
+        )
+        for wait_for_creation, mode in ((True, "sync"), (False, "async")):
+            for concurrency in CONCURRENCY_LEVELS:
+                throughput = bench_throughput(
+                    credentials, count, concurrency, wait_for_creation
+                )
+                name = f"create_materialization.{mode}.c{concurrency}.throughput"
+                metrics[name] = _metric(throughput, "ops/s", higher_is_better=True)
+
+        (query_id,) = submit_materializations(
+            credentials.get_client(), [{"materializationName": "mt_0"}]
+        )
+        for cold, state in ((True, "cold"), (False, "warm")):
+            seconds = bench_get_client(credentials, query_id, repeat, cold)
+            metrics[f"get_client.{state}.latency"] = _metric(seconds, "s", False)
+    return metrics
+
+
+@contextlib.contextmanager
+def _transform_config_dir() -> Iterator[str]:
+    """
+    Point the Transform configuration to a temporary directory,
+    restoring the previous `TFD_CONFIG_DIR` on exit.
+    """
+    previous = os.environ.get("TFD_CONFIG_DIR")
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.environ["TFD_CONFIG_DIR"] = config_dir
+        try:
+            yield config_dir
+        finally:
+            if previous is None:
+                del os.environ["TFD_CONFIG_DIR"]
+            else:
+                os.environ["TFD_CONFIG_DIR"] = previous
+
+
+def run_suite(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Run every benchmark against a new fake MQL server.
+
+    Args:
+        quick: Whether to run fewer iterations, for a fast but noisier run.
+
+    Returns:
+        The measured values, keyed by metric name.
+    """
+    count = 8 if quick else 32
+    repeat = 3 if quick else 10
+    metrics = {}
+
+    # flow runs reset the log levels to the logging settings
+    with temporary_settings({PREFECT_LOGGING_LEVEL: "WARNING"}):
+        with _transform_config_dir() as config_dir:
+            metrics.update(_run_server_benchmarks(config_dir, count, repeat))
+            cpu = bench_poll_cpu(config_dir, seconds=0.5 if quick else 2.0)
+            metrics["wait_for_completion.cpu_per_poll"] = _metric(cpu, "s", False)
+
+    for scope, seconds in bench_import(repeat).items():
+        metrics[f"import.{scope}"] = _metric(seconds, "s", False)
+    return metrics
+
+
+def environment() -> Dict[str, str]:
+    """
+    Describe the machine running the benchmarks.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def format_metrics(metrics: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Render measured values as aligned lines.
+    """
+    width = max(len(name) for name in metrics)
+    return [
+        f"{name:<{width}} {metric['value']:>14.6g} {metric['unit']}"
+        for name, metric in metrics.items()
+    ]
+
+
+def build_results(
+    metrics: Dict[str, Dict[str, Any]], quick: bool = False
+) -> Dict[str, Any]:
+    """
+    Gather measured values with the environment and whether the run was quick.
+    """
+    return {"environment": environment(), "quick": quick, "metrics": metrics}
+
+
+def write_results(path: Path, results: Dict[str, Any]) -> None:
+    """
+    Write results built by `build_results` to a JSON file.
+    """
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+
+def main() -> None:
+    """
+    Run the benchmark suite and print its results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"Replace the baseline in {BASELINE_PATH.name}",
+    )
+    args = parser.parse_args()
+    if args.quick and args.save_baseline:
+        parser.error("--save-baseline records full runs only")
+
+    metrics = run_suite(args.quick)
+    print("\n".join(format_metrics(metrics)))
+    results = build_results(metrics, args.quick)
+    if args.output is not None:
+        write_results(args.output, results)
+    if args.save_baseline:
+        write_results(BASELINE_PATH, results)
+
+
+if __name__ == "__main__":
+    main()
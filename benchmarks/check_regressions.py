@@ -0,0 +1,272 @@
+"""
+Performance regression gate comparing benchmark results with the baseline.
+
+Runs the benchmark suite of `bench_materializations.py`, or reads results
+written by its `--output` option, and compares each metric with the committed
+`baseline.json`. A metric regresses when its relative change from the
+baseline, `current / baseline - 1`, is worse than its tolerance in the
+direction of the metric, a tolerance set in `tolerances.json` by metric name
+or `fnmatch` pattern, and defaulting to `--tolerance`. Metrics missing from
+the results also fail the gate.
+
+Results of `--quick` runs are only compared with a baseline recorded by a
+quick run, e.g. passed with `--baseline`. Results measured on a machine with
+another number of CPUs or Python version than the baseline are refused,
+unless `--ignore-environment` is set.
+
+Prints a table of the changes and exits with status 1 on regressions. The
+Benchmarks workflow runs the gate on pull requests, with the results of the
+base branch, measured on the same runner, passed as `--baseline`.
+
+Usage:
+    python benchmarks/check_regressions.py [--results results.json]
+        [--quick --baseline quick_baseline.json]
+"""
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+TOLERANCES_PATH = Path(__file__).with_name("tolerances.json")
+
+DEFAULT_TOLERANCE = 0.2
+
+QUICK_MISMATCH = (
+    "Cannot compare quick and full benchmark runs: "
+    "pass a baseline recorded by a quick run with --baseline"
+)
+
+
+class Comparison(NamedTuple):
+    """
+    Comparison of a metric with its baseline.
+    """
+
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    unit: str
+    tolerance: float
+    status: str
+
+    @property
+    def change(self) -> Optional[float]:
+        """
+        Relative change from the baseline, if both values are known.
+        """
+        if self.baseline is None or self.current is None or not self.baseline:
+            return None
+        return self.current / self.baseline - 1
+
+
+def get_tolerance(
+    metric: str, tolerances: Dict[str, float], default: float = DEFAULT_TOLERANCE
+) -> float:
+    """
+    Return the tolerance of a metric: its own, else the one of the longest
+    matching pattern, else `default`.
+    """
+    if metric in tolerances:
+        return tolerances[metric]
+    patterns = [p for p in tolerances if fnmatch.fnmatchcase(metric, p)]
+    if not patterns:
+        return default
+    return tolerances[max(patterns, key=len)]
+
+
+def environment_mismatches(
+    baseline: Dict[str, str], current: Dict[str, str]
+) -> List[str]:
+    """
+    Describe how the environment of the results differs from the one of the
+    baseline, by number of CPUs and Python minor version.
+    """
+    mismatches = []
+    if baseline.get("cpus") != current.get("cpus"):
+        mismatches.append(
+            f"cpus: {baseline.get('cpus')} in the baseline, "
+            f"{current.get('cpus')} in the results"
+        )
+    baseline_python = baseline.get("python", "").split(".")[:2]
+    current_python = current.get("python", "").split(".")[:2]
+    if baseline_python != current_python:
+        mismatches.append(
+            f"python: {baseline.get('python')} in the baseline, "
+            f"{current.get('python')} in the results"
+        )
+    return mismatches
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    results: Dict[str, Dict[str, Any]],
+    tolerances: Dict[str, float],
+    default_tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Comparison]:
+    """
+    Compare benchmark results with the baseline, metric by metric.
+
+    A metric regresses when its relative change from the baseline is below
+    minus its tolerance if higher is better, or above its tolerance if lower
+    is better, and improves beyond its tolerance the other way.
+
+    Returns:
+        The `Comparison` of every metric of the baseline or the results,
+            with the status `ok`, `improved`, `regressed`, `missing` or `new`.
+    """
+    comparisons = []
+    for metric in sorted(set(baseline) | set(results)):
+        expected = baseline.get(metric)
+        measured = results.get(metric)
+        description = expected or measured
+        tolerance = get_tolerance(metric, tolerances, default_tolerance)
+
+        if expected is None:
+            status = "new"
+        elif measured is None:
+            status = "missing"
+        else:
+            if expected["value"]:
+                change = measured["value"] / expected["value"] - 1
+            else:
+                change = float("inf") if measured["value"] else 0.0
+            # `change` is positive when the metric improved
+            if not description["higher_is_better"]:
+                change = -change
+            if change < -tolerance:
+                status = "regressed"
+            elif change > tolerance:
+                status = "improved"
+            else:
+                status = "ok"
+
+        comparisons.append(
+            Comparison(
+                metric=metric,
+                baseline=None if expected is None else expected["value"],
+                current=None if measured is None else measured["value"],
+                unit=description["unit"],
+                tolerance=tolerance,
+                status=status,
+            )
+        )
+    return comparisons
+
+
+def _format_number(value: Optional[float]) -> str:
+    """
+    Render a measured value, if any.
+    """
+    return "-" if value is None else f"{value:.4g}"
+
+
+def format_table(comparisons: List[Comparison]) -> str:
+    """
+    Render comparisons as a plain text table.
+    """
+    rows = [("metric", "baseline", "current", "unit", "change", "tolerance", "status")]
+    for c in comparisons:
+        change = "-" if c.change is None else f"{c.change:+.1%}"
+        status = c.status.upper() if c.status in ("regressed", "missing") else c.status
+        rows.append(
+            (
+                c.metric,
+                _format_number(c.baseline),
+                _format_number(c.current),
+                c.unit,
+                change,
+                f"±{c.tolerance:.0%}",
+                status,
+            )
+        )
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = []
+    for index, row in enumerate(rows):
+        cells = [
+            cell.ljust(width) if i in (0, 3, 6) else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ]
+        lines.append("  ".join(cells).rstrip())
+        if index == 0:
+            lines.append("  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def _read_results(path: Path) -> Dict[str, Any]:
+    """
+    Read a results or baseline file.
+    """
+    return json.loads(path.read_text())
+
+
+def main() -> None:
+    """
+    Run the regression gate, exiting with status 1 on regressions.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--results", type=Path, help="Results to check instead of running the suite"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerances", type=Path, default=TOLERANCES_PATH)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Relative tolerance of the metrics missing from the tolerances file",
+    )
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--output", type=Path, help="Write the results to a file")
+    parser.add_argument(
+        "--ignore-environment",
+        action="store_true",
+        help="Compare results measured in another environment than the baseline",
+    )
+    args = parser.parse_args()
+
+    baseline = _read_results(args.baseline)
+    if args.results is not None:
+        results = _read_results(args.results)
+    else:
+        # imported here: the suite imports Prefect and the collection
+        from bench_materializations import build_results, run_suite, write_results
+
+        if args.quick != baseline.get("quick", False):
+            parser.error(QUICK_MISMATCH)
+        results = build_results(run_suite(args.quick), args.quick)
+        if args.output is not None:
+            write_results(args.output, results)
+
+    if results.get("quick", False) != baseline.get("quick", False):
+        parser.error(QUICK_MISMATCH)
+    mismatches = environment_mismatches(
+        baseline.get("environment", {}), results.get("environment", {})
+    )
+    if mismatches:
+        message = "Environment differs from the baseline: " + "; ".join(mismatches)
+        if not args.ignore_environment:
+            parser.error(f"{message} (see --ignore-environment)")
+        print(f"Warning: {message}", file=sys.stderr)
+
+    tolerances = {}
+    if args.tolerances.exists():
+        tolerances = json.loads(args.tolerances.read_text())
+    comparisons = compare(
+        baseline["metrics"], results["metrics"], tolerances, args.tolerance
+    )
+    print(format_table(comparisons))
+
+    failures = [c for c in comparisons if c.status in ("regressed", "missing")]
+    if failures:
+        print(f"\n{len(failures)} metric(s) regressed beyond their tolerance")
+        sys.exit(1)
+    print("\nNo regression")
+
+
+if __name__ == "__main__":
+    main()
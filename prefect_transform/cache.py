@@ -0,0 +1,248 @@
+"""Local on-disk cache of metric query results"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+from prefect.settings import PREFECT_HOME
+
+from prefect_transform.columnar import read_ipc_file, require_pyarrow
+from prefect_transform.instrumentation import publish_cache_lookup
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+_ENTRY_SUFFIX = ".arrow"
+_PARTIAL_SUFFIX = ".partial"
+
+
+def query_cache_key(mql_server_url: str, **query: Any) -> str:
+    """
+    Compute the canonical hash of a metric query.
+
+    Args:
+        mql_server_url: The URL of the MQL server the query runs against.
+        **query: The arguments of the query, e.g. `metrics`, `dimensions`,
+            `where`, `time_constraint` or `model_key_id`. Arguments set to
+            `None` or to an empty list are ignored.
+
+    Returns:
+        The hexadecimal SHA-256 digest of the canonical JSON representation
+            of the query.
+    """
+    canonical = {
+        name: value for name, value in query.items() if value not in (None, [])
+    }
+    canonical["mql_server_url"] = mql_server_url
+    document = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+class QueryResultCache:
+    """
+    Cache of metric query results stored as Arrow IPC files in a local
+    directory, with a time-to-live and a least-recently-used eviction
+    policy bounding the size of the directory.
+
+    Entries are written to a temporary file that is atomically renamed
+    once complete, and stale or vanished files are treated as misses,
+    so several worker processes can share the same directory.
+    The last access time of each file records its use for LRU eviction.
+
+    Args:
+        directory: The directory holding the cached results.
+            Defaults to `$PREFECT_HOME/transform/query-cache`.
+        ttl: The number of seconds a result stays valid after being cached;
+            `None` keeps results until they are evicted. Defaults to one hour.
+        max_size: The maximum number of bytes of the cached results;
+            `None` disables size-based eviction. Defaults to 1 GiB.
+
+    Raises:
+        `ImportError` if `pyarrow` is not installed.
+
+    Example:
+        Cache the result of a metrics query for 10 minutes
+        ```python
+        from prefect import flow
+        from prefect_transform.cache import QueryResultCache
+        from prefect_transform.credentials import TransformCredentials
+        from prefect_transform.tasks import query_metrics
+
+
+        @flow
+        def revenue_report():
+            df = query_metrics(
+                credentials=TransformCredentials.load("BLOCK_NAME"),
+                metrics=["revenue"],
+                cache=QueryResultCache(ttl=600),
+            )
+        ```
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = 3600,
+        max_size: Optional[int] = 1 << 30,
+    ) -> None:
+        """
+        Initialize the cache; see the class docstring for the arguments.
+        """
+        require_pyarrow()
+
+        if directory is None:
+            directory = PREFECT_HOME.value() / "transform" / "query-cache"
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_size = max_size
+
+    def _path(self, key: str) -> Path:
+        """
+        Path of the file holding the entry `key`.
+        """
+        return self.directory / f"{key}{_ENTRY_SUFFIX}"
+
+    def _is_expired(self, stat: os.stat_result, now: float) -> bool:
+        """
+        Whether an entry, whose file modification time is its creation
+        time, has outlived the time-to-live.
+        """
+        return self.ttl is not None and now - stat.st_mtime > self.ttl
+
+    def get(self, key: str) -> Optional["pa.Table"]:
+        """
+        Retrieve a cached result.
+
+        Args:
+            key: The key of the result, see `query_cache_key`.
+
+        Returns:
+            The result as a memory-mapped `pyarrow.Table`, or `None` if it is
+                not cached or has expired.
+        """
+        table = self._read(key)
+        publish_cache_lookup("query_result", table is not None)
+        return table
+
+    def _read(self, key: str) -> Optional["pa.Table"]:
+        """
+        Read the entry `key`, recording its use, unless it has expired.
+        """
+        path = self._path(key)
+        now = time.time()
+        try:
+            stat = path.stat()
+            if self._is_expired(stat, now):
+                path.unlink()
+                return None
+            os.utime(path, (now, stat.st_mtime))
+            return read_ipc_file(str(path))
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def put(self, key: str, table: "pa.Table") -> None:
+        """
+        Cache a result.
+
+        Args:
+            key: The key of the result, see `query_cache_key`.
+            table: The result.
+        """
+        for _ in self.write_through(key, [table]):
+            pass
+
+    def write_through(
+        self, key: str, tables: Iterable["pa.Table"]
+    ) -> Iterator["pa.Table"]:
+        """
+        Cache a result while streaming it: each table is appended to the
+        entry as it is yielded, and the entry only becomes visible once
+        `tables` is exhausted. Results left partially consumed are not cached.
+
+        Args:
+            key: The key of the result, see `query_cache_key`.
+            tables: The tables holding the rows of the result; they must
+                share the same schema.
+
+        Yields:
+            The tables of `tables`.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(dir=self.directory, suffix=_PARTIAL_SUFFIX)
+        writer = None
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                for table in tables:
+                    if writer is None:
+                        writer = pa.ipc.new_file(sink, table.schema)
+                    writer.write_table(table)
+                    yield table
+                if writer is not None:
+                    writer.close()
+            if writer is not None:
+                os.replace(partial_path, self._path(key))
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        self.evict()
+
+    def _entries(self) -> List[os.DirEntry]:
+        """
+        List the files of the cache directory.
+        """
+        try:
+            return list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+
+    def evict(self) -> None:
+        """
+        Remove expired results, then the least recently used results until
+        the cache fits within `max_size`. Partial files abandoned by crashed
+        writers for more than a day are removed as well.
+        """
+        now = time.time()
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+                if entry.name.endswith(_PARTIAL_SUFFIX):
+                    if now - stat.st_mtime > 86400:
+                        os.remove(entry.path)
+                elif entry.name.endswith(_ENTRY_SUFFIX):
+                    if self._is_expired(stat, now):
+                        os.remove(entry.path)
+                    else:
+                        entries.append((stat.st_atime, stat.st_size, entry.path))
+            except OSError:
+                # removed, or still mapped on platforms locking open files
+                continue
+
+        if self.max_size is None:
+            return
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+
+    def clear(self) -> None:
+        """
+        Remove every cached result.
+        """
+        for entry in self._entries():
+            if entry.name.endswith(_ENTRY_SUFFIX):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    continue
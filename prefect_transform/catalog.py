@@ -0,0 +1,299 @@
+"""Cached catalog of the metrics and materializations of a Transform model"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from gql.transport.exceptions import TransportError
+from transform import MQLClient
+
+from prefect_transform.instrumentation import publish_cache_lookup
+from prefect_transform.queries import get_catalog_data
+
+_CatalogKey = Tuple[str, Optional[int]]
+
+_catalogs: Dict[_CatalogKey, "Catalog"] = {}
+_catalogs_lock = threading.Lock()
+
+
+class Catalog:
+    """
+    Metrics, dimensions and materializations of a Transform model,
+    indexed for constant-time lookups.
+
+    Args:
+        metrics: The dimensions of each metric, keyed by metric name.
+        materializations: The `metrics`, `dimensions` and `destination_table`
+            of each materialization, keyed by materialization name.
+        version: The commit of the Transform model the catalog describes.
+        loaded_at: The timestamp, in seconds since the epoch, at which the
+            catalog was last loaded or found up to date.
+    """
+
+    __slots__ = (
+        "metrics",
+        "materializations",
+        "version",
+        "loaded_at",
+        "_metrics_by_dimension",
+        "_materializations_by_metric",
+    )
+
+    def __init__(
+        self,
+        metrics: Dict[str, List[str]],
+        materializations: Dict[str, Dict[str, Any]],
+        version: Optional[str] = None,
+        loaded_at: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize the catalog; see the class docstring for the arguments.
+        """
+        self.metrics = metrics
+        self.materializations = materializations
+        self.version = version
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+
+        self._metrics_by_dimension: Dict[str, List[str]] = {}
+        for metric, dimensions in metrics.items():
+            for dimension in dimensions:
+                self._metrics_by_dimension.setdefault(dimension, []).append(metric)
+
+        self._materializations_by_metric: Dict[str, List[str]] = {}
+        for name, materialization in materializations.items():
+            for metric in materialization["metrics"]:
+                self._materializations_by_metric.setdefault(metric, []).append(name)
+
+    def __repr__(self) -> str:
+        """
+        Represent the catalog by its size and version.
+        """
+        return (
+            f"{type(self).__name__}(metrics={len(self.metrics)}, "
+            f"materializations={len(self.materializations)}, "
+            f"version={self.version!r})"
+        )
+
+    @classmethod
+    def from_gql(cls, data: Dict[str, Any], version: Optional[str] = None) -> "Catalog":
+        """
+        Build a catalog from the response to `queries.CATALOG_QUERY`.
+
+        Args:
+            data: The `metrics` and `materializations` GraphQL objects.
+            version: The commit of the Transform model.
+
+        Returns:
+            The `Catalog` of the model.
+        """
+        return cls(
+            metrics={
+                metric["name"]: [d["name"] for d in metric["dimensionObjects"]]
+                for metric in data["metrics"]
+            },
+            materializations={
+                m["name"]: {
+                    "metrics": m["metrics"],
+                    "dimensions": m["dimensions"],
+                    "destination_table": m.get("destinationTable"),
+                }
+                for m in data["materializations"]
+            },
+            version=version,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Represent the catalog as a JSON-serializable dictionary.
+
+        Returns:
+            The arguments of the catalog, keyed by name.
+        """
+        return {
+            "metrics": self.metrics,
+            "materializations": self.materializations,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Catalog":
+        """
+        Build a catalog from the output of `to_dict`.
+
+        Args:
+            data: The arguments of the catalog, keyed by name.
+
+        Returns:
+            The `Catalog`.
+        """
+        return cls(**data)
+
+    def has_metric(self, name: str) -> bool:
+        """
+        Whether the model defines the metric `name`.
+        """
+        return name in self.metrics
+
+    def get_dimensions(self, metric: str) -> List[str]:
+        """
+        Return the dimensions of a metric, or an empty list
+        if the metric is not defined.
+        """
+        return self.metrics.get(metric, [])
+
+    def get_metrics_by_dimension(self, dimension: str) -> List[str]:
+        """
+        Return the metrics that can be grouped by `dimension`.
+        """
+        return self._metrics_by_dimension.get(dimension, [])
+
+    def has_materialization(self, name: str) -> bool:
+        """
+        Whether the model defines the materialization `name`.
+        """
+        return name in self.materializations
+
+    def get_materialization(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the `metrics`, `dimensions` and `destination_table`
+        of a materialization, or `None` if it is not defined.
+        """
+        return self.materializations.get(name)
+
+    def get_materializations_by_metric(self, metric: str) -> List[str]:
+        """
+        Return the names of the materializations computing `metric`.
+        """
+        return self._materializations_by_metric.get(metric, [])
+
+
+def _get_version(mql_client: MQLClient, model_key_id: Optional[int]) -> Optional[str]:
+    """
+    Commit of the Transform model, used to detect catalog changes,
+    or `None` if the MQL server cannot tell it.
+    """
+    try:
+        if model_key_id is None:
+            return mql_client.get_current_model_key().commit
+        return mql_client.get_model_key(model_key_id).commit
+    except (TransportError, requests.RequestException):
+        # the version is an optimization: reload the catalog if it is unknown
+        return None
+
+
+def _cache_path(cache_dir: str, key: _CatalogKey) -> Path:
+    """
+    Path of the file caching the catalog `key` on disk.
+    """
+    digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+    return Path(cache_dir) / f"catalog-{digest}.json"
+
+
+def _read_catalog(path: Path) -> Optional[Catalog]:
+    """
+    Read a catalog cached on disk, if any.
+    """
+    try:
+        return Catalog.from_dict(json.loads(path.read_text()))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_catalog(path: Path, catalog: Catalog) -> None:
+    """
+    Atomically cache a catalog on disk.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, partial_path = tempfile.mkstemp(dir=path.parent, suffix=".partial")
+    with os.fdopen(fd, "w") as f:
+        json.dump(catalog.to_dict(), f)
+    os.replace(partial_path, path)
+
+
+def get_catalog(
+    mql_server_url: str,
+    get_client: Callable[[], MQLClient],
+    model_key_id: Optional[int] = None,
+    ttl: float = 300,
+    cache_dir: Optional[str] = None,
+    refresh: bool = False,
+) -> Catalog:
+    """
+    Return the catalog of a Transform model, loading it from the MQL server
+    only when the cached catalog has expired.
+
+    Catalogs are cached in memory, shared by every caller targeting the same
+    MQL server and model, and optionally on disk, shared across processes.
+    Once expired, the catalog is only reloaded if the commit of the model
+    has changed: otherwise its time-to-live is renewed.
+
+    Args:
+        mql_server_url: The URL of the MQL server.
+        get_client: A function returning the `MQLClient` used to load
+            the catalog; it is only called if the catalog must be refreshed.
+        model_key_id: The unique identifier of the Transform model;
+            `None` targets the current model.
+        ttl: The number of seconds the catalog is used before being refreshed.
+        cache_dir: If set, the directory caching catalogs on disk.
+        refresh: Whether to reload the catalog regardless of its age.
+
+    Returns:
+        The `Catalog` of the model.
+    """
+    key = (mql_server_url, model_key_id)
+    path = None if cache_dir is None else _cache_path(cache_dir, key)
+
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+    if catalog is None and path is not None:
+        catalog = _read_catalog(path)
+
+    now = time.time()
+    if catalog is not None and not refresh and now - catalog.loaded_at <= ttl:
+        with _catalogs_lock:
+            _catalogs.setdefault(key, catalog)
+        publish_cache_lookup("catalog", True)
+        return catalog
+
+    mql_client = get_client()
+    version = _get_version(mql_client, model_key_id)
+    if (
+        catalog is not None
+        and not refresh
+        and version is not None
+        and version == catalog.version
+    ):
+        catalog.loaded_at = now
+        publish_cache_lookup("catalog", True)
+    else:
+        catalog = Catalog.from_gql(
+            get_catalog_data(mql_client, model_key_id), version=version
+        )
+        publish_cache_lookup("catalog", False)
+
+    with _catalogs_lock:
+        _catalogs[key] = catalog
+    if path is not None:
+        _write_catalog(path, catalog)
+    return catalog
+
+
+def cached_catalog_count() -> int:
+    """
+    Return the number of catalogs cached in memory.
+    """
+    return len(_catalogs)
+
+
+def clear_catalogs() -> None:
+    """
+    Drop every catalog cached in memory.
+    """
+    with _catalogs_lock:
+        _catalogs.clear()
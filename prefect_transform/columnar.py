@@ -0,0 +1,342 @@
+"""Conversion of MQL query results to Apache Arrow"""
+import io
+import os
+import tempfile
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TypeVar
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pc = pa_csv = pa_json = pq = None
+
+_TABLE_SCHEMA_TYPES = {
+    "integer": "int64",
+    "number": "float64",
+    "boolean": "bool_",
+    "string": "string",
+}
+
+Frame = TypeVar("Frame")
+
+
+def require_pyarrow() -> None:
+    """
+    Check that `pyarrow` is installed.
+
+    Raises:
+        `ImportError` if `pyarrow` is not installed.
+    """
+    if pa is None:
+        raise ImportError(
+            "pyarrow is required for Arrow results, "
+            "install it with `pip install prefect-transform[arrow]`"
+        )
+
+
+def _cast_column(column, field: dict):
+    """
+    Cast a column decoded from JSON to the type of its Table Schema `field`.
+    """
+    field_type = field.get("type")
+    if field_type == "datetime":
+        column = column.cast(pa.string())
+        if field.get("tz") is None:
+            # pandas < 1.5 writes naive datetimes with a `Z` suffix
+            column = pc.replace_substring_regex(column, pattern="Z$", replacement="")
+        return column.cast(pa.timestamp("ms", tz=field.get("tz")))
+    if field_type in _TABLE_SCHEMA_TYPES:
+        return column.cast(getattr(pa, _TABLE_SCHEMA_TYPES[field_type])())
+    return column
+
+
+def page_to_table(page: bytes):
+    """
+    Decode a page of query result straight into a `pyarrow.Table`,
+    without building an intermediate `DataFrame`.
+    The page is parsed by the JSON reader of Arrow, in native code, and its
+    rows are unpacked into columns without creating Python objects.
+
+    Args:
+        page: The page, as a JSON document in pandas `table` orient.
+
+    Returns:
+        A `pyarrow.Table` holding the rows of the page.
+    """
+    require_pyarrow()
+
+    # the page is a single JSON document: read it as a one-row table
+    document = pa_json.read_json(
+        io.BytesIO(page),
+        read_options=pa_json.ReadOptions(block_size=len(page) + 1),
+        parse_options=pa_json.ParseOptions(newlines_in_values=True),
+    )
+    schema = document.column("schema")[0].as_py()
+    index_columns = set(schema.get("primaryKey") or []) & {"index"}
+    fields = [field for field in schema["fields"] if field["name"] not in index_columns]
+    # list<struct> of the rows, flattened to a struct array of the columns
+    rows = document.column("data").combine_chunks().flatten()
+
+    columns = {}
+    for field in fields:
+        if (
+            pa.types.is_struct(rows.type)
+            and rows.type.get_field_index(field["name"]) >= 0
+        ):
+            column = rows.field(field["name"])
+        else:
+            # key absent from every row, or no row at all
+            column = pa.nulls(len(rows))
+        columns[field["name"]] = _cast_column(column, field)
+    return pa.table(columns)
+
+
+def iter_chunks(
+    frames: Iterable[Frame],
+    chunk_size: int,
+    concat: Callable[[List[Frame]], Frame],
+) -> Iterator[Frame]:
+    """
+    Regroup a stream of `DataFrame` or `pyarrow.Table` objects into objects of
+    `chunk_size` rows; the last one holds the remaining rows.
+
+    Args:
+        frames: The objects to regroup.
+        chunk_size: The number of rows of each chunk.
+        concat: The function concatenating a list of objects into one.
+
+    Yields:
+        Objects of `chunk_size` rows.
+    """
+    buffer = []
+    buffered = 0
+    for frame in frames:
+        while len(frame) > 0:
+            rows = frame[: chunk_size - buffered]
+            frame = frame[len(rows) :]
+            buffer.append(rows)
+            buffered += len(rows)
+            if buffered == chunk_size:
+                yield concat(buffer)
+                buffer = []
+                buffered = 0
+
+    if buffered > 0:
+        yield concat(buffer)
+
+
+def concat_tables(tables: List[Any]):
+    """
+    Concatenate `pyarrow.Table` objects into a single contiguous table.
+
+    Args:
+        tables: The tables to concatenate.
+
+    Returns:
+        A `pyarrow.Table` holding the rows of every table.
+    """
+    return pa.concat_tables(tables).combine_chunks()
+
+
+def tables_to_reader(tables: Iterable[Any]):
+    """
+    Expose a stream of `pyarrow.Table` objects as a `pyarrow.RecordBatchReader`.
+    Tables are pulled from `tables` as batches are read.
+
+    Args:
+        tables: The tables to stream; they must share the same schema.
+
+    Returns:
+        A `pyarrow.RecordBatchReader` over the rows of every table.
+    """
+    require_pyarrow()
+
+    tables = iter(tables)
+    first = next(tables, None)
+    if first is None:
+        return pa.RecordBatchReader.from_batches(pa.schema([]), [])
+
+    def batches():
+        yield from first.to_batches()
+        for table in tables:
+            yield from table.to_batches()
+
+    return pa.RecordBatchReader.from_batches(first.schema, batches())
+
+
+def read_ipc_file(path: str):
+    """
+    Open an Arrow IPC file as a memory-mapped `pyarrow.Table`: its buffers
+    are paged in from disk on access instead of being copied to memory.
+
+    Args:
+        path: The path of the Arrow IPC file.
+
+    Returns:
+        A `pyarrow.Table` backed by the mapped file.
+    """
+    require_pyarrow()
+
+    # the mapping stays open as long as buffers of the table reference it
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+
+def _spill(tables: Iterable[Any], directory: Optional[str] = None):
+    """
+    Write `tables` to a temporary Arrow IPC file and map it back as a table.
+    """
+    fd, path = tempfile.mkstemp(suffix=".arrow", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            writer = None
+            for table in tables:
+                if writer is None:
+                    writer = pa.ipc.new_file(sink, table.schema)
+                writer.write_table(table)
+            writer.close()
+        return read_ipc_file(path)
+    finally:
+        try:
+            # the mapping keeps the data reachable until the table is released
+            os.remove(path)
+        except OSError:
+            # still mapped on platforms locking open files
+            pass
+
+
+def collect_tables(
+    tables: Iterable[Any],
+    spill_threshold: Optional[int] = None,
+    spill_directory: Optional[str] = None,
+):
+    """
+    Concatenate a stream of `pyarrow.Table` objects into a single table.
+    Once the tables read so far exceed `spill_threshold` bytes, they and
+    the remaining ones are streamed to a temporary Arrow IPC file instead,
+    and the result is memory-mapped from that file: memory usage is then
+    bounded by `spill_threshold` and the size of a single table.
+
+    Args:
+        tables: The tables to concatenate; they must share the same schema.
+        spill_threshold: The number of bytes above which tables are spilled
+            to disk; `None` keeps every table in memory.
+        spill_directory: The directory of the temporary file.
+            Defaults to the system temporary directory.
+
+    Returns:
+        A `pyarrow.Table` holding the rows of every table.
+    """
+    buffered = []
+    buffered_size = 0
+    tables = iter(tables)
+    for table in tables:
+        buffered.append(table)
+        buffered_size += table.nbytes
+        if spill_threshold is not None and buffered_size > spill_threshold:
+            return _spill(_drain(buffered, tables), directory=spill_directory)
+
+    return concat_tables(buffered)
+
+
+def _drain(buffered: List[Any], tables: Iterator[Any]) -> Iterator[Any]:
+    """
+    Yield and release the buffered tables, then the remaining ones.
+    """
+    while buffered:
+        yield buffered.pop(0)
+    yield from tables
+
+
+def _conform_table(table: Any, schema: Any):
+    """
+    Cast `table` to `schema`, e.g. its all-null columns to their type.
+    """
+    if table.schema.names != schema.names:
+        raise ValueError(
+            f"Cannot write a table with columns {table.schema.names} "
+            f"after tables with columns {schema.names}"
+        )
+    try:
+        return table.cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(
+            f"Cannot cast a table with schema {table.schema.types} "
+            f"to the schema of the previous tables {schema.types}: {e}"
+        ) from e
+
+
+def conform_tables(tables: Iterable[Any], schema: Any = None) -> Iterator[Any]:
+    """
+    Cast a stream of `pyarrow.Table` objects to a common schema, so that they
+    can be concatenated or written to the same file.
+
+    Args:
+        tables: The tables to cast; they must have the same column names.
+        schema: The `pyarrow.Schema` to cast the tables to. Defaults to
+            the schema of the first table.
+
+    Raises:
+        `ValueError` if a table has other columns than the schema,
+            or a column that cannot be cast to its type.
+
+    Yields:
+        The tables, cast to the schema.
+    """
+    for table in tables:
+        if schema is None:
+            schema = table.schema
+        elif not table.schema.equals(schema):
+            table = _conform_table(table, schema)
+        yield table
+
+
+def write_tables(
+    tables: Iterable[Any], sink: Any, file_format: str, schema: Any = None
+) -> int:
+    """
+    Stream `pyarrow.Table` objects to a Parquet or CSV file, holding a single
+    table in memory at a time. With Parquet, each table becomes a row group.
+    Tables are cast to the schema of the first one, or to `schema`.
+
+    Args:
+        tables: The tables to write; they must have the same column names.
+        sink: The binary file object to write to; it is left open.
+        file_format: `parquet` or `csv`.
+        schema: The `pyarrow.Schema` of the file. Defaults to the schema
+            of the first table; required to write a file without tables.
+
+    Raises:
+        `ValueError` if there is neither a table nor a `schema`,
+            or if a table cannot be cast to the schema of the file.
+
+    Returns:
+        The number of rows written.
+    """
+    require_pyarrow()
+
+    def open_writer(schema):
+        if file_format == "parquet":
+            return pq.ParquetWriter(sink, schema)
+        return pa_csv.CSVWriter(sink, schema)
+
+    writer = None
+    rows = 0
+    for table in conform_tables(tables, schema):
+        if writer is None:
+            writer = open_writer(table.schema)
+        if file_format == "parquet":
+            writer.write_table(table, row_group_size=len(table))
+        else:
+            writer.write_table(table)
+        rows += len(table)
+
+    if writer is None:
+        if schema is None:
+            raise ValueError("Cannot write an empty result without a schema")
+        # a file holding the schema only: CSV header or Parquet metadata
+        writer = open_writer(schema)
+    writer.close()
+    return rows
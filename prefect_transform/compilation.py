@@ -0,0 +1,76 @@
+"""Cache of the SQL compiled by the MQL server for materializations"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from prefect_transform.instrumentation import publish_cache_lookup
+
+MAX_COMPILED_SQL = 256
+
+_ZERO_LIMIT_PATTERN = re.compile(r"\s+LIMIT\s+0\s*;?\s*$", re.IGNORECASE)
+
+_compiled_sql: "OrderedDict[Hashable, str]" = OrderedDict()
+_compiled_sql_lock = threading.Lock()
+
+
+def get_compiled_sql(key: Hashable) -> Optional[str]:
+    """
+    Retrieve cached compiled SQL, marking it as recently used.
+
+    Args:
+        key: The key of the compiled SQL.
+
+    Returns:
+        The compiled SQL, or `None` if it is not cached.
+    """
+    with _compiled_sql_lock:
+        sql = _compiled_sql.get(key)
+        if sql is not None:
+            _compiled_sql.move_to_end(key)
+    publish_cache_lookup("compiled_sql", sql is not None)
+    return sql
+
+
+def put_compiled_sql(key: Hashable, sql: str) -> None:
+    """
+    Cache compiled SQL, evicting the least recently used entries
+    beyond `MAX_COMPILED_SQL` entries.
+
+    Args:
+        key: The key of the compiled SQL.
+        sql: The compiled SQL.
+    """
+    with _compiled_sql_lock:
+        _compiled_sql[key] = sql
+        _compiled_sql.move_to_end(key)
+        while len(_compiled_sql) > MAX_COMPILED_SQL:
+            _compiled_sql.popitem(last=False)
+
+
+def compiled_sql_count() -> int:
+    """
+    Return the number of cached compiled SQL.
+    """
+    return len(_compiled_sql)
+
+
+def clear_compiled_sql() -> None:
+    """
+    Drop every cached compiled SQL.
+    """
+    with _compiled_sql_lock:
+        _compiled_sql.clear()
+
+
+def strip_zero_limit(sql: str) -> str:
+    """
+    Remove the trailing `LIMIT 0` clause of SQL compiled for a zero-row query.
+
+    Args:
+        sql: The compiled SQL.
+
+    Returns:
+        The SQL selecting every row.
+    """
+    return _ZERO_LIMIT_PATTERN.sub("", sql)
@@ -1,10 +1,19 @@
 """Transform credentials block"""
+import logging
+from typing import Optional, Tuple
+
 from prefect.blocks.core import Block
 from pydantic import Field, SecretStr
 from transform import MQLClient
 from transform.exceptions import AuthException, URLException
 
+from prefect_transform.catalog import Catalog, get_catalog
 from prefect_transform.exceptions import TransformAuthException
+from prefect_transform.instrumentation import PhaseTimer, publish_timings, trace_span
+from prefect_transform.profiling import profiling
+from prefect_transform.transport import resolve_timeout, use_pooled_transport
+
+logger = logging.getLogger(__name__)
 
 
 class TransformCredentials(Block):
@@ -14,6 +23,28 @@ class TransformCredentials(Block):
     Args:
         api_key (SecretStr): The API key to use to connect to Transform.
         mql_server_url (str): The URL of the Transform MQL server.
+        reuse_connections (bool): Whether clients share one pooled HTTP
+            transport, reusing TCP connections and TLS sessions across calls.
+        max_connections (int): The maximum number of pooled connections
+            to the MQL server.
+        keep_alive (bool): Whether pooled connections are kept open
+            between requests.
+        connect_timeout (float): The timeout, in seconds, to establish
+            a connection with the MQL server.
+        read_timeout (float): The timeout, in seconds, to wait for
+            a response from the MQL server. Each timeout that is not set
+            defaults to the timeout of the MQL client.
+        compress_requests (bool): Whether request bodies sent through the pooled
+            transport are gzip-compressed. Responses are always decompressed.
+            Ignored, with a warning, unless `reuse_connections` is `True`.
+        json_library (str): The JSON library decoding the responses received
+            through the pooled transport: `orjson`, `msgspec`, `json`, or `auto`
+            to use the fastest installed one. Ignored, with a warning, unless
+            `reuse_connections` is `True`.
+        catalog_ttl (float): The number of seconds the catalog returned by
+            `get_catalog` is cached before being refreshed.
+        catalog_cache_dir (str): If set, the directory caching catalogs on
+            disk, shared across processes.
 
     Example:
         Load stored Transform credentials
@@ -28,11 +59,49 @@ class TransformCredentials(Block):
 
     api_key: SecretStr = Field(..., description="Transform API key")
     mql_server_url: str = Field(..., description="Transform MQL Server URL")
+    reuse_connections: bool = Field(
+        default=True, description="Share one pooled HTTP transport across clients"
+    )
+    max_connections: int = Field(
+        default=10, description="Maximum number of pooled connections"
+    )
+    keep_alive: bool = Field(
+        default=True, description="Keep pooled connections open between requests"
+    )
+    connect_timeout: Optional[float] = Field(
+        default=None, description="Connection timeout, in seconds"
+    )
+    read_timeout: Optional[float] = Field(
+        default=None, description="Read timeout, in seconds"
+    )
+    compress_requests: bool = Field(
+        default=False, description="Gzip-compress request bodies"
+    )
+    json_library: str = Field(
+        default="auto", description="JSON library decoding responses"
+    )
+    catalog_ttl: float = Field(
+        default=300, description="Catalog time-to-live, in seconds"
+    )
+    catalog_cache_dir: Optional[str] = Field(
+        default=None, description="Directory caching catalogs on disk"
+    )
 
     def get_client(self) -> MQLClient:
         """
         Return an MQLClient that can be used to interact with
         Transform server.
+        The client does not write the API key and MQL server URL to the
+        Transform configuration file.
+        When `reuse_connections` is `True`, the client sends its requests
+        through the pooled transport shared by every client
+        targeting the same MQL server.
+        The seconds spent constructing the client (`client`) and configuring
+        its transport (`transport`) are published to the registered
+        metrics sinks as the `get_client` operation, and the construction
+        is traced as a `transform.get_client` OpenTelemetry span, and
+        profiled if the `PREFECT_TRANSFORM_PROFILE` environment variable
+        is set; see `profiling.profiling`.
 
         Returns:
             An `MQLClient` that can be used to interact with Transform server.
@@ -40,8 +109,118 @@ class TransformCredentials(Block):
 
         _api_key = self.api_key.get_secret_value()
 
+        timer = PhaseTimer()
+        tags = {"mql_server_url": self.mql_server_url, "outcome": "failure"}
+        attributes = {"mql_server_url": self.mql_server_url}
         try:
-            return MQLClient(api_key=_api_key, mql_server_url=self.mql_server_url)
+            with profiling("get_client"), trace_span(
+                "transform.get_client", attributes
+            ):
+                with timer.phase("client"):
+                    # concurrent clients would race on the shared config file
+                    mql_client = MQLClient(
+                        api_key=_api_key,
+                        mql_server_url=self.mql_server_url,
+                        override_config=False,
+                    )
+                with timer.phase("transport"):
+                    if self.reuse_connections:
+                        self._use_pooled_transport(mql_client)
+                    else:
+                        self._set_timeouts(mql_client)
+            tags["outcome"] = "success"
         except (AuthException, URLException) as e:
+            tags["exception"] = TransformAuthException.__name__
             msg = f"Cannot connect to Transform server! Error is: {e}"
             raise TransformAuthException(msg) from e
+        finally:
+            publish_timings("get_client", timer.timings, tags)
+
+        return mql_client
+
+    def get_catalog(
+        self, model_key_id: Optional[int] = None, refresh: bool = False
+    ) -> Catalog:
+        """
+        Return the catalog of metrics, dimensions and materializations
+        of a Transform model.
+        The catalog is cached for `catalog_ttl` seconds and shared by every
+        credentials targeting the same MQL server; once expired, it is only
+        reloaded if the model has changed.
+
+        Args:
+            model_key_id: The unique identifier of the Transform model;
+                `None` targets the current model.
+            refresh: Whether to reload the catalog regardless of its age.
+
+        Returns:
+            The `Catalog` of the model.
+
+        Example:
+            Check that a metric exists
+            ```python
+            catalog = TransformCredentials.load("BLOCK_NAME").get_catalog()
+            catalog.has_metric("revenue")
+            ```
+        """
+        return get_catalog(
+            self.mql_server_url,
+            self.get_client,
+            model_key_id=model_key_id,
+            ttl=self.catalog_ttl,
+            cache_dir=self.catalog_cache_dir,
+            refresh=refresh,
+        )
+
+    def _get_timeout(self) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        """
+        The `(connect, read)` timeouts, if either is set.
+        """
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return (self.connect_timeout, self.read_timeout)
+
+    def _use_pooled_transport(self, mql_client: MQLClient) -> None:
+        """
+        Route the requests of `mql_client` to the MQL server through
+        the shared pooled transport.
+        """
+        context = getattr(mql_client, "context", None)
+        if context is None:
+            return
+
+        use_pooled_transport(
+            context.mql_client.gql_client,
+            max_connections=self.max_connections,
+            keep_alive=self.keep_alive,
+            timeout=self._get_timeout(),
+            compress_requests=self.compress_requests,
+            json_library=self.json_library,
+        )
+
+    def _set_timeouts(self, mql_client: MQLClient) -> None:
+        """
+        Apply the timeouts to the own transport of `mql_client`, warning
+        about the options that only apply to the pooled transport.
+        """
+        ignored = [
+            name
+            for name, value in (
+                ("compress_requests", self.compress_requests),
+                ("json_library", self.json_library != "auto"),
+            )
+            if value
+        ]
+        if ignored:
+            logger.warning(
+                "%s only apply when reuse_connections is True", ", ".join(ignored)
+            )
+
+        context = getattr(mql_client, "context", None)
+        timeout = self._get_timeout()
+        if context is None or timeout is None:
+            return
+        transport = context.mql_client.gql_client.transport
+        transport.default_timeout = resolve_timeout(
+            timeout, getattr(transport, "default_timeout", None)
+        )
@@ -0,0 +1,231 @@
+"""Detection of materializations running slower than their history"""
+import logging
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prefect.artifacts import create_markdown_artifact
+from prefect.context import FlowRunContext, TaskRunContext
+
+from prefect_transform.histograms import LatencyHistogramStore
+from prefect_transform.instrumentation import MetricsSink
+
+logger = logging.getLogger(__name__)
+
+
+class SlowMaterialization:
+    """
+    A materialization that ran slower than its historical baseline.
+
+    Args:
+        materialization_name: The name of the materialization.
+        query_id: The ID of the MQL query building the materialization.
+        duration: The number of seconds the materialization took.
+        threshold: The number of seconds above which the materialization
+            is slow.
+        baseline_count: The number of past runs the threshold derives from.
+        timings: The seconds spent in each phase, keyed by phase name.
+        status_history: The statuses of the MQL query, with the number
+            of seconds elapsed when each status was first observed.
+    """
+
+    __slots__ = (
+        "materialization_name",
+        "query_id",
+        "duration",
+        "threshold",
+        "baseline_count",
+        "timings",
+        "status_history",
+    )
+
+    def __init__(
+        self,
+        materialization_name: str,
+        query_id: Optional[str],
+        duration: float,
+        threshold: float,
+        baseline_count: int,
+        timings: Dict[str, float],
+        status_history: List[Tuple[str, float]],
+    ) -> None:
+        """
+        Initialize the record; see the class docstring for the arguments.
+        """
+        self.materialization_name = materialization_name
+        self.query_id = query_id
+        self.duration = duration
+        self.threshold = threshold
+        self.baseline_count = baseline_count
+        self.timings = timings
+        self.status_history = status_history
+
+    def __repr__(self) -> str:
+        """
+        Represent the record by its name, query and durations.
+        """
+        return (
+            f"{type(self).__name__}("
+            f"materialization_name={self.materialization_name!r}, "
+            f"query_id={self.query_id!r}, duration={self.duration:.3f}, "
+            f"threshold={self.threshold:.3f})"
+        )
+
+    def to_markdown(self) -> str:
+        """
+        Render the record as a markdown report.
+
+        Returns:
+            The timing breakdown and status history of the materialization.
+        """
+        lines = [
+            f"# Slow materialization `{self.materialization_name}`",
+            "",
+            f"Query `{self.query_id}` took **{self.duration:.3f}s**, above the "
+            f"threshold of {self.threshold:.3f}s derived from "
+            f"{self.baseline_count} previous runs.",
+            "",
+            "| Phase | Seconds | Share |",
+            "|:---|---:|---:|",
+        ]
+        for phase, seconds in self.timings.items():
+            share = seconds / self.duration if self.duration else 0.0
+            lines.append(f"| {phase} | {seconds:.3f} | {share:.0%} |")
+        if self.status_history:
+            lines += ["", "| Status | Observed after (s) |", "|:---|---:|"]
+            lines += [
+                f"| {status} | {seconds:.3f} |"
+                for status, seconds in self.status_history
+            ]
+        return "\n".join(lines)
+
+
+def _parse_status_history(history: str) -> List[Tuple[str, float]]:
+    """
+    Parse the `status_history` tag of a materialization.
+    """
+    statuses = []
+    for item in filter(None, history.split(",")):
+        status, _, seconds = item.rpartition(":")
+        statuses.append((status, float(seconds)))
+    return statuses
+
+
+class SlowMaterializationDetector(MetricsSink):
+    """
+    Sink flagging materializations whose end-to-end duration exceeds
+    a percentile of their past durations, once enough runs are known.
+
+    Each flagged materialization is published as a Prefect markdown artifact,
+    keyed `slow-materialization-<name>`, with its timing breakdown, status
+    history and query ID, and passed to `callback`, if any.
+    Only successful `sync` runs are checked, as other modes do not wait
+    for the MQL server. The detector records each of them in `store` after
+    checking it, so it must be registered instead of the store.
+
+    Args:
+        store: The `LatencyHistogramStore` holding the past durations;
+            defaults to a store in its default location.
+        percentile: The percentile of the past durations above which
+            a materialization is slow.
+        tolerance: The factor applied to the percentile, e.g. `1.5` only
+            flags materializations 50% slower than the percentile.
+        min_samples: The number of past runs required before flagging
+            a materialization.
+        callback: A function called with each `SlowMaterialization`.
+
+    Example:
+        Alert on slow materializations
+        ```python
+        from prefect_transform.detectors import SlowMaterializationDetector
+        from prefect_transform.instrumentation import register_metrics_sink
+
+        register_metrics_sink(
+            SlowMaterializationDetector(callback=lambda slow: page_on_call(slow))
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        store: Optional[LatencyHistogramStore] = None,
+        percentile: float = 99,
+        tolerance: float = 1.0,
+        min_samples: int = 20,
+        callback: Optional[Callable[[SlowMaterialization], None]] = None,
+    ) -> None:
+        """
+        Initialize the detector; see the class docstring for the arguments.
+        """
+        self.store = store if store is not None else LatencyHistogramStore()
+        self.percentile = percentile
+        self.tolerance = tolerance
+        self.min_samples = min_samples
+        self.callback = callback
+
+    def check(
+        self, materialization_name: str, duration: float
+    ) -> Optional[Tuple[float, int]]:
+        """
+        Compare a duration with the past durations of a materialization.
+
+        Args:
+            materialization_name: The name of the materialization.
+            duration: The end-to-end duration, in seconds.
+
+        Returns:
+            The threshold and the number of past runs if the materialization
+                is slow, `None` otherwise.
+        """
+        histogram = self.store.get_histogram(materialization_name)
+        if histogram is None or histogram.count < self.min_samples:
+            return None
+        threshold = histogram.percentile(self.percentile) * self.tolerance
+        if duration <= threshold:
+            return None
+        return threshold, histogram.count
+
+    def record(
+        self, operation: str, timings: Dict[str, float], tags: Dict[str, str]
+    ) -> None:
+        """
+        Check a materialization created successfully by the MQL server,
+        waiting for its completion (`sync` mode), against its past durations,
+        then add it to them; see `MetricsSink.record`.
+        """
+        if (
+            operation != "create_materialization"
+            or tags.get("mode") != "sync"
+            or tags.get("outcome") != "success"
+        ):
+            return
+
+        name = tags["materialization_name"]
+        duration = sum(timings.values())
+        slow = self.check(name, duration)
+        self.store.record(operation, timings, tags)
+        if slow is None:
+            return
+
+        threshold, baseline_count = slow
+        materialization = SlowMaterialization(
+            materialization_name=name,
+            query_id=tags.get("query_id"),
+            duration=duration,
+            threshold=threshold,
+            baseline_count=baseline_count,
+            timings=dict(timings),
+            status_history=_parse_status_history(tags.get("status_history", "")),
+        )
+        logger.warning("%r is slower than its history", materialization)
+        if TaskRunContext.get() is not None or FlowRunContext.get() is not None:
+            key = re.sub(r"[^a-z0-9-]+", "-", name.lower())
+            try:
+                create_markdown_artifact(
+                    markdown=materialization.to_markdown(),
+                    key=f"slow-materialization-{key}",
+                    description=f"Slow run of materialization {name}",
+                )
+            except Exception:
+                logger.exception("Cannot publish %r as an artifact", materialization)
+        if self.callback is not None:
+            self.callback(materialization)
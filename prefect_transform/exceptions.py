@@ -1,6 +1,7 @@
 """
 Exceptions to be used when interacting with Transform.
 """
+from typing import Dict, List, Optional
 
 
 class TransformRuntimeException(Exception):
@@ -15,3 +16,38 @@ class TransformAuthException(Exception):
     """
     Exception to raise in case of auth issues.
     """
+
+
+class TransformConfigurationException(TransformRuntimeException):
+    """
+    Exception to raise when a Transform task is called with invalid arguments.
+    """
+
+    pass
+
+
+class TransformSubmissionException(TransformRuntimeException):
+    """
+    Exception to raise when the MQL server rejects some materializations
+    of a batched submission.
+
+    Args:
+        msg: The error message.
+        errors: The error of each rejected materialization,
+            keyed by its index in the batch.
+        query_ids: The query ID of each accepted materialization,
+            `None` for the rejected ones.
+    """
+
+    def __init__(
+        self,
+        msg: str,
+        errors: Dict[int, str],
+        query_ids: List[Optional[str]],
+    ) -> None:
+        """
+        Initialize the exception; see the class docstring for the arguments.
+        """
+        super().__init__(msg)
+        self.errors = errors
+        self.query_ids = query_ids
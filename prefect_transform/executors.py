@@ -0,0 +1,178 @@
+"""Executors running the SQL compiled by the MQL server for materializations"""
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover
+    duckdb = None
+
+
+def _quote(identifier: str) -> str:
+    """
+    Quote a SQL identifier.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+class MaterializationExecutor(ABC):
+    """
+    Base class of the executors running the SQL compiled by the MQL server
+    for a materialization, in place of the production warehouse.
+
+    The compiled SQL reads the tables of the warehouse, so the database
+    of the executor must hold tables with the same names.
+
+    Executors only replace the run that writes the table: the live MQL server
+    and warehouse are still required to load the catalog and to retrieve
+    the compiled SQL, via a zero-row query run on the warehouse unless
+    the SQL is cached, or given with the `sql` argument of
+    `create_materialization`, which runs without a Transform deployment.
+    """
+
+    @abstractmethod
+    def execute(self, sql: str, schema: str, table: str) -> int:
+        """
+        Create, or replace, the table `schema.table` with the rows selected
+        by `sql`.
+
+        Args:
+            sql: The `SELECT` statement computing the materialization.
+            schema: The schema of the table.
+            table: The name of the table.
+
+        Returns:
+            The number of rows of the table.
+        """
+
+    def close(self) -> None:
+        """
+        Release the resources held by the executor.
+        """
+
+
+class DuckDBExecutor(MaterializationExecutor):
+    """
+    Executor running materializations in a local DuckDB database.
+
+    Args:
+        database: The path of the database file, or `:memory:` for
+            an in-memory database kept until the executor is closed.
+
+    Raises:
+        `ImportError` if `duckdb` is not installed.
+
+    Example:
+        Materialize into a local DuckDB database
+        ```python
+        executor = DuckDBExecutor("dev.duckdb")
+        create_materialization(
+            credentials=credentials,
+            materialization_name="<name of the materialization>",
+            executor=executor,
+        )
+        ```
+    """
+
+    def __init__(self, database: str = ":memory:") -> None:
+        """
+        Initialize the executor; see the class docstring for the arguments.
+        """
+        if duckdb is None:
+            raise ImportError(
+                "duckdb is required, install it with `pip install duckdb`"
+            )
+        self.database = database
+        self._connection = None
+
+    @property
+    def connection(self) -> Any:
+        """
+        The connection to the database, opened on first use.
+        """
+        if self._connection is None:
+            self._connection = duckdb.connect(self.database)
+        return self._connection
+
+    def execute(self, sql: str, schema: str, table: str) -> int:
+        """
+        Create, or replace, the table `schema.table` with the rows selected
+        by `sql`; see `MaterializationExecutor.execute`.
+        """
+        name = f"{_quote(schema)}.{_quote(table)}"
+        self.connection.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(schema)}")
+        self.connection.execute(f"CREATE OR REPLACE TABLE {name} AS {sql}")
+        return self.connection.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the connection to the database.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class SQLiteExecutor(MaterializationExecutor):
+    """
+    Executor running materializations in a local SQLite database.
+    Schemas other than `main` are attached databases, stored next to
+    the main database file as `<database stem>_<schema>.db`.
+
+    Args:
+        database: The path of the database file, or `:memory:` for
+            an in-memory database kept until the executor is closed.
+    """
+
+    def __init__(self, database: str = ":memory:") -> None:
+        """
+        Initialize the executor; see the class docstring for the arguments.
+        """
+        self.database = database
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The connection to the database, opened on first use.
+        """
+        if self._connection is None:
+            # tasks may run in worker threads, one at a time
+            self._connection = sqlite3.connect(self.database, check_same_thread=False)
+        return self._connection
+
+    def _attach(self, schema: str) -> None:
+        """
+        Attach the database holding `schema` unless it is already attached.
+        """
+        attached = {row[1] for row in self.connection.execute("PRAGMA database_list")}
+        if schema in attached:
+            return
+
+        path = ":memory:"
+        if self.database != ":memory:":
+            main = Path(self.database)
+            path = str(main.with_name(f"{main.stem}_{schema}.db"))
+        self.connection.execute(f"ATTACH DATABASE ? AS {_quote(schema)}", (path,))
+
+    def execute(self, sql: str, schema: str, table: str) -> int:
+        """
+        Create, or replace, the table `schema.table` with the rows selected
+        by `sql`; see `MaterializationExecutor.execute`.
+        """
+        self._attach(schema)
+        name = f"{_quote(schema)}.{_quote(table)}"
+        with self.connection:
+            self.connection.execute(f"DROP TABLE IF EXISTS {name}")
+            self.connection.execute(f"CREATE TABLE {name} AS {sql}")
+        return self.connection.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the connection to the database.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
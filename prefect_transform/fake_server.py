@@ -0,0 +1,870 @@
+"""Local stand-in for the Transform MQL server, for load tests and benchmarks"""
+import argparse
+import base64
+import gzip
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import yaml
+from graphql import FieldNode, build_schema, graphql_sync
+from transform.constants import BACKEND_OVERRIDE_CONFIG_KEY
+
+# returns a latency, in seconds, drawn from the given random generator
+LatencyDistribution = Callable[[random.Random], float]
+
+SCHEMA = """
+    scalar CacheMode
+    scalar LimitInput
+    scalar PercentChange
+    scalar ResultFormat
+    scalar TimeGranularity
+
+    enum TabularOrient {
+        TABLE
+    }
+
+    input ModelKeyInput {
+        organization: Int
+        repo: String
+        branch: String
+        commit: String
+    }
+
+    input MaterializationInput {
+        modelKey: ModelKeyInput
+        materializationName: String!
+        startTime: String
+        endTime: String
+        outputTable: String
+        force: Boolean
+    }
+
+    input MqlQueryInput {
+        modelKey: ModelKeyInput
+        metrics: [String!]
+        groupBy: [String!]
+        whereConstraint: String
+        timeConstraint: String
+        timeGranularity: TimeGranularity
+        order: [String!]
+        limit: LimitInput
+        cacheMode: CacheMode
+        asTable: String
+        addTimeSeries: Boolean
+        resultFormat: ResultFormat
+        pctChange: PercentChange
+        allowDynamicCache: Boolean
+        startTime: String
+        endTime: String
+        trimIncompletePeriods: Boolean
+    }
+
+    type CreatedQuery {
+        id: ID!
+    }
+
+    type ResultSeries {
+        value: Float
+        pctChange: Float
+        delta: Float
+    }
+
+    type TabularPage {
+        nextCursor: Int
+        data: String
+    }
+
+    type MqlQuery {
+        id: ID!
+        status: String!
+        error: String
+        sql: String
+        resultSource: String
+        resultPrimaryTimeGranularity: String
+        result: [ResultSeries!]
+        chartValueMin: Float
+        chartValueMax: Float
+        warnings: [String!]
+        resultTableSchema: String
+        resultTableName: String
+        resultTabular(orient: TabularOrient, cursor: Int): TabularPage
+    }
+
+    type Dimension {
+        name: String!
+    }
+
+    type Metric {
+        name: String!
+        dimensionObjects(modelKey: ModelKeyInput): [Dimension!]!
+    }
+
+    type Materialization {
+        name: String!
+        metrics: [String!]!
+        dimensions: [String!]!
+        destinationTable: String
+    }
+
+    type ModelKey {
+        id: ID!
+        organizationId: Int!
+        gitBranch: String
+        gitCommit: String
+        gitRepo: String
+        createdAt: String
+        isCurrent: Boolean
+    }
+
+    type Organization {
+        id: ID!
+        name: String
+        createdAt: String
+        primaryConfigRepo: String
+        primaryConfigBranch: String
+        currentModel: [ModelKey!]!
+        models(id: ID): [ModelKey!]!
+    }
+
+    type User {
+        id: ID!
+        userName: String
+        email: String
+        mqlServerUrl: String
+        organization: Organization!
+    }
+
+    type Query {
+        mqlQuery(id: ID!): MqlQuery
+        metrics(modelKey: ModelKeyInput): [Metric!]!
+        materializations(modelKey: ModelKeyInput): [Materialization!]!
+        myUser: User!
+        myOrganization: Organization!
+    }
+
+    type Mutation {
+        createMqlMaterializationNew(input: MaterializationInput!): CreatedQuery!
+        createMqlQuery(input: MqlQueryInput!): CreatedQuery!
+    }
+"""
+
+DEFAULT_MATERIALIZATIONS = {
+    f"mt_{index}": {
+        "metrics": ["revenue", "orders"],
+        "dimensions": ["ds", "country"],
+        "destinationTable": f"analytics.mt_{index}",
+    }
+    for index in range(10)
+}
+
+# fields of the `mqlQuery` lookups polling a query
+_STATUS_ONLY_SELECTIONS = {"__typename", "id", "status", "error"}
+
+_MODEL_KEY = {
+    "id": "1",
+    "organizationId": 1,
+    "gitBranch": "main",
+    "gitCommit": "0" * 40,
+    "gitRepo": "transform-config",
+    "createdAt": "2022-01-01T00:00:00",
+    "isCurrent": True,
+}
+
+
+def constant_latency(seconds: float) -> LatencyDistribution:
+    """
+    Latency distribution always returning the same value.
+
+    Args:
+        seconds: The latency, in seconds.
+
+    Returns:
+        The `LatencyDistribution`.
+    """
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyDistribution:
+    """
+    Latency distribution uniform between two values.
+
+    Args:
+        low: The smallest latency, in seconds.
+        high: The largest latency, in seconds.
+
+    Returns:
+        The `LatencyDistribution`.
+    """
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential_latency(mean: float) -> LatencyDistribution:
+    """
+    Exponential latency distribution, e.g. of the time between independent
+    events.
+
+    Args:
+        mean: The mean latency, in seconds.
+
+    Returns:
+        The `LatencyDistribution`.
+    """
+    return lambda rng: rng.expovariate(1 / mean) if mean else 0.0
+
+
+def lognormal_latency(median: float, sigma: float) -> LatencyDistribution:
+    """
+    Log-normal latency distribution, whose long right tail resembles
+    the latencies of real services.
+
+    Args:
+        median: The median latency, in seconds.
+        sigma: The standard deviation of the logarithm of the latency;
+            larger values give longer tails.
+
+    Returns:
+        The `LatencyDistribution`.
+    """
+    return lambda rng: median * rng.lognormvariate(0, sigma)
+
+
+_DISTRIBUTIONS = {
+    "constant": constant_latency,
+    "uniform": uniform_latency,
+    "exponential": exponential_latency,
+    "lognormal": lognormal_latency,
+}
+
+
+def parse_latency(
+    latency: Union[float, str, LatencyDistribution]
+) -> LatencyDistribution:
+    """
+    Build a latency distribution from a number of seconds, a specification
+    such as `uniform:0.1,0.5` or `lognormal:1,0.5`, or a distribution.
+
+    Args:
+        latency: The latency; specifications name a distribution among
+            `constant`, `uniform`, `exponential` and `lognormal`,
+            followed by its arguments.
+
+    Raises:
+        `ValueError` if the specification is invalid.
+
+    Returns:
+        The `LatencyDistribution`.
+    """
+    if callable(latency):
+        return latency
+    if isinstance(latency, (int, float)):
+        return constant_latency(float(latency))
+
+    name, _, arguments = latency.partition(":")
+    if not arguments:
+        try:
+            return constant_latency(float(name))
+        except ValueError:
+            pass
+    try:
+        distribution = _DISTRIBUTIONS[name]
+        return distribution(*(float(value) for value in arguments.split(",")))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(
+            f"Invalid latency {latency!r}, expected seconds or "
+            f"one of {sorted(_DISTRIBUTIONS)} followed by its arguments, "
+            "e.g. 'uniform:0.1,0.5'"
+        )
+
+
+class _FakeQuery:
+    """
+    An MQL query of the fake server, with its scheduled lifecycle.
+    """
+
+    __slots__ = (
+        "query_id",
+        "columns",
+        "sql",
+        "table",
+        "started_at",
+        "completed_at",
+        "error",
+    )
+
+    def __init__(
+        self,
+        query_id: str,
+        columns: List[str],
+        sql: str,
+        table: Optional[str],
+        started_at: float,
+        completed_at: float,
+        error: Optional[str],
+    ) -> None:
+        """
+        Initialize the query.
+        """
+        self.query_id = query_id
+        self.columns = columns
+        self.sql = sql
+        self.table = table
+        self.started_at = started_at
+        self.completed_at = completed_at
+        self.error = error
+
+    def status(self, now: float) -> str:
+        """
+        Status of the query at the monotonic time `now`.
+        """
+        if now < self.started_at:
+            return "PENDING"
+        if now < self.completed_at:
+            return "RUNNING"
+        return "FAILED" if self.error else "SUCCESSFUL"
+
+
+def _selects_status_only(info: Any) -> bool:
+    """
+    Whether the field resolved with `info` only selects the status,
+    and possibly the error, of the query.
+    """
+    names = set()
+    for field_node in info.field_nodes:
+        if field_node.selection_set is None:
+            return False
+        for selection in field_node.selection_set.selections:
+            if not isinstance(selection, FieldNode):
+                return False
+            names.add(selection.name.value)
+    return "status" in names and names <= _STATUS_ONLY_SELECTIONS
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler serving the GraphQL endpoint of a `FakeMQLServer`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately: avoid delayed ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:  # noqa: N802
+        """
+        Execute the GraphQL request in the body.
+        """
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        status, headers, payload = self.server.fake_server.handle(
+            self.path, dict(self.headers), body
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Silence the access log.
+        """
+
+
+class FakeMQLServer:
+    """
+    Local stand-in for the Transform MQL server and backend API, serving
+    the GraphQL operations used by this collection over HTTP: submitting
+    materializations and queries, polling their status, retrieving their
+    tables and results, and loading the catalog and model keys.
+
+    Each submitted query waits `queue_latency` in the queue, then for one of
+    `max_concurrent_queries` workers, staying `PENDING`, then is `RUNNING`
+    for `run_latency` before completing; `failure_rate` of the queries fail.
+    Each HTTP request takes `request_latency` to be answered; `error_rate`
+    of the requests get a `503` response, and requests beyond `rate_limit`
+    per second get a `429` response, both with a `Retry-After` header
+    rounded down to whole seconds, so they are retried by the pooled
+    transport. Completed queries are forgotten after `retention`.
+
+    `stats` counts the HTTP `requests`, the `rate_limited` and `errors`
+    responses, the `submissions` of queries and the `polls` of their
+    status: lookups selecting only the `status` and `error` of a query,
+    but not those fetching its table or results.
+
+    Clients reach the backend API through the `backend_url_override`
+    entry of the Transform configuration written by `write_transform_config`,
+    and need an API key made of three dash-separated parts.
+
+    Args:
+        host: The address to listen on.
+        port: The port to listen on; `0` picks a free port.
+        materializations: The `metrics`, `dimensions` and `destinationTable`
+            of each materialization of the model, keyed by name.
+        request_latency: The latency of each HTTP request.
+        queue_latency: The time each query waits in the queue.
+        run_latency: The time each query runs.
+        failure_rate: The probability of a query to fail.
+        error_rate: The probability of an HTTP request to fail.
+        rate_limit: The maximum number of requests per second, if any.
+        burst: The number of requests allowed at once above `rate_limit`.
+        max_concurrent_queries: The number of queries running at once,
+            if limited.
+        result_rows: The number of rows of each query result.
+        page_size: The number of rows of each page of query result.
+        retention: The number of seconds completed queries are kept,
+            after which their lookups answer an `UNKNOWN` status.
+        api_key: If set, the only API key accepted.
+        seed: The seed of the random generator drawing latencies
+            and failures.
+
+    Latencies are numbers of seconds, specifications such as
+    `lognormal:0.5,0.8` or `LatencyDistribution` functions;
+    see `parse_latency`.
+
+    Example:
+        Materialize against a local server
+        ```python
+        import os
+        from prefect_transform.credentials import TransformCredentials
+        from prefect_transform.fake_server import FakeMQLServer
+
+        with FakeMQLServer(run_latency="lognormal:0.5,0.8") as server:
+            os.environ["TFD_CONFIG_DIR"] = "/tmp/transform"
+            server.write_transform_config("/tmp/transform")
+            credentials = TransformCredentials(
+                api_key="tfdk-fake-key", mql_server_url=server.url
+            )
+            ...
+        ```
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        materializations: Optional[Dict[str, Dict[str, Any]]] = None,
+        request_latency: Union[float, str, LatencyDistribution] = 0.0,
+        queue_latency: Union[float, str, LatencyDistribution] = 0.0,
+        run_latency: Union[float, str, LatencyDistribution] = 0.1,
+        failure_rate: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: int = 10,
+        max_concurrent_queries: Optional[int] = None,
+        result_rows: int = 10,
+        page_size: int = 1000,
+        retention: float = 300.0,
+        api_key: Optional[str] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the server; see the class docstring for the arguments.
+        """
+        self.host = host
+        self.port = port
+        self.materializations = (
+            DEFAULT_MATERIALIZATIONS if materializations is None else materializations
+        )
+        self.request_latency = parse_latency(request_latency)
+        self.queue_latency = parse_latency(queue_latency)
+        self.run_latency = parse_latency(run_latency)
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_concurrent_queries = max_concurrent_queries
+        self.result_rows = result_rows
+        self.page_size = page_size
+        self.retention = retention
+        self.api_key = api_key
+
+        self.stats: Dict[str, int] = dict.fromkeys(
+            ("requests", "rate_limited", "errors", "submissions", "polls"), 0
+        )
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._queries: Dict[str, _FakeQuery] = {}
+        # (completed_at, query_id) of the queries, earliest completion first
+        self._completions: List[Tuple[float, str]] = []
+        self._query_ids = itertools.count()
+        # monotonic times at which each busy worker becomes free
+        self._workers: List[float] = []
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._schema = build_schema(SCHEMA)
+        self._bind_resolvers()
+
+    @property
+    def url(self) -> str:
+        """
+        The URL of the running server.
+        """
+        if self._httpd is None:
+            raise RuntimeError("The fake MQL server is not running")
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeMQLServer":
+        """
+        Start serving requests from a daemon thread.
+
+        Returns:
+            The server.
+        """
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _RequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake_server = self
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-mql-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving requests.
+        """
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeMQLServer":
+        """
+        Start the server.
+        """
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Stop the server.
+        """
+        self.stop()
+
+    def write_transform_config(self, config_dir: Union[str, Path]) -> Path:
+        """
+        Point the Transform configuration of `config_dir` to the server.
+        Transform clients read it once `TFD_CONFIG_DIR` is set to `config_dir`.
+
+        Args:
+            config_dir: The Transform configuration directory.
+
+        Returns:
+            The path of the configuration file.
+        """
+        path = Path(config_dir) / "config.yml"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(yaml.safe_dump({BACKEND_OVERRIDE_CONFIG_KEY: self.url}))
+        return path
+
+    def handle(
+        self, path: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer an HTTP request, applying rate limiting, latency and errors.
+
+        Args:
+            path: The path of the request.
+            headers: The headers of the request.
+            body: The decompressed body of the request.
+
+        Returns:
+            The status code, headers and body of the response.
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            retry_after = self._take_token()
+            if retry_after is not None:
+                self.stats["rate_limited"] += 1
+            latency = max(self.request_latency(self._random), 0.0)
+            failed = self._random.random() < self.error_rate
+            if failed and retry_after is None:
+                self.stats["errors"] += 1
+
+        if retry_after is not None:
+            return 429, {"Retry-After": str(int(retry_after))}, b'{"errors": []}'
+        time.sleep(latency)
+        if failed:
+            return 503, {"Retry-After": "0"}, b'{"errors": []}'
+        if path.rstrip("/") != "/graphql":
+            return 404, {}, b'{"errors": []}'
+        authorization = headers.get("Authorization", "")
+        if self.api_key is not None and authorization != f"X-Api-Key {self.api_key}":
+            message = "Authentication hook unauthorized this request"
+            return 200, {}, json.dumps({"errors": [{"message": message}]}).encode()
+
+        request = json.loads(body)
+        result = graphql_sync(
+            self._schema,
+            request["query"],
+            variable_values=request.get("variables"),
+            operation_name=request.get("operationName"),
+        )
+        return 200, {}, json.dumps(result.formatted).encode()
+
+    def _take_token(self) -> Optional[float]:
+        """
+        Take a token of the rate limiter, returning the seconds
+        to wait for the next token if there is none left.
+        """
+        if self.rate_limit is None:
+            return None
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate_limit
+        )
+        self._refilled_at = now
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate_limit
+        self._tokens -= 1
+        return None
+
+    def _schedule(self, columns: List[str], sql: str, table: Optional[str]) -> str:
+        """
+        Queue a query, scheduling when it starts and completes,
+        and forget the queries completed more than `retention` ago.
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._completions and (
+                self._completions[0][0] + self.retention <= now
+            ):
+                _, expired_id = heapq.heappop(self._completions)
+                del self._queries[expired_id]
+            ready_at = now + max(self.queue_latency(self._random), 0.0)
+            if self.max_concurrent_queries is not None:
+                while self._workers and self._workers[0] <= ready_at:
+                    heapq.heappop(self._workers)
+                if len(self._workers) >= self.max_concurrent_queries:
+                    ready_at = heapq.heappop(self._workers)
+            completed_at = ready_at + max(self.run_latency(self._random), 0.0)
+            if self.max_concurrent_queries is not None:
+                heapq.heappush(self._workers, completed_at)
+
+            query_id = f"fake_{next(self._query_ids)}"
+            error = None
+            if self._random.random() < self.failure_rate:
+                error = f"Injected failure of query {query_id}"
+            self._queries[query_id] = _FakeQuery(
+                query_id, columns, sql, table, ready_at, completed_at, error
+            )
+            heapq.heappush(self._completions, (completed_at, query_id))
+            self.stats["submissions"] += 1
+        return query_id
+
+    def _bind_resolvers(self) -> None:
+        """
+        Attach the resolvers of the root fields to the schema.
+        """
+        resolvers = {
+            "Query": {
+                "mqlQuery": self._resolve_mql_query,
+                "metrics": self._resolve_metrics,
+                "materializations": self._resolve_materializations,
+                "myUser": self._resolve_user,
+                "myOrganization": self._resolve_organization,
+            },
+            "Mutation": {
+                "createMqlMaterializationNew": self._resolve_create_materialization,
+                "createMqlQuery": self._resolve_create_query,
+            },
+        }
+        for type_name, fields in resolvers.items():
+            for field_name, resolver in fields.items():
+                self._schema.type_map[type_name].fields[field_name].resolve = resolver
+
+    def _resolve_create_materialization(
+        self, root: Any, info: Any, input: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """
+        Queue a materialization.
+        """
+        name = input["materializationName"]
+        materialization = self.materializations.get(name)
+        if materialization is None:
+            raise ValueError(f"Unknown materialization {name!r}")
+        columns = materialization["dimensions"] + materialization["metrics"]
+        table = input.get("outputTable") or materialization.get("destinationTable")
+        sql = f"SELECT {', '.join(columns)} FROM fake_source"
+        return {"id": self._schedule(columns, sql, table or f"fake.{name}")}
+
+    def _resolve_create_query(
+        self, root: Any, info: Any, input: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """
+        Queue a metrics query.
+        """
+        columns = (input.get("groupBy") or []) + (input.get("metrics") or [])
+        sql = f"SELECT {', '.join(columns)} FROM fake_source"
+        if input.get("limit") is not None:
+            sql += f" LIMIT {input['limit']}"
+        return {"id": self._schedule(columns, sql, None)}
+
+    def _resolve_mql_query(
+        self, root: Any, info: Any, id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a query; lookups selecting only its status count as polls.
+        """
+        with self._lock:
+            if _selects_status_only(info):
+                self.stats["polls"] += 1
+            query = self._queries.get(id)
+        if query is None:
+            return {"id": id, "status": "UNKNOWN", "error": f"Unknown query {id!r}"}
+
+        status = query.status(time.monotonic())
+        schema = table = None
+        if status == "SUCCESSFUL" and query.table is not None:
+            schema, _, table = query.table.rpartition(".")
+        return {
+            "id": id,
+            "status": status,
+            "error": query.error if status == "FAILED" else None,
+            "sql": query.sql,
+            "resultSource": "METRICFLOW",
+            "resultPrimaryTimeGranularity": "DAY",
+            "result": None,
+            "chartValueMin": None,
+            "chartValueMax": None,
+            "warnings": [],
+            "resultTableSchema": schema or None,
+            "resultTableName": table,
+            "resultTabular": lambda info, orient=None, cursor=None: self._result_page(
+                query, cursor or 0
+            ),
+        }
+
+    def _result_page(self, query: _FakeQuery, cursor: int) -> Dict[str, Any]:
+        """
+        Build a page of the result of a query, in pandas `table` orient.
+        """
+        start = cursor * self.page_size
+        rows = range(start, min(start + self.page_size, self.result_rows))
+        frame = pd.DataFrame(
+            {column: [float(row) for row in rows] for column in query.columns}
+        )
+        next_cursor = cursor + 1 if rows.stop < self.result_rows else None
+        data = frame.to_json(orient="table", index=False).encode("utf-8")
+        return {"nextCursor": next_cursor, "data": base64.b64encode(data).decode()}
+
+    def _resolve_metrics(self, root: Any, info: Any, **kwargs: Any) -> List[Dict]:
+        """
+        List the metrics of the materializations, with their dimensions.
+        """
+        dimensions: Dict[str, List[str]] = {}
+        for materialization in self.materializations.values():
+            for metric in materialization["metrics"]:
+                names = dimensions.setdefault(metric, [])
+                names += [d for d in materialization["dimensions"] if d not in names]
+        return [
+            {"name": metric, "dimensionObjects": [{"name": name} for name in names]}
+            for metric, names in dimensions.items()
+        ]
+
+    def _resolve_materializations(
+        self, root: Any, info: Any, **kwargs: Any
+    ) -> List[Dict]:
+        """
+        List the materializations.
+        """
+        return [
+            {"name": name, **materialization}
+            for name, materialization in self.materializations.items()
+        ]
+
+    def _resolve_organization(self, root: Any, info: Any, **kwargs: Any) -> Dict:
+        """
+        Describe the organization and its single model.
+        """
+        return {
+            "id": "1",
+            "name": "fake",
+            "createdAt": _MODEL_KEY["createdAt"],
+            "primaryConfigRepo": _MODEL_KEY["gitRepo"],
+            "primaryConfigBranch": _MODEL_KEY["gitBranch"],
+            "currentModel": [_MODEL_KEY],
+            "models": lambda info, id=None: [_MODEL_KEY],
+        }
+
+    def _resolve_user(self, root: Any, info: Any) -> Dict:
+        """
+        Describe the user, whose MQL server is this server.
+        """
+        return {
+            "id": "1",
+            "userName": "fake",
+            "email": "fake@example.com",
+            "mqlServerUrl": self.url,
+            "organization": self._resolve_organization(root, info),
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Run a fake MQL server until interrupted.
+
+    Args:
+        argv: The command line arguments; defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run a local stand-in for the Transform MQL server"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8180)
+    parser.add_argument("--request-latency", default="0")
+    parser.add_argument("--queue-latency", default="0")
+    parser.add_argument("--run-latency", default="0.1")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--max-concurrent-queries", type=int, default=None)
+    parser.add_argument("--retention", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--config-dir", help="Transform configuration directory to point to it"
+    )
+    args = parser.parse_args(argv)
+
+    server = FakeMQLServer(
+        host=args.host,
+        port=args.port,
+        request_latency=args.request_latency,
+        queue_latency=args.queue_latency,
+        run_latency=args.run_latency,
+        failure_rate=args.failure_rate,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        max_concurrent_queries=args.max_concurrent_queries,
+        retention=args.retention,
+        seed=args.seed,
+    )
+    with server:
+        print(f"Fake MQL server listening on {server.url}")
+        if args.config_dir:
+            server.write_transform_config(args.config_dir)
+            print(f"Set TFD_CONFIG_DIR={args.config_dir} to use it")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
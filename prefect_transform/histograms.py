@@ -0,0 +1,330 @@
+"""Latency histograms of materializations persisted across runs"""
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from prefect.settings import PREFECT_HOME
+
+from prefect_transform.instrumentation import MetricsSink
+
+LATENCY_METRICS = ("end_to_end", "server", "polling")
+
+# values are bucketed with 8 significant bits, i.e. a relative error below 1%
+_SUB_BUCKET_BITS = 8
+_HALF_SUB_BUCKETS = 1 << (_SUB_BUCKET_BITS - 1)
+
+
+def _bucket_index(microseconds: int) -> int:
+    """
+    Index of the bucket holding a value.
+    """
+    shift = max(microseconds.bit_length() - _SUB_BUCKET_BITS, 0)
+    return shift * _HALF_SUB_BUCKETS + (microseconds >> shift)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """
+    Largest value held by a bucket.
+    """
+    shift = max(index // _HALF_SUB_BUCKETS - 1, 0)
+    mantissa = index - shift * _HALF_SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in the style of HdrHistogram: values are counted
+    in logarithmic buckets, each split in linear sub-buckets, so that the
+    histogram covers microseconds to days in a few hundred buckets with
+    a relative error below 1%.
+
+    Args:
+        counts: The number of values of each bucket, keyed by bucket index.
+
+    Example:
+        Compute the 99th percentile of latencies
+        ```python
+        histogram = LatencyHistogram()
+        for seconds in (0.5, 1.2, 3.4):
+            histogram.record(seconds)
+        histogram.percentile(99)
+        ```
+    """
+
+    __slots__ = ("counts", "count", "min", "max")
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None) -> None:
+        """
+        Initialize the histogram; see the class docstring for the arguments.
+        """
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        for index, count in (counts or {}).items():
+            self._add(int(index), count, _bucket_upper_bound(int(index)))
+
+    def __repr__(self) -> str:
+        """
+        Represent the histogram by its count and median.
+        """
+        return f"{type(self).__name__}(count={self.count}, p50={self.percentile(50)})"
+
+    def _add(self, index: int, count: int, microseconds: int) -> None:
+        """
+        Add `count` values to the bucket `index`.
+        """
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.min = microseconds if self.min is None else min(self.min, microseconds)
+        self.max = microseconds if self.max is None else max(self.max, microseconds)
+
+    def record(self, seconds: float) -> None:
+        """
+        Count a latency.
+
+        Args:
+            seconds: The latency, in seconds; negative values count as zero.
+        """
+        microseconds = max(int(seconds * 1_000_000), 0)
+        self._add(_bucket_index(microseconds), 1, microseconds)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add the values of another histogram to this one.
+
+        Args:
+            other: The histogram to merge.
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Return a percentile of the latencies, as the largest value
+        of the bucket holding it; the 0th percentile is the smallest latency.
+
+        Args:
+            percentile: The percentile, between 0 and 100.
+
+        Raises:
+            `ValueError` if `percentile` is not between 0 and 100.
+
+        Returns:
+            The percentile, in seconds, or `None` if the histogram is empty.
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError(
+                f"Invalid percentile {percentile!r}, expected a value in [0, 100]"
+            )
+        if not self.count:
+            return None
+        if percentile == 0:
+            return self.min / 1_000_000
+
+        rank = percentile / 100 * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value = min(_bucket_upper_bound(index), self.max)
+                return max(value, self.min) / 1_000_000
+        return self.max / 1_000_000  # pragma: no cover
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Represent the histogram as a JSON-serializable dictionary.
+
+        Returns:
+            The number of values of each bucket, and the extreme values
+                in microseconds.
+        """
+        return {
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        Build a histogram from the output of `to_dict`.
+
+        Args:
+            data: The counts and extreme values of the histogram.
+
+        Returns:
+            The `LatencyHistogram`.
+        """
+        histogram = cls(data["counts"])
+        histogram.min = data.get("min", histogram.min)
+        histogram.max = data.get("max", histogram.max)
+        return histogram
+
+
+class LatencyHistogramStore(MetricsSink):
+    """
+    Latency histograms of each materialization, persisted in a local JSON
+    file shared across runs, for the `end_to_end` duration of
+    `create_materialization`, the `server` time spent queued and running on
+    the MQL server, and the `polling` time spent waiting for status requests.
+
+    Register the store with `register_metrics_sink` to record every
+    materialization. New values are merged into the file after each
+    materialization; concurrent processes writing the same file may lose
+    values recorded at the same time.
+
+    Args:
+        path: The path of the file holding the histograms.
+            Defaults to `$PREFECT_HOME/transform/latency-histograms.json`.
+
+    Example:
+        Derive the timeout of a materialization from its past latencies
+        ```python
+        store = LatencyHistogramStore()
+        register_metrics_sink(store)
+        p99 = store.percentiles("<name of the materialization>")[99]
+        timeout = 2 * p99 if p99 is not None else None
+        ```
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Initialize the store; see the class docstring for the arguments.
+        """
+        if path is None:
+            path = PREFECT_HOME.value() / "transform" / "latency-histograms.json"
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._histograms = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, LatencyHistogram]]:
+        """
+        Read the histograms persisted in the file, if any.
+        """
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return {
+            name: {
+                metric: LatencyHistogram.from_dict(histogram)
+                for metric, histogram in metrics.items()
+            }
+            for name, metrics in data.items()
+        }
+
+    def _write(self) -> None:
+        """
+        Atomically persist the histograms in the file.
+        """
+        data = {
+            name: {metric: h.to_dict() for metric, h in metrics.items()}
+            for name, metrics in self._histograms.items()
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, partial_path = tempfile.mkstemp(dir=self.path.parent, suffix=".partial")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(partial_path, self.path)
+
+    def add(self, materialization_name: str, latencies: Dict[str, float]) -> None:
+        """
+        Record latencies of a materialization and persist them.
+
+        Args:
+            materialization_name: The name of the materialization.
+            latencies: The latencies, in seconds, keyed by metric name,
+                e.g. `end_to_end`, `server` or `polling`.
+        """
+        recorded: Dict[str, LatencyHistogram] = {}
+        for metric, seconds in latencies.items():
+            recorded[metric] = LatencyHistogram()
+            recorded[metric].record(seconds)
+
+        with self._lock:
+            # merge with the values persisted by other processes meanwhile
+            self._histograms = self._read()
+            metrics = self._histograms.setdefault(materialization_name, {})
+            for metric, histogram in recorded.items():
+                metrics.setdefault(metric, LatencyHistogram()).merge(histogram)
+            self._write()
+
+    def record(
+        self, operation: str, timings: Dict[str, float], tags: Dict[str, str]
+    ) -> None:
+        """
+        Record the latencies of a materialization created successfully
+        by the MQL server, waiting for its completion (`sync` mode);
+        see `MetricsSink.record`. SQL previews, local executions and
+        asynchronous creations are ignored, as their durations do not
+        cover the whole materialization.
+        """
+        if (
+            operation != "create_materialization"
+            or tags.get("mode") != "sync"
+            or tags.get("outcome") != "success"
+        ):
+            return
+
+        latencies = {"end_to_end": sum(timings.values())}
+        if "queued" in timings or "running" in timings:
+            latencies["server"] = timings.get("queued", 0) + timings.get("running", 0)
+        if "polling" in timings:
+            latencies["polling"] = timings["polling"]
+        self.add(tags["materialization_name"], latencies)
+
+    def get_histogram(
+        self, materialization_name: str, metric: str = "end_to_end"
+    ) -> Optional[LatencyHistogram]:
+        """
+        Return a histogram of a materialization.
+
+        Args:
+            materialization_name: The name of the materialization.
+            metric: `end_to_end`, `server` or `polling`.
+
+        Returns:
+            The `LatencyHistogram`, or `None` if no latency was recorded.
+        """
+        with self._lock:
+            return self._histograms.get(materialization_name, {}).get(metric)
+
+    def percentiles(
+        self,
+        materialization_name: str,
+        metric: str = "end_to_end",
+        percentiles: Iterable[float] = (50, 95, 99),
+    ) -> Dict[float, Optional[float]]:
+        """
+        Return percentiles of the latencies of a materialization.
+
+        Args:
+            materialization_name: The name of the materialization.
+            metric: `end_to_end`, `server` or `polling`.
+            percentiles: The percentiles to compute, between 0 and 100.
+
+        Raises:
+            `ValueError` if `metric` is not one of `LATENCY_METRICS`.
+
+        Returns:
+            The latencies, in seconds, keyed by percentile;
+                `None` if no latency was recorded.
+        """
+        if metric not in LATENCY_METRICS:
+            raise ValueError(
+                f"Invalid metric {metric!r}, expected one of {LATENCY_METRICS}"
+            )
+        histogram = self.get_histogram(materialization_name, metric)
+        return {
+            p: None if histogram is None else histogram.percentile(p)
+            for p in percentiles
+        }
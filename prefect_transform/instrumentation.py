@@ -0,0 +1,347 @@
+"""Phase timings and tracing spans of Transform interactions"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from prefect.context import TaskRunContext
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:  # pragma: no cover
+    propagate = None
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "prefect_transform"
+
+_sinks: List["MetricsSink"] = []
+_sinks_lock = threading.Lock()
+
+
+class PhaseTimer:
+    """
+    Monotonic timer measuring the seconds spent in each phase of an operation.
+    Phases entered several times accumulate their durations.
+    The timer also keeps a history of marks, e.g. the statuses of a query,
+    with the seconds elapsed since the timer was created, and counts
+    of events, e.g. status polls.
+
+    Args:
+        clock: The monotonic clock, in seconds.
+
+    Example:
+        Time the phases of an operation
+        ```python
+        timer = PhaseTimer()
+        with timer.phase("client"):
+            mql_client = credentials.get_client()
+        timer.timings  # {"client": 0.012}
+        ```
+    """
+
+    __slots__ = ("timings", "marks", "counts", "_clock", "_started")
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the timer; see the class docstring for the arguments.
+        """
+        self.timings: Dict[str, float] = {}
+        self.marks: List[Tuple[str, float]] = []
+        self.counts: Dict[str, int] = {}
+        self._clock = clock
+        self._started = clock()
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        Add `seconds` to the duration of the phase `name`.
+        """
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name: str) -> None:
+        """
+        Count an occurrence of the event `name`.
+        """
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def mark(self, name: str) -> None:
+        """
+        Add `name` to the history of marks, unless it is the last mark.
+        """
+        if not self.marks or self.marks[-1][0] != name:
+            self.marks.append((name, self._clock() - self._started))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the body of the `with` statement as the phase `name`,
+        whether or not it raises.
+        """
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, self._clock() - started)
+
+    @property
+    def total(self) -> float:
+        """
+        The number of seconds spent in every phase.
+        """
+        return sum(self.timings.values())
+
+
+class MetricsSink(ABC):
+    """
+    Base class of the sinks receiving the phase timings of Transform
+    interactions, e.g. to forward them to a monitoring system.
+    Register sinks with `register_metrics_sink`.
+    """
+
+    @abstractmethod
+    def record(
+        self, operation: str, timings: Dict[str, float], tags: Dict[str, str]
+    ) -> None:
+        """
+        Receive the phase timings of an operation.
+
+        Args:
+            operation: The name of the operation, e.g. `create_materialization`.
+            timings: The seconds spent in each phase, keyed by phase name.
+            tags: Attributes of the operation, e.g. `materialization_name`,
+                `outcome` and, on failure, `exception`.
+        """
+
+    def increment(
+        self, name: str, value: float = 1, tags: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Receive an increment of a counter, or of a gauge if `value` can be
+        negative, e.g. `submissions`, `retries` or `in_flight`.
+        Increments are ignored unless the sink overrides this method.
+
+        Args:
+            name: The name of the counter.
+            value: The increment.
+            tags: Attributes of the increment, e.g. `operation`.
+        """
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """
+    Sink keeping every record in memory, e.g. for tests or notebooks.
+
+    Example:
+        Inspect the timings of a materialization
+        ```python
+        sink = InMemoryMetricsSink()
+        register_metrics_sink(sink)
+        create_materialization(
+            credentials=credentials,
+            materialization_name="<name of the materialization>",
+        )
+        operation, timings, tags = sink.records[-1]
+        ```
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the sink without records.
+        """
+        self.records: List[Tuple[str, Dict[str, float], Dict[str, str]]] = []
+
+    def record(
+        self, operation: str, timings: Dict[str, float], tags: Dict[str, str]
+    ) -> None:
+        """
+        Keep the phase timings of an operation; see `MetricsSink.record`.
+        """
+        self.records.append((operation, dict(timings), dict(tags)))
+
+
+def register_metrics_sink(sink: MetricsSink) -> None:
+    """
+    Publish the phase timings of every subsequent Transform interaction
+    to `sink`.
+
+    Args:
+        sink: The `MetricsSink` to register.
+    """
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks.append(sink)
+
+
+def unregister_metrics_sink(sink: MetricsSink) -> None:
+    """
+    Stop publishing phase timings to `sink`, if it is registered.
+
+    Args:
+        sink: The `MetricsSink` to unregister.
+    """
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def publish_timings(
+    operation: str, timings: Dict[str, float], tags: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Publish the phase timings of an operation to every registered sink.
+    Errors raised by a sink are logged, and never fail the operation.
+
+    Args:
+        operation: The name of the operation.
+        timings: The seconds spent in each phase, keyed by phase name.
+        tags: Attributes of the operation.
+    """
+    for sink in _get_sinks():
+        try:
+            sink.record(operation, timings, tags or {})
+        except Exception:
+            logger.exception("Metrics sink %r failed to record %s", sink, operation)
+
+
+def publish_increment(
+    name: str, value: float = 1, tags: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Publish the increment of a counter to every registered sink.
+    Errors raised by a sink are logged, and never fail the operation.
+
+    Args:
+        name: The name of the counter.
+        value: The increment.
+        tags: Attributes of the increment.
+    """
+    for sink in _get_sinks():
+        try:
+            sink.increment(name, value, tags or {})
+        except Exception:
+            logger.exception("Metrics sink %r failed to increment %s", sink, name)
+
+
+def publish_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Publish the outcome of a cache lookup to every registered sink,
+    as an increment of the `cache_hits` or `cache_misses` counter.
+
+    Args:
+        cache: The name of the cache, e.g. `catalog`.
+        hit: Whether the value was found in the cache.
+    """
+    publish_increment("cache_hits" if hit else "cache_misses", 1, {"cache": cache})
+
+
+def _get_sinks() -> List[MetricsSink]:
+    """
+    Return the registered sinks, without locking when there are none.
+    """
+    if not _sinks:
+        return []
+    with _sinks_lock:
+        return list(_sinks)
+
+
+class _NoopSpan:
+    """
+    Span returned by `trace_span` when OpenTelemetry is not installed.
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Ignore the attribute.
+        """
+
+
+def _span_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert attributes to OpenTelemetry attribute values: `None` values are
+    dropped, enumerations are replaced by their value and single-item lists
+    by their item.
+    """
+    converted = {}
+    for key, value in attributes.items():
+        if isinstance(value, (list, tuple)):
+            value = [item.value if isinstance(item, Enum) else item for item in value]
+            if len(value) == 1:
+                value = value[0]
+        elif isinstance(value, Enum):
+            value = value.value
+        if value is not None:
+            converted[key] = value
+    return converted
+
+
+@contextmanager
+def trace_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Run the body of the `with` statement in an OpenTelemetry span, child of
+    the current span. Exceptions are recorded on the span. Without
+    OpenTelemetry installed, the span does nothing.
+
+    Args:
+        name: The name of the span.
+        attributes: The attributes of the span; see `set_span_attributes`.
+
+    Yields:
+        The span, whose attributes can be completed with `set_span_attributes`.
+    """
+    if trace is None:
+        yield _NoopSpan()
+        return
+
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(
+        name, attributes=_span_attributes(attributes or {})
+    ) as span:
+        yield span
+
+
+def set_span_attributes(span: Any, attributes: Dict[str, Any]) -> None:
+    """
+    Set attributes of a span. `None` values are ignored, enumerations are
+    recorded by value and single-item lists by their item.
+
+    Args:
+        span: The span returned by `trace_span`.
+        attributes: The attributes, keyed by name.
+    """
+    for key, value in _span_attributes(attributes).items():
+        span.set_attribute(key, value)
+
+
+def task_run_attributes() -> Dict[str, str]:
+    """
+    Return the span attributes identifying the current Prefect task run,
+    if any.
+    """
+    context = TaskRunContext.get()
+    if context is None:
+        return {}
+    return {
+        "prefect.task_run.id": str(context.task_run.id),
+        "prefect.task_run.name": context.task_run.name,
+        "prefect.flow_run.id": str(context.task_run.flow_run_id),
+    }
+
+
+def inject_trace_context(headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    Add the W3C trace context of the current span, e.g. the `traceparent`
+    header, to HTTP request headers.
+
+    Args:
+        headers: The headers of the request, updated in place.
+
+    Returns:
+        The updated `headers`.
+    """
+    if propagate is not None:
+        propagate.inject(headers)
+    return headers
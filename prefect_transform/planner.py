@@ -0,0 +1,145 @@
+"""Coalescing of compatible metric queries into combined MQL queries"""
+import json
+from typing import Any, Dict, List
+
+import pandas as pd
+
+
+class QueryGroup:
+    """
+    Metric queries answered by a single combined MQL query.
+
+    Args:
+        query: The arguments of the combined query, in the form accepted
+            by `MQLClient.create_query`.
+        members: The positions of the coalesced queries in the planned list.
+        member_metrics: The metrics requested by each coalesced query.
+    """
+
+    __slots__ = ("query", "members", "member_metrics")
+
+    def __init__(
+        self,
+        query: Dict[str, Any],
+        members: List[int],
+        member_metrics: List[List[str]],
+    ) -> None:
+        """
+        Initialize the group; see the class docstring for the arguments.
+        """
+        self.query = query
+        self.members = members
+        self.member_metrics = member_metrics
+
+    def __repr__(self) -> str:
+        """
+        Represent the group by its combined metrics and members.
+        """
+        return (
+            f"{type(self).__name__}(metrics={self.query['metrics']!r}, "
+            f"members={self.members!r})"
+        )
+
+
+def _compatibility_key(query: Dict[str, Any]) -> str:
+    """
+    Canonical representation of every argument of `query` but its metrics.
+    """
+    return json.dumps(
+        {name: value for name, value in query.items() if name != "metrics"},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def plan_queries(
+    queries: List[Dict[str, Any]], coalesce: bool = True
+) -> List[QueryGroup]:
+    """
+    Group metric queries that only differ by their metrics, so that each
+    group can be answered by a single MQL query requesting the union of
+    their metrics.
+
+    Queries with an `order` or a `limit` are never coalesced, as the rows
+    they select depend on the metrics of the query.
+
+    Args:
+        queries: The arguments of each query, in the form accepted
+            by `MQLClient.create_query`.
+        coalesce: Whether to group compatible queries; if `False`,
+            each query gets its own group.
+
+    Returns:
+        The groups of queries, in the order of their first member.
+    """
+    groups: Dict[str, QueryGroup] = {}
+    for index, query in enumerate(queries):
+        if not coalesce or query.get("order") or query.get("limit") is not None:
+            key = f"#{index}"
+        else:
+            key = _compatibility_key(query)
+
+        group = groups.get(key)
+        if group is None:
+            groups[key] = QueryGroup(
+                query={**query, "metrics": list(query["metrics"])},
+                members=[index],
+                member_metrics=[list(query["metrics"])],
+            )
+            continue
+
+        group.members.append(index)
+        group.member_metrics.append(list(query["metrics"]))
+        for metric in query["metrics"]:
+            if metric not in group.query["metrics"]:
+                group.query["metrics"].append(metric)
+
+    return list(groups.values())
+
+
+def _metric_columns(df: pd.DataFrame, metrics: List[str]) -> Dict[str, str]:
+    """
+    Map each metric to its column in `df`, matching names case-insensitively.
+    """
+    columns = {str(column).lower(): column for column in df.columns}
+    missing = [metric for metric in metrics if metric.lower() not in columns]
+    if missing:
+        raise ValueError(
+            f"Cannot find the columns of the metrics {missing} "
+            f"in the combined result columns {list(df.columns)}"
+        )
+    return {metric: columns[metric.lower()] for metric in metrics}
+
+
+def split_result(df: pd.DataFrame, group: QueryGroup) -> List[pd.DataFrame]:
+    """
+    Split the result of a combined query into the result of each member
+    of the group: each member gets the group-by columns and its own metrics,
+    in the rows where at least one of its metrics has a value, the rows
+    the combined query added for the metrics of the other members being
+    dropped. A row in which every metric of a member is null in its own
+    result is dropped too, as it cannot be told from such an added row.
+
+    Args:
+        df: The result of the combined query.
+        group: The group answered by the combined query.
+
+    Raises:
+        `ValueError` if the column of a metric cannot be found in `df`.
+
+    Returns:
+        One `DataFrame` per member of the group, in the same order.
+    """
+    if len(group.members) == 1:
+        return [df]
+
+    metric_columns = _metric_columns(df, group.query["metrics"])
+    group_by_columns = [
+        column for column in df.columns if column not in metric_columns.values()
+    ]
+    results = []
+    for metrics in group.member_metrics:
+        columns = [metric_columns[metric] for metric in metrics]
+        rows = df[columns].notna().any(axis=1)
+        results.append(df.loc[rows, group_by_columns + columns].reset_index(drop=True))
+    return results
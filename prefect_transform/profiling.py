@@ -0,0 +1,170 @@
+"""Opt-in profiling of Transform tasks"""
+import cProfile
+import logging
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from prefect.artifacts import create_markdown_artifact
+from prefect.context import FlowRunContext, TaskRunContext
+from prefect.settings import PREFECT_HOME
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV_VAR = "PREFECT_TRANSFORM_PROFILE"
+PROFILE_DIR_ENV_VAR = "PREFECT_TRANSFORM_PROFILE_DIR"
+PROFILE_TOP_FUNCTIONS = 15
+
+_active = threading.local()
+
+
+def profiling_enabled(enabled: Optional[bool] = None) -> bool:
+    """
+    Whether to profile an operation.
+
+    Args:
+        enabled: The switch set by the caller; `None` defers to the
+            `PREFECT_TRANSFORM_PROFILE` environment variable, enabled
+            by `1`, `true` or `yes`.
+
+    Returns:
+        Whether profiling is enabled.
+    """
+    if enabled is not None:
+        return enabled
+    return os.environ.get(PROFILE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def _profile_dir() -> Path:
+    """
+    Directory receiving the profile files: `PREFECT_TRANSFORM_PROFILE_DIR`,
+    or `$PREFECT_HOME/transform/profiles`.
+    """
+    directory = os.environ.get(PROFILE_DIR_ENV_VAR)
+    if directory:
+        return Path(directory)
+    return PREFECT_HOME.value() / "transform" / "profiles"
+
+
+def summarize_profile(
+    stats: pstats.Stats, top: int = PROFILE_TOP_FUNCTIONS
+) -> List[Tuple[str, int, float, float]]:
+    """
+    Return the functions of a profile taking the most cumulative time.
+
+    Args:
+        stats: The statistics of the profile.
+        top: The number of functions to return.
+
+    Returns:
+        The name, number of calls, own time and cumulative time, in seconds,
+            of each function, by decreasing cumulative time.
+    """
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        (pstats.func_std_string(function), calls, own_time, cumulative_time)
+        for function, (_, calls, own_time, cumulative_time, _) in functions[:top]
+    ]
+
+
+def _to_markdown(operation: str, path: Path, stats: pstats.Stats) -> str:
+    """
+    Render the summary of a profile as a markdown table.
+    """
+    lines = [
+        f"# Profile of `{operation}`",
+        "",
+        f"{stats.total_calls} calls in {stats.total_tt:.3f}s, saved to `{path}`.",
+        "",
+        "| Function | Calls | Own time (s) | Cumulative time (s) |",
+        "|:---|---:|---:|---:|",
+    ]
+    for function, calls, own_time, cumulative_time in summarize_profile(stats):
+        function = function.replace("|", "\\|")
+        lines.append(
+            f"| `{function}` | {calls} | {own_time:.4f} | {cumulative_time:.4f} |"
+        )
+    return "\n".join(lines)
+
+
+@contextmanager
+def profiling(operation: str, enabled: Optional[bool] = None) -> Iterator[None]:
+    """
+    Profile the body of the `with` statement with `cProfile`, if enabled.
+
+    The profile is saved to `<operation>-<timestamp>-<pid>.prof` in the
+    directory set by `PREFECT_TRANSFORM_PROFILE_DIR`, which defaults to
+    `$PREFECT_HOME/transform/profiles`, and can be read with `pstats` or
+    `snakeviz`. Within a Prefect flow or task run, the functions taking the
+    most cumulative time are also published as a markdown artifact with the
+    key `profile-<operation>`. Operations nested in a profiled operation
+    are part of its profile. From Python 3.12, a single profiler can be
+    active at once in a process: operations starting while another thread
+    is profiled are run without profiling, with a warning.
+
+    Args:
+        operation: The name of the profiled operation.
+        enabled: Whether to profile the operation; `None` defers
+            to the `PREFECT_TRANSFORM_PROFILE` environment variable.
+
+    Example:
+        Profile every Transform task of a worker
+        ```bash
+        PREFECT_TRANSFORM_PROFILE=1 prefect agent start -q default
+        ```
+    """
+    if not profiling_enabled(enabled) or getattr(_active, "profiling", False):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    _active.profiling = True
+    try:
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # another thread is profiled, e.g. "Another profiling tool is
+            # already active" from Python 3.12
+            logger.warning("Cannot profile %s: %s", operation, e)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _save_profile(operation, profiler)
+    finally:
+        _active.profiling = False
+
+
+def _save_profile(operation: str, profiler: cProfile.Profile) -> None:
+    """
+    Save a profile to a file and, within a Prefect run, to an artifact.
+    Errors are logged, so that they never replace the outcome of the
+    profiled operation.
+    """
+    try:
+        directory = _profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        path = directory / f"{operation}-{timestamp}-{os.getpid()}.prof"
+        profiler.dump_stats(str(path))
+    except Exception:
+        logger.exception("Cannot save the profile of %s", operation)
+        return
+    logger.info("Profile of %s saved to %s", operation, path)
+
+    if TaskRunContext.get() is None and FlowRunContext.get() is None:
+        return
+    try:
+        create_markdown_artifact(
+            markdown=_to_markdown(operation, path, pstats.Stats(profiler)),
+            key=f"profile-{operation.replace('_', '-')}",
+            description=f"Top functions of {operation} by cumulative time",
+        )
+    except Exception:
+        logger.exception("Cannot publish the profile of %s as an artifact", operation)
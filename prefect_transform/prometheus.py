@@ -0,0 +1,227 @@
+"""Prometheus metrics of Transform interactions"""
+from typing import Dict, Optional, Sequence
+
+from prefect_transform.catalog import cached_catalog_count
+from prefect_transform.compilation import compiled_sql_count
+from prefect_transform.instrumentation import MetricsSink
+from prefect_transform.transport import pooled_session_count
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+DEFAULT_BUCKETS = (
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+    600,
+    1800,
+    3600,
+)
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Sink exposing the metrics of Transform interactions in the Prometheus
+    text format, through an HTTP endpoint or a textfile collector file.
+
+    Metrics are kept in a dedicated `CollectorRegistry`:
+    - `<namespace>_submissions_total`: materializations submitted, by operation.
+    - `<namespace>_successes_total`: operations completed, by operation.
+    - `<namespace>_failures_total`: operations failed, by operation
+        and exception class.
+    - `<namespace>_retries_total`: HTTP requests retried by the pooled transport.
+    - `<namespace>_phase_seconds`: histogram of phase durations,
+        by operation and phase.
+    - `<namespace>_queue_wait_seconds`: histogram of the time materializations
+        wait in the queue of the MQL server.
+    - `<namespace>_in_flight`: operations currently running, by operation.
+    - `<namespace>_pooled_sessions`: pooled HTTP sessions currently open.
+    - `<namespace>_client_cache_entries`: entries of the client-side caches,
+        by cache: `pooled_sessions`, `catalogs` and `compiled_sql`.
+
+    Metrics are only collected once the sink is registered with
+    `register_metrics_sink`: until then, Transform interactions only
+    check that no sink is registered.
+
+    Args:
+        namespace: The prefix of the metric names.
+        buckets: The upper bounds, in seconds, of the histogram buckets.
+        registry: The registry holding the metrics; defaults to a new one.
+
+    Raises:
+        `ImportError` if `prometheus_client` is not installed.
+
+    Example:
+        Expose the metrics of a worker on port 9090
+        ```python
+        from prefect_transform.instrumentation import register_metrics_sink
+        from prefect_transform.prometheus import PrometheusMetricsSink
+
+        sink = PrometheusMetricsSink()
+        sink.start_http_server(9090)
+        register_metrics_sink(sink)
+        ```
+    """
+
+    def __init__(
+        self,
+        namespace: str = "prefect_transform",
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["prometheus_client.CollectorRegistry"] = None,
+    ) -> None:
+        """
+        Initialize the sink; see the class docstring for the arguments.
+        """
+        if prometheus_client is None:
+            raise ImportError(
+                "prometheus_client is required, "
+                "install it with `pip install prometheus-client`"
+            )
+        self.registry = registry or prometheus_client.CollectorRegistry()
+
+        def metric(cls, name, documentation, labels=(), **kwargs):
+            """
+            Create a metric of the registry.
+            """
+            return cls(
+                name,
+                documentation,
+                labels,
+                namespace=namespace,
+                registry=self.registry,
+                **kwargs,
+            )
+
+        self.submissions = metric(
+            prometheus_client.Counter,
+            "submissions",
+            "Materializations submitted to the MQL server",
+            ["operation"],
+        )
+        self.successes = metric(
+            prometheus_client.Counter,
+            "successes",
+            "Operations completed successfully",
+            ["operation"],
+        )
+        self.failures = metric(
+            prometheus_client.Counter,
+            "failures",
+            "Operations failed",
+            ["operation", "exception"],
+        )
+        self.retries = metric(
+            prometheus_client.Counter,
+            "retries",
+            "HTTP requests to the MQL server retried",
+        )
+        self.phase_seconds = metric(
+            prometheus_client.Histogram,
+            "phase_seconds",
+            "Duration of the phases of operations",
+            ["operation", "phase"],
+            buckets=buckets,
+        )
+        self.queue_wait_seconds = metric(
+            prometheus_client.Histogram,
+            "queue_wait_seconds",
+            "Time materializations wait in the queue of the MQL server",
+            buckets=buckets,
+        )
+        self.in_flight = metric(
+            prometheus_client.Gauge,
+            "in_flight",
+            "Operations currently running",
+            ["operation"],
+        )
+        self.pooled_sessions = metric(
+            prometheus_client.Gauge,
+            "pooled_sessions",
+            "Pooled HTTP sessions currently open",
+        )
+        self.pooled_sessions.set_function(pooled_session_count)
+        self.client_cache_entries = metric(
+            prometheus_client.Gauge,
+            "client_cache_entries",
+            "Entries of the client-side caches",
+            ["cache"],
+        )
+        for cache, count in (
+            ("pooled_sessions", pooled_session_count),
+            ("catalogs", cached_catalog_count),
+            ("compiled_sql", compiled_sql_count),
+        ):
+            self.client_cache_entries.labels(cache).set_function(count)
+
+    def record(
+        self, operation: str, timings: Dict[str, float], tags: Dict[str, str]
+    ) -> None:
+        """
+        Count the outcome of an operation and observe its phase timings;
+        see `MetricsSink.record`.
+        """
+        if tags.get("outcome") == "success":
+            self.successes.labels(operation).inc()
+        else:
+            self.failures.labels(operation, tags.get("exception", "")).inc()
+
+        for phase, seconds in timings.items():
+            self.phase_seconds.labels(operation, phase).observe(seconds)
+        if "queued" in timings:
+            self.queue_wait_seconds.observe(timings["queued"])
+
+    def increment(
+        self, name: str, value: float = 1, tags: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Increment the `submissions` or `retries` counter, or the `in_flight`
+        gauge; see `MetricsSink.increment`.
+        """
+        operation = (tags or {}).get("operation", "")
+        if name == "submissions":
+            self.submissions.labels(operation).inc(value)
+        elif name == "retries":
+            self.retries.inc(value)
+        elif name == "in_flight":
+            self.in_flight.labels(operation).inc(value)
+
+    def generate(self) -> bytes:
+        """
+        Render the metrics in the Prometheus text format.
+
+        Returns:
+            The metrics, encoded in UTF-8.
+        """
+        return prometheus_client.generate_latest(self.registry)
+
+    def start_http_server(self, port: int, addr: str = "0.0.0.0") -> None:
+        """
+        Serve the metrics over HTTP from a daemon thread.
+
+        Args:
+            port: The port to listen on.
+            addr: The address to listen on.
+        """
+        prometheus_client.start_http_server(port, addr=addr, registry=self.registry)
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Atomically write the metrics to a file read by the textfile
+        collector of the Prometheus node exporter.
+
+        Args:
+            path: The path of the file, which should end with `.prom`.
+        """
+        prometheus_client.write_to_textfile(path, self.registry)
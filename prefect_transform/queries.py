@@ -0,0 +1,483 @@
+"""GraphQL documents and helpers used to talk to the Transform MQL server"""
+import base64
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gql import gql
+from gql.transport.exceptions import TransportQueryError
+from transform import MQLClient
+from transform.constants import DEFAULT_QUERY_TIMEOUT
+from transform.exceptions import QueryRuntimeException
+from transform.models import (
+    MqlQueryResultSeries,
+    MqlQueryResultSource,
+    MqlQueryStatus,
+    MqlQueryStatusResp,
+    TimeGranularity,
+)
+
+from prefect_transform.exceptions import TransformSubmissionException
+from prefect_transform.instrumentation import (
+    PhaseTimer,
+    set_span_attributes,
+    trace_span,
+)
+
+STATUS_FIELDS = """
+    status
+    error
+    sql
+    resultSource
+    resultPrimaryTimeGranularity
+    result {
+        value
+        pctChange
+        delta
+    }
+    chartValueMin
+    chartValueMax
+    warnings
+"""
+
+STATUS_ONLY_FIELDS = """
+    status
+    error
+"""
+
+MATERIALIZATION_TABLE_FIELDS = """
+    resultTableSchema
+    resultTableName
+"""
+
+RESULT_PAGE_QUERY = """
+    query GetMqlQueryResultsTabular($queryId: ID!, $cursor: Int) {
+        mqlQuery(id: $queryId) {
+            resultTabular(orient: TABLE, cursor: $cursor) {
+                nextCursor
+                data
+            }
+        }
+    }
+"""
+
+CATALOG_QUERY = """
+    query GetCatalog($modelKey: ModelKeyInput) {
+        metrics(modelKey: $modelKey) {
+            name
+            dimensionObjects(modelKey: $modelKey) {
+                name
+            }
+        }
+        materializations(modelKey: $modelKey) {
+            name
+            metrics
+            dimensions
+            destinationTable
+        }
+    }
+"""
+
+_MATERIALIZATION_VARIABLES = {
+    "materializationName": "String!",
+    "startTime": "String",
+    "endTime": "String",
+    "modelKey": "ModelKeyInput",
+    "outputTable": "String",
+    "force": "Boolean",
+}
+
+
+def execute(
+    mql_client: MQLClient,
+    document: str,
+    variable_values: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a GraphQL document against the MQL server of `mql_client`.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        document: The GraphQL document to execute.
+        variable_values: The values of the variables used by `document`.
+
+    Returns:
+        The `data` of the GraphQL response.
+    """
+    return mql_client.context.mql_client.execute(
+        gql(document), variable_values=variable_values
+    )
+
+
+def get_model_key_input(
+    mql_client: MQLClient, model_key_id: Optional[int]
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the `ModelKeyInput` GraphQL variable of a Transform model.
+
+    Args:
+        mql_client: The `MQLClient` used to retrieve the model key.
+        model_key_id: The unique identifier of the Transform model.
+
+    Returns:
+        The `ModelKeyInput` value, or `None` if `model_key_id` is `None`.
+    """
+    if model_key_id is None:
+        return None
+
+    model_key = mql_client.get_model_key(model_key_id)
+    return {
+        "organization": model_key.organization_id,
+        "repo": model_key.repository,
+        "branch": model_key.branch,
+        "commit": model_key.commit,
+    }
+
+
+def status_from_gql(query_id: str, mql_query: Dict[str, Any]) -> MqlQueryStatusResp:
+    """
+    Build an `MqlQueryStatusResp` from an `mqlQuery` GraphQL object.
+    Fields missing from `mql_query` are left empty.
+
+    Args:
+        query_id: The ID of the MQL query.
+        mql_query: The `mqlQuery` object returned by the MQL server.
+
+    Returns:
+        An `MqlQueryStatusResp` describing the MQL query.
+    """
+    result = None
+    if mql_query.get("result") is not None:
+        result = [
+            MqlQueryResultSeries(
+                value=v["value"], delta=v["delta"], pct_change=v["pctChange"]
+            )
+            for v in mql_query["result"]
+        ]
+
+    result_source = mql_query.get("resultSource")
+    time_granularity = mql_query.get("resultPrimaryTimeGranularity")
+
+    return MqlQueryStatusResp(
+        query_id=query_id,
+        status=MqlQueryStatus[mql_query["status"]],
+        error=mql_query.get("error") or None,
+        sql=mql_query.get("sql"),
+        result=result,
+        result_source=(
+            None if result_source is None else MqlQueryResultSource(result_source)
+        ),
+        result_primary_time_granularity=(
+            None
+            if time_granularity is None
+            else TimeGranularity(time_granularity.lower())
+        ),
+        chart_value_min=mql_query.get("chartValueMin"),
+        chart_value_max=mql_query.get("chartValueMax"),
+        warnings=mql_query.get("warnings") or [],
+    )
+
+
+def build_materializations_mutation(
+    variables: List[Dict[str, Any]]
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Pack one `createMqlMaterializationNew` mutation per item of `variables`
+    into a single GraphQL document, aliasing the i-th mutation as `m<i>`.
+
+    Args:
+        variables: The variables of each materialization, keyed by
+            their GraphQL name.
+
+    Returns:
+        The GraphQL document and its variable values.
+    """
+    definitions = []
+    selections = []
+    variable_values = {}
+    for index, item in enumerate(variables):
+        inputs = []
+        for name, graphql_type in _MATERIALIZATION_VARIABLES.items():
+            definitions.append(f"${name}{index}: {graphql_type}")
+            inputs.append(f"{name}: ${name}{index}")
+            variable_values[f"{name}{index}"] = item.get(name)
+        selections.append(
+            f"m{index}: createMqlMaterializationNew(input: {{{', '.join(inputs)}}}) "
+            "{ id }"
+        )
+
+    document = (
+        f"mutation CreateMqlMaterializationsBatch({', '.join(definitions)}) "
+        f"{{ {' '.join(selections)} }}"
+    )
+    return document, variable_values
+
+
+def build_statuses_query(
+    query_ids: List[str], fields: str = STATUS_FIELDS
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Pack one `mqlQuery` lookup per query ID into a single GraphQL document,
+    aliasing the i-th lookup as `q<i>`.
+
+    Args:
+        query_ids: The IDs of the MQL queries.
+        fields: The `mqlQuery` fields to retrieve.
+
+    Returns:
+        The GraphQL document and its variable values.
+    """
+    definitions = ", ".join(f"$queryId{index}: ID!" for index in range(len(query_ids)))
+    selections = " ".join(
+        f"q{index}: mqlQuery(id: $queryId{index}) {{ {fields} }}"
+        for index in range(len(query_ids))
+    )
+    document = f"query GetMqlQueriesStatus({definitions}) {{ {selections} }}"
+    variable_values = {
+        f"queryId{index}": query_id for index, query_id in enumerate(query_ids)
+    }
+    return document, variable_values
+
+
+def get_statuses(
+    mql_client: MQLClient, query_ids: List[str], fields: str = STATUS_FIELDS
+) -> List[MqlQueryStatusResp]:
+    """
+    Retrieve the status of several MQL queries in a single round-trip.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        query_ids: The IDs of the MQL queries.
+        fields: The `mqlQuery` fields to retrieve.
+
+    Returns:
+        One `MqlQueryStatusResp` per query ID, in the same order.
+    """
+    name = "transform.poll" if fields == STATUS_ONLY_FIELDS else "transform.fetch"
+    with trace_span(name, {"query_id": query_ids}) as span:
+        document, variable_values = build_statuses_query(query_ids, fields=fields)
+        data = execute(mql_client, document, variable_values=variable_values)
+        statuses = [
+            status_from_gql(query_id, data[f"q{index}"])
+            for index, query_id in enumerate(query_ids)
+        ]
+        set_span_attributes(span, {"status": [s.status for s in statuses]})
+    return statuses
+
+
+def get_status(
+    mql_client: MQLClient, query_id: str, fields: str = STATUS_FIELDS
+) -> MqlQueryStatusResp:
+    """
+    Retrieve the status of an MQL query.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        query_id: The ID of the MQL query.
+        fields: The `mqlQuery` fields to retrieve.
+
+    Returns:
+        An `MqlQueryStatusResp` describing the MQL query.
+    """
+    return get_statuses(mql_client, [query_id], fields=fields)[0]
+
+
+def wait_for_completion(
+    mql_client: MQLClient,
+    query_id: str,
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.1,
+    max_poll_interval: float = 5,
+    timer: Optional[PhaseTimer] = None,
+) -> MqlQueryStatusResp:
+    """
+    Poll the status of an MQL query until it completes.
+    Polls only retrieve the `status` and `error` of the query:
+    the full status is retrieved once, on completion.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        query_id: The ID of the MQL query.
+        timeout: The maximum number of seconds to wait for; `0` waits
+            indefinitely. Defaults to the MQL client default timeout.
+        poll_interval: The number of seconds between the first two polls.
+            The interval grows by 50% after each poll.
+        max_poll_interval: The maximum number of seconds between two polls.
+        timer: If set, the `PhaseTimer` recording the time the query spent
+            `queued` on the server, i.e. polled as pending, and `running`
+            between polls, the time spent `polling` its status, and the time
+            spent on the `fetch` of the full status. Each polled status
+            is counted and marked on the timer.
+
+    Raises:
+        `QueryRuntimeException` if the query does not complete within `timeout`.
+
+    Returns:
+        The full `MqlQueryStatusResp` of the completed MQL query.
+    """
+    timeout = DEFAULT_QUERY_TIMEOUT if timeout is None else timeout
+    last_poll = time.monotonic()
+    deadline = last_poll + timeout
+
+    while timeout == 0 or time.monotonic() < deadline:
+        poll_started = time.monotonic()
+        response = get_status(mql_client, query_id, fields=STATUS_ONLY_FIELDS)
+        if timer is not None:
+            now = time.monotonic()
+            queued = response.status == MqlQueryStatus.PENDING
+            timer.add("queued" if queued else "running", poll_started - last_poll)
+            timer.add("polling", now - poll_started)
+            timer.count("polls")
+            timer.mark(response.status.value)
+            last_poll = now
+        if response.is_complete:
+            if timer is None:
+                return get_status(mql_client, query_id)
+            with timer.phase("fetch"):
+                return get_status(mql_client, query_id)
+        time.sleep(poll_interval)
+        poll_interval = min(max_poll_interval, poll_interval * 1.5)
+
+    msg = (
+        f"Timeout reached waiting for query {query_id} "
+        f"to complete after {timeout} seconds."
+    )
+    raise QueryRuntimeException(query_id, msg)
+
+
+def get_materialization_table(mql_client: MQLClient, query_id: str) -> Tuple[str, str]:
+    """
+    Retrieve the table built by a successful materialization query.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        query_id: The ID of the MQL query building the materialization.
+
+    Returns:
+        The schema and the name of the materialized table.
+    """
+    with trace_span("transform.fetch_table", {"query_id": query_id}):
+        document, variable_values = build_statuses_query(
+            [query_id], fields=MATERIALIZATION_TABLE_FIELDS
+        )
+        data = execute(mql_client, document, variable_values=variable_values)
+    mql_query = data["q0"]
+    return mql_query["resultTableSchema"], mql_query["resultTableName"]
+
+
+def _get_alias_errors(error: TransportQueryError, count: int) -> Dict[int, str]:
+    """
+    Map the GraphQL errors of a batched mutation to the index of their
+    `m<i>` alias; errors without a path are reported for every alias.
+    """
+    errors = {}
+    for item in error.errors or [{"message": str(error)}]:
+        path = item.get("path") or []
+        alias = path[0] if path else None
+        if isinstance(alias, str) and alias[1:].isdigit():
+            indexes = [int(alias[1:])]
+        else:
+            indexes = range(count)
+        for index in indexes:
+            errors.setdefault(index, item.get("message", str(error)))
+    return errors
+
+
+def submit_materializations(
+    mql_client: MQLClient, variables: List[Dict[str, Any]]
+) -> List[str]:
+    """
+    Submit several materializations in a single round-trip.
+    If the MQL server rejects the whole batch without any data, e.g. when
+    the error of one mutation nulls the whole response, the materializations
+    are not submitted again: the mutations before the failing one may have
+    created their materializations, which would be created twice. Each
+    materialization without a query ID is then reported as failed with
+    the errors of the batch.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        variables: The variables of each materialization, keyed by
+            their GraphQL name.
+
+    Raises:
+        `TransformSubmissionException` if any materialization is rejected;
+            the message lists the error of every rejected materialization.
+
+    Returns:
+        The IDs of the MQL queries building the materializations,
+        in the same order as `variables`.
+    """
+    names = [v["materializationName"] for v in variables]
+    with trace_span("transform.submit", {"materialization_name": names}) as span:
+        document, variable_values = build_materializations_mutation(variables)
+        errors = {}
+        batch_error = "no query ID returned"
+        try:
+            data = execute(mql_client, document, variable_values=variable_values)
+        except TransportQueryError as e:
+            data = e.data or {}
+            errors = _get_alias_errors(e, len(variables))
+            batch_error = "; ".join(sorted(set(errors.values())))
+        query_ids = [
+            (data.get(f"m{index}") or {}).get("id") for index in range(len(variables))
+        ]
+        for index, query_id in enumerate(query_ids):
+            if query_id is None and index not in errors:
+                errors[index] = f"batch rejected, may have been created: {batch_error}"
+        set_span_attributes(span, {"query_id": [q for q in query_ids if q]})
+
+    if errors:
+        details = "; ".join(
+            f"{names[index]}: {error}" for index, error in sorted(errors.items())
+        )
+        msg = f"Transform materializations submission failed! Errors are: {details}"
+        raise TransformSubmissionException(msg, errors=errors, query_ids=query_ids)
+    return query_ids
+
+
+def iter_result_pages(mql_client: MQLClient, query_id: str) -> Iterator[bytes]:
+    """
+    Retrieve the result of a successful MQL query one page at a time.
+    A page is only requested once the previous one has been consumed.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        query_id: The ID of the MQL query.
+
+    Yields:
+        Each page of the result, as a JSON document in pandas `table` orient.
+    """
+    cursor = 0
+    while cursor is not None:
+        attributes = {"query_id": query_id, "cursor": cursor}
+        with trace_span("transform.fetch_page", attributes):
+            data = execute(
+                mql_client,
+                RESULT_PAGE_QUERY,
+                variable_values={"queryId": query_id, "cursor": cursor},
+            )
+        tabular = data["mqlQuery"]["resultTabular"]
+        yield base64.b64decode(tabular["data"])
+        cursor = tabular["nextCursor"]
+
+
+def get_catalog_data(
+    mql_client: MQLClient, model_key_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Retrieve the metrics and materializations of a Transform model
+    in a single round-trip.
+
+    Args:
+        mql_client: The `MQLClient` used to reach the MQL server.
+        model_key_id: The unique identifier of the Transform model;
+            `None` targets the current model.
+
+    Returns:
+        The `metrics` and `materializations` GraphQL objects.
+    """
+    return execute(
+        mql_client,
+        CATALOG_QUERY,
+        variable_values={"modelKey": get_model_key_input(mql_client, model_key_id)},
+    )
@@ -0,0 +1,325 @@
+"""Compact and lazy results returned by Transform tasks"""
+from typing import Any, Dict, Iterator, List, Optional
+
+from transform.models import MqlQueryStatus, MqlQueryStatusResp
+
+from prefect_transform.columnar import tables_to_reader
+from prefect_transform.credentials import TransformCredentials
+from prefect_transform.queries import get_status
+
+
+class MaterializationResult:
+    """
+    Compact outcome of a materialization creation.
+
+    Unlike `MqlQueryStatusResp`, it does not carry the generated SQL
+    or the query result, which keeps persisted task results small.
+    Both can be retrieved from the MQL server on demand.
+
+    Args:
+        query_id: The ID of the MQL query building the materialization.
+        status: The status of the MQL query.
+        fully_qualified_name: The `schema_name.table_name` of the materialized
+            table, if the materialization has been created.
+        submitted_at: The UTC timestamp, in seconds since the epoch, at which
+            the materialization was submitted.
+        duration: The number of seconds the task spent creating
+            the materialization.
+        error: The error raised by the MQL query, if any.
+        timings: The number of seconds the task spent in each phase
+            of the creation, keyed by phase name.
+
+    Example:
+        Retrieve the SQL of a materialization
+        ```python
+        result = create_materialization(
+            credentials=credentials,
+            materialization_name="<name of the materialization>",
+            return_mode="compact",
+        )
+        sql = result.fetch_sql(credentials)
+        ```
+    """
+
+    __slots__ = (
+        "query_id",
+        "status",
+        "fully_qualified_name",
+        "submitted_at",
+        "duration",
+        "error",
+        "timings",
+    )
+
+    def __init__(
+        self,
+        query_id: str,
+        status: MqlQueryStatus,
+        fully_qualified_name: Optional[str] = None,
+        submitted_at: Optional[float] = None,
+        duration: Optional[float] = None,
+        error: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Initialize the result; see the class docstring for the arguments.
+        """
+        self.query_id = query_id
+        self.status = status
+        self.fully_qualified_name = fully_qualified_name
+        self.submitted_at = submitted_at
+        self.duration = duration
+        self.error = error
+        self.timings = timings
+
+    def __repr__(self) -> str:
+        """
+        Represent the result by its non-empty fields.
+        """
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in self.__slots__
+            if getattr(self, name) is not None
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Compare results field by field.
+        """
+        if not isinstance(other, MaterializationResult):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether the MQL query has completed its execution.
+        """
+        return self.status in (
+            MqlQueryStatus.SUCCESSFUL,
+            MqlQueryStatus.FAILED,
+            MqlQueryStatus.UNHANDLED_EXCEPTION,
+        )
+
+    @property
+    def is_successful(self) -> bool:
+        """
+        Whether the MQL query has completed successfully.
+        """
+        return self.status == MqlQueryStatus.SUCCESSFUL
+
+    @property
+    def is_failed(self) -> bool:
+        """
+        Whether the MQL query has failed.
+        """
+        return self.status in (
+            MqlQueryStatus.FAILED,
+            MqlQueryStatus.UNHANDLED_EXCEPTION,
+        )
+
+    def fetch_status(self, credentials: TransformCredentials) -> MqlQueryStatusResp:
+        """
+        Retrieve the full status of the MQL query from the MQL server.
+
+        Args:
+            credentials: `TransformCredentials` object used to obtain a client to
+                interact with Transform.
+
+        Returns:
+            The `MqlQueryStatusResp` of the MQL query.
+        """
+        return get_status(credentials.get_client(), self.query_id)
+
+    def fetch_sql(self, credentials: TransformCredentials) -> Optional[str]:
+        """
+        Retrieve the SQL generated by the MQL server for the materialization.
+
+        Args:
+            credentials: `TransformCredentials` object used to obtain a client to
+                interact with Transform.
+
+        Returns:
+            The SQL of the MQL query.
+        """
+        return self.fetch_status(credentials).sql
+
+
+class ChunkedResult:
+    """
+    Result of a metrics query, retrieved lazily one chunk at a time.
+
+    The chunks can be iterated over once. `ChunkedResult` is not an iterator
+    on purpose: Prefect collects the items of iterators returned by tasks,
+    which would retrieve the whole result as soon as the task returns.
+
+    Args:
+        chunks: The iterator producing the chunks.
+
+    Example:
+        Stream a metrics query as Arrow record batches
+        ```python
+        chunks = query_metrics(
+            credentials=credentials,
+            metrics=["revenue"],
+            chunk_size=10_000,
+            output_format="arrow",
+        )
+        reader = chunks.to_reader()
+        ```
+    """
+
+    def __init__(self, chunks: Iterator[Any]) -> None:
+        """
+        Initialize the result; see the class docstring for the arguments.
+        """
+        self._chunks = chunks
+        self._consumed = False
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterate over the chunks.
+
+        Raises:
+            `RuntimeError` if the chunks have already been iterated over.
+        """
+        if self._consumed:
+            raise RuntimeError("The chunks of the result have already been consumed")
+        self._consumed = True
+        return self._chunks
+
+    def to_reader(self):
+        """
+        Expose chunks of `pyarrow.Table` objects as a `pyarrow.RecordBatchReader`.
+
+        Returns:
+            A `pyarrow.RecordBatchReader` over the rows of every chunk.
+        """
+        return tables_to_reader(self)
+
+
+class ExportResult:
+    """
+    Outcome of a metrics export.
+
+    Args:
+        path: The path of the exported file.
+        file_format: The format of the exported file, `parquet` or `csv`.
+        rows: The number of rows written.
+        bytes_written: The size of the exported file, in bytes.
+        duration: The number of seconds the task spent querying the metrics
+            and writing the file.
+    """
+
+    __slots__ = ("path", "file_format", "rows", "bytes_written", "duration")
+
+    def __init__(
+        self,
+        path: str,
+        file_format: str,
+        rows: int,
+        bytes_written: int,
+        duration: float,
+    ) -> None:
+        """
+        Initialize the result; see the class docstring for the arguments.
+        """
+        self.path = path
+        self.file_format = file_format
+        self.rows = rows
+        self.bytes_written = bytes_written
+        self.duration = duration
+
+    def __repr__(self) -> str:
+        """
+        Represent the result by its fields.
+        """
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        The number of rows exported per second.
+        """
+        return self.rows / self.duration if self.duration else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        The number of bytes written per second.
+        """
+        return self.bytes_written / self.duration if self.duration else 0.0
+
+
+class MaterializationPreview:
+    """
+    Preview of a materialization: what the materialization computes and
+    the metrics SQL the MQL server compiled for its metrics and dimensions,
+    retrieved via a zero-row query run on the warehouse. This is not the
+    SQL the MQL server runs to write the materialization table, nor an
+    execution plan.
+
+    Args:
+        materialization_name: The name of the materialization.
+        sql: The metrics SQL compiled by the MQL server for the metrics and
+            dimensions of the materialization.
+        metrics: The metrics computed by the materialization.
+        dimensions: The dimensions the metrics are grouped by.
+        model_key_id: The unique identifier of the Transform model.
+        start_time: The UTC start time of the materialization.
+        end_time: The UTC end time of the materialization.
+        output_table: The table the materialization would be written to.
+        cached: Whether the SQL was retrieved from the compiled SQL cache.
+    """
+
+    __slots__ = (
+        "materialization_name",
+        "sql",
+        "metrics",
+        "dimensions",
+        "model_key_id",
+        "start_time",
+        "end_time",
+        "output_table",
+        "cached",
+    )
+
+    def __init__(
+        self,
+        materialization_name: str,
+        sql: Optional[str],
+        metrics: List[str],
+        dimensions: List[str],
+        model_key_id: Optional[int] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        output_table: Optional[str] = None,
+        cached: bool = False,
+    ) -> None:
+        """
+        Initialize the preview; see the class docstring for the arguments.
+        """
+        self.materialization_name = materialization_name
+        self.sql = sql
+        self.metrics = metrics
+        self.dimensions = dimensions
+        self.model_key_id = model_key_id
+        self.start_time = start_time
+        self.end_time = end_time
+        self.output_table = output_table
+        self.cached = cached
+
+    def __repr__(self) -> str:
+        """
+        Represent the preview by its non-empty fields, except the SQL.
+        """
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in self.__slots__
+            if name != "sql" and getattr(self, name) is not None
+        )
+        return f"{type(self).__name__}({fields})"
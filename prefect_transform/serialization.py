@@ -0,0 +1,88 @@
+"""JSON encoders and decoders used to exchange payloads with the MQL server"""
+import json
+from typing import Any, Callable, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+JSON_LIBRARIES = ("auto", "orjson", "msgspec", "json")
+
+JsonDecoder = Callable[[Union[str, bytes]], Any]
+JsonEncoder = Callable[[Any], bytes]
+
+
+def _resolve_library(library: str) -> str:
+    """
+    Resolve `auto` to the fastest installed JSON library and check
+    that the requested library is installed.
+    """
+    if library not in JSON_LIBRARIES:
+        raise ValueError(
+            f"Invalid JSON library {library!r}, expected one of {JSON_LIBRARIES}"
+        )
+
+    if library == "auto":
+        if orjson is not None:
+            return "orjson"
+        if msgspec is not None:
+            return "msgspec"
+        return "json"
+
+    if library == "orjson" and orjson is None:
+        raise ImportError("orjson is required, install it with `pip install orjson`")
+    if library == "msgspec" and msgspec is None:
+        raise ImportError("msgspec is required, install it with `pip install msgspec`")
+    return library
+
+
+def get_json_decoder(library: str = "auto") -> JsonDecoder:
+    """
+    Return a function decoding JSON documents.
+
+    Args:
+        library: The JSON library to use: `orjson`, `msgspec`, `json`,
+            or `auto` to use the fastest installed one. Defaults to `auto`.
+
+    Raises:
+        `ValueError` if `library` is not supported.
+        `ImportError` if `library` is not installed.
+
+    Returns:
+        A function decoding a `str` or `bytes` JSON document.
+    """
+    library = _resolve_library(library)
+    if library == "orjson":
+        return orjson.loads
+    if library == "msgspec":
+        return msgspec.json.decode
+    return json.loads
+
+
+def get_json_encoder(library: str = "auto") -> JsonEncoder:
+    """
+    Return a function encoding objects as UTF-8 JSON documents.
+
+    Args:
+        library: The JSON library to use: `orjson`, `msgspec`, `json`,
+            or `auto` to use the fastest installed one. Defaults to `auto`.
+
+    Raises:
+        `ValueError` if `library` is not supported.
+        `ImportError` if `library` is not installed.
+
+    Returns:
+        A function encoding an object as `bytes`.
+    """
+    library = _resolve_library(library)
+    if library == "orjson":
+        return orjson.dumps
+    if library == "msgspec":
+        return msgspec.json.encode
+    return lambda obj: json.dumps(obj).encode("utf-8")
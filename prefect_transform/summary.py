@@ -0,0 +1,331 @@
+"""Throughput and efficiency summary of the materializations of a flow run"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+from prefect.artifacts import create_markdown_artifact
+from prefect.context import FlowRunContext, TaskRunContext
+
+from prefect_transform.instrumentation import MetricsSink
+
+
+class MaterializationRun(NamedTuple):
+    """
+    Outcome of a `create_materialization` task run.
+    """
+
+    materialization_name: str
+    query_id: Optional[str]
+    outcome: str
+    started_at: float
+    duration: float
+    polls: int
+
+
+def _current_flow_run_id() -> Optional[str]:
+    """
+    ID of the flow run of the current Prefect task or flow run, if any.
+    """
+    task_run_context = TaskRunContext.get()
+    if task_run_context is not None:
+        return str(task_run_context.task_run.flow_run_id)
+    flow_run_context = FlowRunContext.get()
+    if flow_run_context is not None:
+        return str(flow_run_context.flow_run.id)
+    return None
+
+
+class FlowRunStatistics:
+    """
+    Aggregated outcomes of the materializations of a flow run.
+
+    Args:
+        flow_run_id: The ID of the flow run.
+    """
+
+    __slots__ = (
+        "flow_run_id",
+        "runs",
+        "retries",
+        "cache_hits",
+        "cache_misses",
+        "updated_at",
+    )
+
+    def __init__(self, flow_run_id: str) -> None:
+        """
+        Initialize empty statistics; see the class docstring for the arguments.
+        """
+        self.flow_run_id = flow_run_id
+        self.runs: List[MaterializationRun] = []
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # monotonic time of the last update
+        self.updated_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        """
+        Represent the statistics by their flow run and number of runs.
+        """
+        return (
+            f"{type(self).__name__}(flow_run_id={self.flow_run_id!r}, "
+            f"runs={len(self.runs)})"
+        )
+
+    @property
+    def failures(self) -> int:
+        """
+        The number of materializations that failed.
+        """
+        return sum(run.outcome != "success" for run in self.runs)
+
+    @property
+    def serial_time(self) -> float:
+        """
+        The number of seconds the materializations would take one at a time.
+        """
+        return sum(run.duration for run in self.runs)
+
+    @property
+    def wall_time(self) -> float:
+        """
+        The number of seconds between the start of the first materialization
+        and the end of the last one.
+        """
+        if not self.runs:
+            return 0.0
+        started_at = min(run.started_at for run in self.runs)
+        return max(run.started_at + run.duration for run in self.runs) - started_at
+
+    @property
+    def parallelism(self) -> float:
+        """
+        The average number of materializations running at the same time.
+        """
+        return self.serial_time / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def polls_per_query(self) -> float:
+        """
+        The average number of status polls per submitted query.
+        """
+        submitted = [run for run in self.runs if run.query_id is not None]
+        if not submitted:
+            return 0.0
+        return sum(run.polls for run in submitted) / len(submitted)
+
+    def slowest(self, count: int = 5) -> List[MaterializationRun]:
+        """
+        Return the slowest materializations, slowest first.
+
+        Args:
+            count: The number of materializations to return.
+
+        Returns:
+            The `MaterializationRun` of the slowest materializations.
+        """
+        return sorted(self.runs, key=lambda run: run.duration, reverse=True)[:count]
+
+    def to_markdown(self, top: int = 5) -> str:
+        """
+        Render the statistics as a markdown report.
+
+        Args:
+            top: The number of slowest materializations to list.
+
+        Returns:
+            The totals and the slowest materializations of the flow run.
+        """
+        lines = [
+            "# Transform materializations summary",
+            "",
+            "| Metric | Value |",
+            "|:---|---:|",
+            f"| Materializations | {len(self.runs)} |",
+            f"| Failures | {self.failures} |",
+            f"| Serial time (s) | {self.serial_time:.3f} |",
+            f"| Wall time (s) | {self.wall_time:.3f} |",
+            f"| Parallelism | {self.parallelism:.2f} |",
+            f"| Polls per query | {self.polls_per_query:.2f} |",
+            f"| Retries | {self.retries} |",
+            f"| Cache hits | {self.cache_hits} |",
+            f"| Cache misses | {self.cache_misses} |",
+        ]
+        if self.runs:
+            lines += [
+                "",
+                "| Materialization | Query | Outcome | Duration (s) | Polls |",
+                "|:---|:---|:---|---:|---:|",
+            ]
+            lines += [
+                f"| {run.materialization_name} | {run.query_id or ''} "
+                f"| {run.outcome} | {run.duration:.3f} | {run.polls} |"
+                for run in self.slowest(top)
+            ]
+        return "\n".join(lines)
+
+
+class FlowRunSummary(MetricsSink):
+    """
+    Sink aggregating the outcomes of the `create_materialization` task runs
+    of each flow run, with the retries and cache lookups of their tasks,
+    and publishing them as one Prefect markdown artifact per flow run.
+
+    The statistics of a flow run are kept until they are published, or
+    until they are evicted: once not updated for `ttl` seconds, or when
+    more than `max_flow_runs` flow runs are aggregated, least recently
+    updated first, e.g. for flow runs that crashed before publishing them.
+
+    Args:
+        artifact_key: The key of the published artifacts.
+        max_flow_runs: The maximum number of flow runs aggregated at once.
+        ttl: The number of seconds after which the statistics of a flow run
+            that is no longer updated are dropped.
+
+    Example:
+        Summarize the materializations of a flow
+        ```python
+        from prefect import flow
+        from prefect_transform.instrumentation import register_metrics_sink
+        from prefect_transform.summary import FlowRunSummary
+        from prefect_transform.tasks import create_materialization
+
+        summary = FlowRunSummary()
+        register_metrics_sink(summary)
+
+
+        @flow
+        def nightly_materializations(names):
+            futures = [
+                create_materialization.submit(
+                    credentials=credentials, materialization_name=name
+                )
+                for name in names
+            ]
+            for future in futures:
+                future.wait()
+            summary.publish()
+        ```
+    """
+
+    def __init__(
+        self,
+        artifact_key: str = "transform-materializations-summary",
+        max_flow_runs: int = 100,
+        ttl: float = 24 * 3600,
+    ):
+        """
+        Initialize the sink; see the class docstring for the arguments.
+        """
+        self.artifact_key = artifact_key
+        self.max_flow_runs = max_flow_runs
+        self.ttl = ttl
+        # least recently updated first
+        self._statistics: "OrderedDict[str, FlowRunStatistics]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_statistics(self) -> Optional[FlowRunStatistics]:
+        """
+        Statistics of the current flow run, created on first use and marked
+        as updated, evicting stale statistics.
+        """
+        flow_run_id = _current_flow_run_id()
+        if flow_run_id is None:
+            return None
+
+        now = time.monotonic()
+        statistics = self._statistics.pop(flow_run_id, None)
+        if statistics is None:
+            statistics = FlowRunStatistics(flow_run_id)
+        statistics.updated_at = now
+        self._statistics[flow_run_id] = statistics
+
+        while len(self._statistics) > self.max_flow_runs:
+            self._statistics.popitem(last=False)
+        while now - next(iter(self._statistics.values())).updated_at > self.ttl:
+            self._statistics.popitem(last=False)
+        return statistics
+
+    def record(
+        self, operation: str, timings: Dict[str, float], tags: Dict[str, str]
+    ) -> None:
+        """
+        Add a materialization to the statistics of the current flow run;
+        see `MetricsSink.record`.
+        """
+        if operation != "create_materialization":
+            return
+
+        duration = sum(timings.values())
+        run = MaterializationRun(
+            materialization_name=tags["materialization_name"],
+            query_id=tags.get("query_id"),
+            outcome=tags.get("outcome", "failure"),
+            started_at=time.time() - duration,
+            duration=duration,
+            polls=int(tags.get("polls", 0)),
+        )
+        with self._lock:
+            statistics = self._get_statistics()
+            if statistics is not None:
+                statistics.runs.append(run)
+
+    def increment(
+        self, name: str, value: float = 1, tags: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Count the retries and cache lookups of the current flow run;
+        see `MetricsSink.increment`.
+        """
+        if name not in ("retries", "cache_hits", "cache_misses"):
+            return
+        with self._lock:
+            statistics = self._get_statistics()
+            if statistics is not None:
+                setattr(statistics, name, getattr(statistics, name) + int(value))
+
+    def get(self, flow_run_id: Optional[str] = None) -> Optional[FlowRunStatistics]:
+        """
+        Return the statistics of a flow run.
+
+        Args:
+            flow_run_id: The ID of the flow run; defaults to the current one.
+
+        Returns:
+            The `FlowRunStatistics`, or `None` if the flow run has not run
+                any materialization.
+        """
+        flow_run_id = flow_run_id or _current_flow_run_id()
+        with self._lock:
+            return self._statistics.get(flow_run_id)
+
+    def publish(
+        self, flow_run_id: Optional[str] = None, top: int = 5
+    ) -> Optional[FlowRunStatistics]:
+        """
+        Publish the statistics of a flow run as a markdown artifact, and stop
+        aggregating them. Call it from the flow, once its materializations
+        have completed.
+
+        Args:
+            flow_run_id: The ID of the flow run; defaults to the current one.
+            top: The number of slowest materializations to list.
+
+        Returns:
+            The published `FlowRunStatistics`, or `None` if the flow run
+                has not run any materialization.
+        """
+        flow_run_id = flow_run_id or _current_flow_run_id()
+        with self._lock:
+            statistics = self._statistics.pop(flow_run_id, None)
+        if statistics is None:
+            return None
+
+        create_markdown_artifact(
+            markdown=statistics.to_markdown(top),
+            key=self.artifact_key,
+            description="Throughput and efficiency of the Transform materializations",
+        )
+        return statistics
@@ -1,12 +1,364 @@
 """Collection of tasks to interact with Transform metrics catalog"""
-from typing import Optional, Union
+import io
+import itertools
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
 
-from prefect import task
+import fsspec
+import pandas as pd
+from prefect import get_run_logger, task
+from transform import MQLClient
 from transform.exceptions import QueryRuntimeException
-from transform.models import MqlMaterializeResp, MqlQueryStatusResp
+from transform.models import MqlMaterializeResp, MqlQueryStatus, MqlQueryStatusResp
 
+from prefect_transform.cache import QueryResultCache, query_cache_key
+from prefect_transform.catalog import Catalog
+from prefect_transform.columnar import (
+    collect_tables,
+    concat_tables,
+    conform_tables,
+    iter_chunks,
+    page_to_table,
+    require_pyarrow,
+    write_tables,
+)
+from prefect_transform.compilation import (
+    get_compiled_sql,
+    put_compiled_sql,
+    strip_zero_limit,
+)
 from prefect_transform.credentials import TransformCredentials
-from prefect_transform.exceptions import TransformRuntimeException
+from prefect_transform.exceptions import (
+    TransformConfigurationException,
+    TransformRuntimeException,
+    TransformSubmissionException,
+)
+from prefect_transform.executors import MaterializationExecutor
+from prefect_transform.instrumentation import (
+    PhaseTimer,
+    publish_increment,
+    publish_timings,
+    set_span_attributes,
+    task_run_attributes,
+    trace_span,
+)
+from prefect_transform.planner import plan_queries, split_result
+from prefect_transform.profiling import profiling
+from prefect_transform.queries import (
+    STATUS_ONLY_FIELDS,
+    get_materialization_table,
+    get_model_key_input,
+    get_status,
+    get_statuses,
+    iter_result_pages,
+    submit_materializations,
+    wait_for_completion,
+)
+from prefect_transform.results import (
+    ChunkedResult,
+    ExportResult,
+    MaterializationPreview,
+    MaterializationResult,
+)
+from prefect_transform.validation import OUTPUT_TABLE_PATTERN, validate_materialization
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+RETURN_MODES = ("full", "compact")
+OUTPUT_FORMATS = ("pandas", "arrow")
+FILE_FORMATS = ("parquet", "csv")
+
+# query ID reported for materializations run by a `MaterializationExecutor`
+LOCAL_QUERY_ID = "local"
+
+
+def _get_materialization_variables(
+    mql_client,
+    model_keys: Dict[int, Optional[Dict[str, Any]]],
+    materialization_name: str,
+    model_key_id: Optional[int] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    output_table: Optional[str] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build the GraphQL variables of a materialization, resolving each
+    distinct `model_key_id` once.
+    """
+    if model_key_id not in model_keys:
+        model_keys[model_key_id] = get_model_key_input(mql_client, model_key_id)
+
+    return {
+        "materializationName": materialization_name,
+        "startTime": start_time,
+        "endTime": end_time,
+        "modelKey": model_keys[model_key_id],
+        "outputTable": output_table,
+        "force": force,
+    }
+
+
+def _validate_materialization(
+    credentials: TransformCredentials,
+    catalogs: Dict[Optional[int], Catalog],
+    materialization_name: Optional[str],
+    model_key_id: Optional[int] = None,
+    output_table: Optional[str] = None,
+) -> List[str]:
+    """
+    Check a materialization against the catalog of its Transform model,
+    retrieving each distinct catalog once.
+    """
+    if model_key_id not in catalogs:
+        catalogs[model_key_id] = credentials.get_catalog(model_key_id)
+
+    return validate_materialization(
+        catalogs[model_key_id], materialization_name, output_table=output_table
+    )
+
+
+def _get_materialization_sql(
+    credentials: TransformCredentials,
+    materialization_name: str,
+    model_key_id: Optional[int] = None,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    output_table: Optional[str] = None,
+) -> MaterializationPreview:
+    """
+    Retrieve the compiled metrics SQL of a materialization via a zero-row
+    query: unless cached, a `LIMIT 0` query over its metrics and dimensions
+    is submitted to the MQL server, which compiles and runs it on the
+    warehouse, and the SQL is read from its status once it completes.
+    The MQL server has no compile-only operation: the query cannot be
+    compiled without being run.
+    """
+    catalog = credentials.get_catalog(model_key_id)
+    materialization = catalog.get_materialization(materialization_name)
+    if materialization is None:
+        msg = f"Unknown materialization {materialization_name!r}"
+        raise TransformConfigurationException(msg)
+
+    # the model commit keeps SQL compiled for a previous model version apart
+    key = (
+        credentials.mql_server_url,
+        materialization_name,
+        model_key_id,
+        catalog.version,
+        start_time,
+        end_time,
+    )
+    sql = get_compiled_sql(key)
+    cached = sql is not None
+    if not cached:
+        mql_client = credentials.get_client()
+        try:
+            query_id = mql_client.create_query(
+                metrics=materialization["metrics"],
+                dimensions=materialization["dimensions"],
+                model_key_id=model_key_id,
+                start_time=start_time,
+                end_time=end_time,
+                limit="0",
+            ).query_id
+        except Exception as e:
+            msg = f"Transform materialization compilation failed! Error is: {e}"
+            raise TransformRuntimeException(msg) from e
+        try:
+            status = wait_for_completion(mql_client, query_id)
+        except QueryRuntimeException as e:
+            msg = f"Transform materialization compilation failed! Error is: {e.msg}"
+            raise TransformRuntimeException(msg)
+        if status.sql is None:
+            msg = (
+                "Transform materialization compilation failed! "
+                f"Error is: {status.error}"
+            )
+            raise TransformRuntimeException(msg)
+        sql = strip_zero_limit(status.sql)
+        put_compiled_sql(key, sql)
+
+    return MaterializationPreview(
+        materialization_name=materialization_name,
+        sql=sql,
+        metrics=materialization["metrics"],
+        dimensions=materialization["dimensions"],
+        model_key_id=model_key_id,
+        start_time=start_time,
+        end_time=end_time,
+        output_table=output_table or materialization["destination_table"],
+        cached=cached,
+    )
+
+
+def _create_materialization(
+    credentials: TransformCredentials,
+    timer: PhaseTimer,
+    tags: Dict[str, str],
+    materialization_name: str,
+    model_key_id: Optional[int],
+    start_time: Optional[str],
+    end_time: Optional[str],
+    output_table: Optional[str],
+    force: bool,
+    wait_for_creation: Optional[bool],
+    return_mode: str,
+    validate: bool,
+    preview_sql: bool,
+    executor: Optional[MaterializationExecutor],
+    sql: Optional[str],
+) -> Union[
+    MqlMaterializeResp,
+    MqlQueryStatusResp,
+    MaterializationResult,
+    MaterializationPreview,
+]:
+    """
+    Create a materialization, timing each phase with `timer`
+    and adding its `query_id` to `tags`; see `create_materialization`.
+    """
+    started = time.monotonic()
+    submitted_at = time.time()
+    use_async = not wait_for_creation
+    if validate:
+        with timer.phase("validation"):
+            errors = _validate_materialization(
+                credentials, {}, materialization_name, model_key_id, output_table
+            )
+        if errors:
+            msg = f"Invalid materialization! Errors are: {'; '.join(errors)}"
+            raise TransformConfigurationException(msg)
+    if preview_sql or executor is not None:
+        if sql is None:
+            with timer.phase("compilation"):
+                preview = _get_materialization_sql(
+                    credentials,
+                    materialization_name,
+                    model_key_id=model_key_id,
+                    start_time=start_time,
+                    end_time=end_time,
+                    output_table=output_table,
+                )
+            if preview_sql:
+                return preview
+            sql, output_table = preview.sql, preview.output_table
+
+        output_table = output_table or f"main.{materialization_name}"
+        if not OUTPUT_TABLE_PATTERN.match(output_table):
+            msg = (
+                f"Invalid materialization! Errors are: invalid output_table "
+                f"{output_table!r}, expected the form schema_name.table_name"
+            )
+            raise TransformConfigurationException(msg)
+        schema, table = output_table.split(".", 1)
+        with timer.phase("execution"):
+            try:
+                executor.execute(sql, schema, table)
+            except Exception as e:
+                msg = (
+                    "Transform materialization local execution failed! "
+                    f"Error is: {e}"
+                )
+                raise TransformRuntimeException(msg) from e
+        response = MqlMaterializeResp(
+            schema=schema, table=table, query_id=LOCAL_QUERY_ID
+        )
+        if return_mode == "compact":
+            return MaterializationResult(
+                query_id=LOCAL_QUERY_ID,
+                status=MqlQueryStatus.SUCCESSFUL,
+                fully_qualified_name=response.fully_qualified_name,
+                submitted_at=submitted_at,
+                duration=time.monotonic() - started,
+                timings=dict(timer.timings),
+            )
+        return response
+    with timer.phase("client"):
+        mql_client = credentials.get_client()
+
+    with timer.phase("submission"):
+        variables = _get_materialization_variables(
+            mql_client,
+            {},
+            materialization_name=materialization_name,
+            model_key_id=model_key_id,
+            start_time=start_time,
+            end_time=end_time,
+            output_table=output_table,
+            force=force,
+        )
+        query_id = submit_materializations(mql_client, [variables])[0]
+    tags["query_id"] = query_id
+    timer.mark("SUBMITTED")
+    publish_increment("submissions", 1, {"operation": "create_materialization"})
+
+    response = None
+    fully_qualified_name = None
+    if use_async:
+        with timer.phase("status"):
+            status = get_status(mql_client, query_id, fields=STATUS_ONLY_FIELDS)
+            if status.is_complete:
+                status = get_status(mql_client, query_id)
+        timer.count("polls")
+        timer.mark(status.status.value)
+        if status.is_failed:
+            msg = f"""
+            Transform materialization async creation failed! Error is: {status.error}
+            """
+            raise TransformRuntimeException(msg)
+        response = status
+    else:
+        try:
+            status = wait_for_completion(mql_client, query_id, timer=timer)
+        except QueryRuntimeException as e:
+            msg = f"Transform materialization sync creation failed! Error is: {e.msg}"
+            raise TransformRuntimeException(msg)
+        if not status.is_successful:
+            msg = (
+                "Transform materialization sync creation failed! "
+                f"Error is: {status.error}"
+            )
+            raise TransformRuntimeException(msg)
+
+        with timer.phase("result"):
+            schema, table = get_materialization_table(mql_client, query_id)
+        response = MqlMaterializeResp(schema=schema, table=table, query_id=query_id)
+        fully_qualified_name = response.fully_qualified_name
+
+    if return_mode == "compact":
+        return MaterializationResult(
+            query_id=query_id,
+            status=status.status,
+            fully_qualified_name=fully_qualified_name,
+            submitted_at=submitted_at,
+            duration=time.monotonic() - started,
+            error=status.error,
+            timings=dict(timer.timings),
+        )
+
+    return response
+
+
+def _report_timings(timer: PhaseTimer, tags: Dict[str, str]) -> None:
+    """
+    Log the phase timings of a materialization and publish them
+    to the registered metrics sinks.
+    """
+    if timer.marks:
+        tags["status_history"] = ",".join(
+            f"{status}:{seconds:.3f}" for status, seconds in timer.marks
+        )
+    tags["polls"] = str(timer.counts.get("polls", 0))
+    timings = {name: round(seconds, 6) for name, seconds in timer.timings.items()}
+    get_run_logger().info(
+        "Materialization %r phase timings: %s",
+        tags["materialization_name"],
+        ", ".join(f"{name}={seconds:.3f}s" for name, seconds in timings.items()),
+        extra={**tags, "timings": timings},
+    )
+    publish_timings("create_materialization", timer.timings, tags)
 
 
 @task
@@ -19,7 +371,18 @@ def create_materialization(
     output_table: Optional[str] = None,
     force: bool = False,
     wait_for_creation: Optional[bool] = True,
-) -> Union[MqlMaterializeResp, MqlQueryStatusResp]:
+    return_mode: str = "full",
+    validate: bool = False,
+    preview_sql: bool = False,
+    executor: Optional[MaterializationExecutor] = None,
+    sql: Optional[str] = None,
+    profile: Optional[bool] = None,
+) -> Union[
+    MqlMaterializeResp,
+    MqlQueryStatusResp,
+    MaterializationResult,
+    MaterializationPreview,
+]:
     """
     Task to create a materialization against a Transform metrics layer
     deployment.
@@ -27,6 +390,19 @@ def create_materialization(
     for more information.
     This task uses [Transform official MQL Client](https://pypi.org/project/transform/)
     under the hood.
+    The seconds spent in each phase of the task (`validation`, `compilation`,
+    `client`, `submission`, `status`, `queued`, `running`, `polling`, `fetch`,
+    `result`, `execution`) are logged, published to the registered metrics sinks
+    as the `create_materialization` operation, with the `submissions`
+    and `in_flight` counters, and attached to
+    `MaterializationResult.timings` in `compact` mode. The published tags
+    hold the `mode` of the run (`sync`, `async`, `preview` or `local`),
+    the `query_id` and the `status_history` of the materialization,
+    as comma-separated `<status>:<seconds since the task started>` items,
+    and the number of status `polls`.
+    If OpenTelemetry is installed, the task is traced as a
+    `create_materialization` span, identifying the Prefect task run,
+    whose children trace each interaction with the MQL server.
 
     Args:
         credentials: `TransformCredentials` object used to obtain a client to
@@ -43,16 +419,61 @@ def create_materialization(
             or not. Defaults to `False`.
         wait_for_creation: Whether to wait for the materialization
             creation or not. Defaults to `True`.
+        return_mode: `full` to return the response of the MQL server,
+            `compact` to return a `MaterializationResult` holding only
+            the query ID, status, timing and table name of the
+            materialization. Defaults to `full`.
+        validate: Whether to check `materialization_name` against the cached
+            catalog of the Transform model, and the format of `output_table`,
+            before submitting the materialization. Loading the catalog takes
+            an extra request to the MQL server. Defaults to `False`.
+        preview_sql: Whether to return the compiled metrics SQL of the
+            materialization instead of creating it. This is not a dry run:
+            the MQL server cannot compile a query without running it, so the
+            SQL is retrieved via a zero-row query, a `LIMIT 0` query over the
+            metrics, dimensions and time window of the materialization,
+            submitted to the MQL server and run on the warehouse, a full
+            round trip that writes no table. The SQL, stripped of its
+            zero-row limit, is the metrics query of the materialization,
+            not the SQL that writes its table, and is cached per
+            materialization, model and window. Defaults to `False`.
+        executor: If set, the compiled metrics SQL is retrieved as with
+            `preview_sql`, then run by this `MaterializationExecutor`, e.g.
+            a local `DuckDBExecutor`, instead of the warehouse. The table
+            defaults to `main.<materialization_name>` if the materialization
+            has no destination table. The MQL server and the warehouse are
+            still required, for the catalog and the zero-row query,
+            unless `sql` is set.
+        sql: The SQL run by `executor` instead of the compiled metrics SQL
+            of the materialization, e.g. saved from a `preview_sql` run.
+            The materialization then runs without any request to the MQL
+            server, unless `validate` is `True`.
+        profile: Whether to profile the task with `cProfile`, saving the
+            profile to a file and its top functions by cumulative time to
+            a Prefect artifact; see `profiling.profiling`. Defaults to the
+            `PREFECT_TRANSFORM_PROFILE` environment variable.
 
     Raises:
-        `TransformConfigurationException` if `materialization_name` is missing.
+        `ValueError` if `return_mode` is neither `full` nor `compact`,
+            or if `sql` is set without `executor` or with `preview_sql`.
+        `TransformConfigurationException` if `validate` is `True` and
+            `materialization_name` is missing or unknown, or `output_table`
+            is not in the form of `schema_name.table_name`; also raised if
+            the materialization is unknown to `preview_sql` or `executor`,
+            or if the output table of `executor` has no schema.
         `TransformAuthException` if the connection with the Transform
             server cannot be established.
-        `TransformRuntimeException` if the materialization creation process fails.
+        `TransformRuntimeException` if the materialization creation process
+            fails, including the execution of its SQL by `executor`.
 
     Returns:
-        An `MqlQueryStatusResp` object if `run_async` is `True`.
-        An `MqlMaterializeResp` object if `run_async` is `False`.
+        An `MqlQueryStatusResp` object if `wait_for_creation` is `False`.
+            Only its `status` and `error` are populated
+            while the materialization is still running.
+        An `MqlMaterializeResp` object if `wait_for_creation` is `True`.
+        A `MaterializationResult` object if `return_mode` is `compact`.
+        A `MaterializationPreview` object holding the compiled metrics SQL
+            if `preview_sql` is `True`.
 
     Example:
     ```python
@@ -74,36 +495,651 @@ def create_materialization(
     trigger_materialization_creation()
     ```
     """
-    use_async = not wait_for_creation
-    mql_client = credentials.get_client()
-
-    response = None
-    if use_async:
-        response = mql_client.create_materialization(
-            materialization_name=materialization_name,
-            start_time=start_time,
-            end_time=end_time,
-            model_key_id=model_key_id,
-            output_table=output_table,
-            force=force,
+    if return_mode not in RETURN_MODES:
+        raise ValueError(
+            f"Invalid return_mode {return_mode!r}, expected one of {RETURN_MODES}"
         )
-        if response.is_failed:
-            msg = f"""
-            Transform materialization async creation failed! Error is: {response.error}
-            """
-            raise TransformRuntimeException(msg)
+
+    if sql is not None and (executor is None or preview_sql):
+        raise ValueError("sql is only run by an executor, without preview_sql")
+
+    if preview_sql:
+        mode = "preview"
+    elif executor is not None:
+        mode = "local"
     else:
-        try:
-            response = mql_client.materialize(
+        mode = "sync" if wait_for_creation else "async"
+    timer = PhaseTimer()
+    tags = {
+        "materialization_name": materialization_name,
+        "mode": mode,
+        "outcome": "failure",
+    }
+    attributes = {
+        "materialization_name": materialization_name,
+        "model_key_id": model_key_id,
+        **task_run_attributes(),
+    }
+    publish_increment("in_flight", 1, {"operation": "create_materialization"})
+    try:
+        with profiling("create_materialization", enabled=profile), trace_span(
+            "create_materialization", attributes
+        ) as span:
+            result = _create_materialization(
+                credentials,
+                timer,
+                tags,
                 materialization_name=materialization_name,
+                model_key_id=model_key_id,
                 start_time=start_time,
                 end_time=end_time,
-                model_key_id=model_key_id,
                 output_table=output_table,
                 force=force,
+                wait_for_creation=wait_for_creation,
+                return_mode=return_mode,
+                validate=validate,
+                preview_sql=preview_sql,
+                executor=executor,
+                sql=sql,
             )
-        except QueryRuntimeException as e:
-            msg = f"Transform materialization sync creation failed! Error is: {e.msg}"
-            raise TransformRuntimeException(msg)
+            set_span_attributes(
+                span,
+                {
+                    "query_id": getattr(result, "query_id", None),
+                    "status": getattr(result, "status", None),
+                },
+            )
+        tags["outcome"] = "success"
+        return result
+    except Exception as e:
+        tags["exception"] = type(e).__name__
+        raise
+    finally:
+        publish_increment("in_flight", -1, {"operation": "create_materialization"})
+        _report_timings(timer, tags)
 
-    return response
+
+@task
+def create_materializations(
+    credentials: TransformCredentials,
+    materializations: List[Dict[str, Any]],
+    batch_size: int = 50,
+    validate: bool = False,
+) -> List[MqlQueryStatusResp]:
+    """
+    Task to create several materializations against a Transform metrics layer
+    deployment, submitting up to `batch_size` materializations per
+    GraphQL request to the MQL server.
+    The materializations are created asynchronously: the task returns
+    as soon as they have been submitted.
+    Statuses are polled with a status-only query: the full status is only
+    retrieved for completed materializations.
+    If OpenTelemetry is installed, the submissions are traced
+    as a `create_materializations` span.
+
+    Args:
+        credentials: `TransformCredentials` object used to obtain a client to
+            interact with Transform.
+        materializations: The materializations to create. Each item is a
+            dictionary holding the `materialization_name`, `model_key_id`,
+            `start_time`, `end_time`, `output_table` and `force` arguments
+            of `create_materialization`; only `materialization_name`
+            is required.
+        batch_size: The maximum number of materializations submitted
+            in a single request, at least `1`. Defaults to `50`.
+        validate: Whether to check every materialization against the cached
+            catalog of the Transform model, and the format of its
+            `output_table`, before submitting any of them. Loading the catalog
+            takes an extra request to the MQL server per distinct model.
+            Defaults to `False`.
+
+    Raises:
+        `ValueError` if `batch_size` is lower than `1`.
+        `TransformConfigurationException` if `validate` is `True` and any
+            materialization is invalid; the message lists every invalid
+            materialization.
+        `TransformAuthException` if the connection with the Transform
+            server cannot be established.
+        `TransformRuntimeException` if the submission or the creation of any
+            materialization fails; the message lists the error of every
+            failed materialization, and the other ones are still submitted.
+
+    Returns:
+        One `MqlQueryStatusResp` object per materialization,
+            in the same order as `materializations`.
+
+    Example:
+    ```python
+    from prefect import flow
+    from prefect_transform.credentials import TransformCredentials
+    from prefect_transform.tasks import (
+        create_materializations
+    )
+
+
+    @flow
+    def trigger_materializations_creation():
+        create_materializations(
+            credentials=TransformCredentials.load("BLOCK_NAME"),
+            materializations=[
+                {"materialization_name": "<name of the materialization>"},
+                {
+                    "materialization_name": "<name of another materialization>",
+                    "start_time": "2022-01-01",
+                },
+            ],
+        )
+
+    trigger_materializations_creation()
+    ```
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    if validate:
+        catalogs = {}
+        invalid = [
+            f"#{index} {item.get('materialization_name')!r}: {error}"
+            for index, item in enumerate(materializations)
+            for error in _validate_materialization(
+                credentials,
+                catalogs,
+                item.get("materialization_name"),
+                item.get("model_key_id"),
+                item.get("output_table"),
+            )
+        ]
+        if invalid:
+            msg = f"Invalid materializations! Errors are: {'; '.join(invalid)}"
+            raise TransformConfigurationException(msg)
+
+    attributes = {
+        "materialization_count": len(materializations),
+        **task_run_attributes(),
+    }
+    # the error of each materialization, keyed by its index
+    errors = {}
+    # the query ID of each materialization, `None` if not submitted
+    query_ids = []
+    statuses = {}
+    with trace_span("create_materializations", attributes):
+        mql_client = credentials.get_client()
+
+        model_keys = {}
+        for start in range(0, len(materializations), batch_size):
+            variables = [
+                _get_materialization_variables(
+                    mql_client, model_keys, **materialization
+                )
+                for materialization in materializations[start : start + batch_size]
+            ]
+            try:
+                batch_ids = submit_materializations(mql_client, variables)
+            except TransformSubmissionException as e:
+                # the other materializations were submitted: keep going
+                batch_ids = e.query_ids
+                errors.update(
+                    (start + index, error) for index, error in e.errors.items()
+                )
+            query_ids.extend(batch_ids)
+            submitted_ids = [query_id for query_id in batch_ids if query_id]
+            publish_increment(
+                "submissions",
+                len(submitted_ids),
+                {"operation": "create_materializations"},
+            )
+            if not submitted_ids:
+                continue
+            batch_statuses = {
+                s.query_id: s
+                for s in get_statuses(
+                    mql_client, submitted_ids, fields=STATUS_ONLY_FIELDS
+                )
+            }
+            complete_ids = [q for q, s in batch_statuses.items() if s.is_complete]
+            if complete_ids:
+                batch_statuses.update(
+                    (s.query_id, s) for s in get_statuses(mql_client, complete_ids)
+                )
+            statuses.update(batch_statuses)
+
+    errors.update(
+        (index, statuses[query_id].error)
+        for index, query_id in enumerate(query_ids)
+        if query_id is not None and statuses[query_id].is_failed
+    )
+    if errors:
+        details = "; ".join(
+            f"{materializations[index]['materialization_name']}: {error}"
+            for index, error in sorted(errors.items())
+        )
+        msg = f"Transform materializations batch creation failed! Errors are: {details}"
+        raise TransformRuntimeException(msg)
+
+    return [statuses[query_id] for query_id in query_ids]
+
+
+def _page_to_dataframe(page: bytes) -> pd.DataFrame:
+    """
+    Convert a page of query result to a `DataFrame`.
+    """
+    return pd.read_json(io.StringIO(page.decode("utf-8")), orient="table")
+
+
+def _concat_dataframes(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate `DataFrame` objects, renumbering their rows.
+    """
+    return pd.concat(frames, ignore_index=True)
+
+
+def _build_metrics_query(
+    metrics: List[str],
+    dimensions: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    time_constraint: Optional[str] = None,
+    time_granularity: Optional[str] = None,
+    order: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    model_key_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Build the arguments of `MQLClient.create_query` for a metrics query.
+    """
+    return {
+        "metrics": metrics,
+        "dimensions": dimensions or [],
+        "model_key_id": model_key_id,
+        "where": where,
+        "time_constraint": time_constraint,
+        "time_granularity": time_granularity,
+        "order": order,
+        "limit": None if limit is None else str(limit),
+    }
+
+
+def _run_metrics_query(
+    credentials: TransformCredentials,
+    query: Dict[str, Any],
+    timeout: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Run a metrics query, wait for its completion and return an iterator
+    over the pages of its result.
+    """
+    mql_client = credentials.get_client()
+
+    query_id = mql_client.create_query(**query).query_id
+
+    return _get_metrics_query_result(mql_client, query_id, timeout=timeout)
+
+
+def _get_metrics_query_result(
+    mql_client: MQLClient, query_id: str, timeout: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Wait for the completion of a metrics query and return an iterator
+    over the pages of its result.
+    """
+    try:
+        status = wait_for_completion(mql_client, query_id, timeout=timeout)
+    except QueryRuntimeException as e:
+        msg = f"Transform metrics query failed! Error is: {e.msg}"
+        raise TransformRuntimeException(msg)
+    if not status.is_successful:
+        msg = f"Transform metrics query failed! Error is: {status.error}"
+        raise TransformRuntimeException(msg)
+
+    return iter_result_pages(mql_client, query_id)
+
+
+@task
+def query_metrics(
+    credentials: TransformCredentials,
+    metrics: List[str],
+    dimensions: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    time_constraint: Optional[str] = None,
+    time_granularity: Optional[str] = None,
+    order: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    model_key_id: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    timeout: Optional[int] = None,
+    output_format: str = "pandas",
+    cache: Optional[QueryResultCache] = None,
+    spill_threshold: Optional[int] = None,
+    spill_directory: Optional[str] = None,
+) -> Union[pd.DataFrame, "pa.Table", ChunkedResult]:
+    """
+    Task to query metrics from a Transform metrics layer deployment.
+    The result is retrieved from the MQL server one page at a time.
+
+    Args:
+        credentials: `TransformCredentials` object used to obtain a client to
+            interact with Transform.
+        metrics: The names of the metrics to query.
+        dimensions: The names of the dimensions to group the metrics by.
+        where: A SQL-like constraint on the dimensions,
+            e.g. `country = 'US'`.
+        time_constraint: A constraint on the primary time dimension,
+            e.g. `metric_time BETWEEN '2022-01-01' AND '2022-02-01'`.
+        time_granularity: The granularity of the primary time dimension,
+            e.g. `day` or `month`.
+        order: The metrics or dimensions to order the result by;
+            prefix a name with `-` to sort it in descending order.
+        limit: The maximum number of rows to return.
+        model_key_id: The unique identifier of the Transform model
+            to query.
+        chunk_size: If set, the result is returned in chunks of `chunk_size`
+            rows, and memory usage stays bounded by the page and chunk sizes
+            regardless of the size of the result.
+        timeout: The maximum number of seconds to wait for the query
+            to complete; `0` waits indefinitely.
+        output_format: `pandas` to return `DataFrame` objects, or `arrow`
+            to return `pyarrow.Table` objects decoded straight from the
+            MQL server pages, without intermediate `DataFrame` objects.
+            `arrow` requires `pyarrow`. Defaults to `pandas`.
+        cache: If set, the result is looked up in this `QueryResultCache`
+            before querying the MQL server, and stored in it otherwise.
+            A cached result is returned without contacting the MQL server.
+        spill_threshold: If set, once the decoded result exceeds this number
+            of bytes, it is streamed to a temporary Arrow IPC file and returned
+            as a memory-mapped `pyarrow.Table`, so memory usage stays bounded
+            regardless of the size of the result. Requires `output_format`
+            to be `arrow`; ignored if `chunk_size` is set.
+        spill_directory: The directory of the temporary files holding spilled
+            results. Defaults to the system temporary directory.
+
+    Raises:
+        `ValueError` if `output_format` is neither `pandas` nor `arrow`,
+            or if `spill_threshold` is set and `output_format` is not `arrow`.
+        `ImportError` if `output_format` is `arrow` and `pyarrow`
+            is not installed.
+        `TransformAuthException` if the connection with the Transform
+            server cannot be established.
+        `TransformRuntimeException` if the query fails.
+
+    Returns:
+        A `DataFrame`, or a `pyarrow.Table`, holding the result if `chunk_size`
+            is `None`.
+        A `ChunkedResult` of `DataFrame` or `pyarrow.Table` objects otherwise;
+            `ChunkedResult.to_reader` exposes Arrow chunks as a
+            `pyarrow.RecordBatchReader`. Pages are retrieved lazily while
+            iterating, so the chunks must be consumed in the same process
+            and cannot be persisted as a task result.
+
+    Example:
+    ```python
+    from prefect import flow
+    from prefect_transform.credentials import TransformCredentials
+    from prefect_transform.tasks import query_metrics
+
+
+    @flow
+    def export_revenue():
+        chunks = query_metrics(
+            credentials=TransformCredentials.load("BLOCK_NAME"),
+            metrics=["revenue"],
+            dimensions=["metric_time", "country"],
+            time_granularity="day",
+            chunk_size=10_000,
+        )
+        for chunk in chunks:
+            ...
+
+    export_revenue()
+    ```
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Invalid output_format {output_format!r}, expected one of {OUTPUT_FORMATS}"
+        )
+    if output_format == "arrow":
+        require_pyarrow()
+    elif spill_threshold is not None:
+        raise ValueError("spill_threshold requires output_format='arrow'")
+
+    query = _build_metrics_query(
+        metrics=metrics,
+        dimensions=dimensions,
+        where=where,
+        time_constraint=time_constraint,
+        time_granularity=time_granularity,
+        order=order,
+        limit=limit,
+        model_key_id=model_key_id,
+    )
+
+    if cache is None:
+        pages = _run_metrics_query(credentials, query, timeout=timeout)
+        if output_format == "arrow":
+            frames = (page_to_table(page) for page in pages)
+            concat = concat_tables
+        else:
+            frames = (_page_to_dataframe(page) for page in pages)
+            concat = _concat_dataframes
+    else:
+        key = query_cache_key(credentials.mql_server_url, **query)
+        cached = cache.get(key)
+        if cached is not None:
+            frames = [cached]
+        else:
+            pages = _run_metrics_query(credentials, query, timeout=timeout)
+            frames = cache.write_through(key, (page_to_table(page) for page in pages))
+        concat = concat_tables
+        if output_format == "pandas":
+            frames = (table.to_pandas() for table in frames)
+            concat = _concat_dataframes
+
+    if chunk_size is not None:
+        return ChunkedResult(iter_chunks(frames, chunk_size, concat))
+
+    if output_format == "arrow":
+        return collect_tables(
+            frames, spill_threshold=spill_threshold, spill_directory=spill_directory
+        )
+    return concat(list(frames))
+
+
+@task
+def export_metrics(
+    credentials: TransformCredentials,
+    metrics: List[str],
+    path: str,
+    file_format: str = "parquet",
+    dimensions: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    time_constraint: Optional[str] = None,
+    time_granularity: Optional[str] = None,
+    order: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    model_key_id: Optional[int] = None,
+    row_group_size: int = 100_000,
+    timeout: Optional[int] = None,
+    storage_options: Optional[Dict[str, Any]] = None,
+) -> ExportResult:
+    """
+    Task to export metrics from a Transform metrics layer deployment
+    to a Parquet or CSV file.
+    The result is streamed from the MQL server to the file one page at a time,
+    so it is never held in memory as a whole. An empty result is written as
+    a file holding only the columns of the result.
+
+    Args:
+        credentials: `TransformCredentials` object used to obtain a client to
+            interact with Transform.
+        metrics: The names of the metrics to query.
+        path: The path of the file to write: a local path or any URL
+            supported by `fsspec`, e.g. `s3://bucket/revenue.parquet`.
+        file_format: `parquet` or `csv`. Defaults to `parquet`.
+        dimensions: The names of the dimensions to group the metrics by.
+        where: A SQL-like constraint on the dimensions,
+            e.g. `country = 'US'`.
+        time_constraint: A constraint on the primary time dimension,
+            e.g. `metric_time BETWEEN '2022-01-01' AND '2022-02-01'`.
+        time_granularity: The granularity of the primary time dimension,
+            e.g. `day` or `month`.
+        order: The metrics or dimensions to order the result by;
+            prefix a name with `-` to sort it in descending order.
+        limit: The maximum number of rows to return.
+        model_key_id: The unique identifier of the Transform model
+            to query.
+        row_group_size: The number of rows of each Parquet row group, which
+            is also the number of rows buffered before being written.
+            Defaults to `100_000`.
+        timeout: The maximum number of seconds to wait for the query
+            to complete; `0` waits indefinitely.
+        storage_options: Additional arguments passed to `fsspec.open`,
+            e.g. credentials of the remote file system.
+
+    Raises:
+        `ValueError` if `file_format` is neither `parquet` nor `csv`.
+        `ImportError` if `pyarrow` is not installed.
+        `TransformAuthException` if the connection with the Transform
+            server cannot be established.
+        `TransformRuntimeException` if the query fails.
+
+    Returns:
+        An `ExportResult` reporting the number of rows and bytes written
+            and the export throughput.
+
+    Example:
+    ```python
+    from prefect import flow
+    from prefect_transform.credentials import TransformCredentials
+    from prefect_transform.tasks import export_metrics
+
+
+    @flow
+    def export_revenue():
+        result = export_metrics(
+            credentials=TransformCredentials.load("BLOCK_NAME"),
+            metrics=["revenue"],
+            dimensions=["metric_time", "country"],
+            time_granularity="day",
+            path="s3://bucket/revenue.parquet",
+        )
+        print(f"{result.rows} rows at {result.rows_per_second:.0f} rows/s")
+
+    export_revenue()
+    ```
+    """
+    if file_format not in FILE_FORMATS:
+        raise ValueError(
+            f"Invalid file_format {file_format!r}, expected one of {FILE_FORMATS}"
+        )
+    require_pyarrow()
+
+    started = time.monotonic()
+    query = _build_metrics_query(
+        metrics=metrics,
+        dimensions=dimensions,
+        where=where,
+        time_constraint=time_constraint,
+        time_granularity=time_granularity,
+        order=order,
+        limit=limit,
+        model_key_id=model_key_id,
+    )
+    pages = _run_metrics_query(credentials, query, timeout=timeout)
+    tables = (page_to_table(page) for page in pages)
+    # the first page holds the schema, even when the result is empty
+    first = next(tables, None)
+    schema = None if first is None else first.schema
+    if first is not None:
+        tables = itertools.chain([first], tables)
+    tables = conform_tables(tables)
+
+    with fsspec.open(path, "wb", **(storage_options or {})) as sink:
+        rows = write_tables(
+            iter_chunks(tables, row_group_size, concat_tables),
+            sink,
+            file_format,
+            schema=schema,
+        )
+        bytes_written = sink.tell()
+
+    return ExportResult(
+        path=path,
+        file_format=file_format,
+        rows=rows,
+        bytes_written=bytes_written,
+        duration=time.monotonic() - started,
+    )
+
+
+@task
+def query_metrics_batch(
+    credentials: TransformCredentials,
+    queries: List[Dict[str, Any]],
+    timeout: Optional[int] = None,
+    coalesce: bool = False,
+) -> List[pd.DataFrame]:
+    """
+    Task to run several metrics queries against a Transform metrics layer
+    deployment, optionally coalescing compatible queries.
+    Queries are all submitted before waiting for any of them, so the
+    MQL server runs them concurrently.
+    With `coalesce`, queries that only differ by their metrics are answered
+    by a single MQL query requesting the union of their metrics, whose
+    result is split back per query: each query gets the rows where at least
+    one of its metrics has a value. Rows where every metric of a query is
+    null are therefore missing from its result, unlike when it runs alone.
+
+    Args:
+        credentials: `TransformCredentials` object used to obtain a client to
+            interact with Transform.
+        queries: The queries to run. Each item is a dictionary holding the
+            `metrics`, `dimensions`, `where`, `time_constraint`,
+            `time_granularity`, `order`, `limit` and `model_key_id`
+            arguments of `query_metrics`; only `metrics` is required.
+            Queries with an `order` or a `limit` are never coalesced.
+        timeout: The maximum number of seconds to wait for each combined
+            query to complete; `0` waits indefinitely.
+        coalesce: Whether to answer compatible queries with a single
+            MQL query. Defaults to `False`.
+
+    Raises:
+        `TransformAuthException` if the connection with the Transform
+            server cannot be established.
+        `TransformRuntimeException` if a query fails.
+
+    Returns:
+        One `DataFrame` per query, in the same order as `queries`, holding
+            the dimensions and the metrics of the query.
+
+    Example:
+    ```python
+    from prefect import flow
+    from prefect_transform.credentials import TransformCredentials
+    from prefect_transform.tasks import query_metrics_batch
+
+
+    @flow
+    def country_report():
+        revenue, orders = query_metrics_batch(
+            credentials=TransformCredentials.load("BLOCK_NAME"),
+            queries=[
+                {"metrics": ["revenue"], "dimensions": ["country"]},
+                {"metrics": ["orders"], "dimensions": ["country"]},
+            ],
+        )
+
+    country_report()
+    ```
+    """
+    groups = plan_queries(
+        [_build_metrics_query(**query) for query in queries], coalesce=coalesce
+    )
+
+    mql_client = credentials.get_client()
+    query_ids = [mql_client.create_query(**group.query).query_id for group in groups]
+
+    results = [None] * len(queries)
+    for group, query_id in zip(groups, query_ids):
+        pages = _get_metrics_query_result(mql_client, query_id, timeout=timeout)
+        df = _concat_dataframes([_page_to_dataframe(page) for page in pages])
+        for index, member_df in zip(group.members, split_result(df, group)):
+            results[index] = member_df
+    return results
@@ -0,0 +1,280 @@
+"""HTTP transport helpers used to talk to the Transform MQL server"""
+import gzip
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from gql.transport.requests import RequestsHTTPTransport
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from prefect_transform.instrumentation import inject_trace_context, publish_increment
+from prefect_transform.serialization import get_json_decoder, get_json_encoder
+
+_SessionKey = Tuple[str, int, int, bool, bool, str]
+
+# HTTP statuses retried by the transport of the MQL client, as in `gql`
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_sessions: Dict[_SessionKey, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class CountingRetry(Retry):
+    """
+    `Retry` policy publishing each retry to the registered metrics sinks
+    as an increment of the `retries` counter.
+    """
+
+    def increment(self, *args, **kwargs) -> Retry:
+        """
+        Compute the policy of the next attempt, then count the retry.
+        The last attempt is not counted: the policy raises `MaxRetryError`
+        once the retries are exhausted.
+        """
+        retry = super().increment(*args, **kwargs)
+        publish_increment("retries")
+        return retry
+
+
+class TracingSession(requests.Session):
+    """
+    `requests.Session` propagating the OpenTelemetry trace context
+    of the current span to the MQL server in the headers of its requests.
+    """
+
+    def request(self, method, url, headers=None, **kwargs):
+        """
+        Send a request, adding the trace context to its headers.
+        """
+        headers = inject_trace_context(dict(headers or {}))
+        return super().request(method, url, headers=headers, **kwargs)
+
+
+class GzipSession(TracingSession):
+    """
+    `requests.Session` that gzip-compresses the JSON body of its requests.
+
+    Responses are decompressed transparently by `requests`, which advertises
+    `gzip` and `deflate` support in the `Accept-Encoding` header.
+
+    Args:
+        json_library: The JSON library encoding request bodies,
+            see `get_json_encoder`.
+    """
+
+    def __init__(self, json_library: str = "auto") -> None:
+        """
+        Initialize the session; see the class docstring for the arguments.
+        """
+        super().__init__()
+        self._json_encoder = get_json_encoder(json_library)
+
+    def request(self, method, url, data=None, headers=None, json=None, **kwargs):
+        """
+        Send a request, compressing its JSON body.
+        """
+        if json is not None:
+            data = gzip.compress(self._json_encoder(json), compresslevel=5)
+            headers = {
+                **(headers or {}),
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
+            }
+            json = None
+        return super().request(
+            method, url, data=data, headers=headers, json=json, **kwargs
+        )
+
+
+def _create_session(
+    max_connections: int,
+    retries: int,
+    keep_alive: bool,
+    compress_requests: bool,
+    json_library: str = "auto",
+):
+    """
+    Create a `requests.Session` backed by a connection pool of
+    `max_connections` connections per host.
+    """
+    if compress_requests:
+        session = GzipSession(json_library)
+    else:
+        session = TracingSession()
+    adapter = HTTPAdapter(
+        pool_connections=max_connections,
+        pool_maxsize=max_connections,
+        max_retries=CountingRetry(
+            total=retries,
+            backoff_factor=0.1,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=None,
+        ),
+    )
+    for prefix in "http://", "https://":
+        session.mount(prefix, adapter)
+
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def get_pooled_session(
+    url: str,
+    max_connections: int = 10,
+    retries: int = 2,
+    keep_alive: bool = True,
+    compress_requests: bool = False,
+    json_library: str = "auto",
+) -> requests.Session:
+    """
+    Return the `requests.Session` shared by every transport targeting `url`
+    with the same pool configuration, creating it on first use.
+
+    Args:
+        url: The URL the session will be used against.
+        max_connections: The maximum number of pooled connections per host.
+        retries: The number of retries for failed requests.
+        keep_alive: Whether connections are kept open between requests.
+        compress_requests: Whether request bodies are gzip-compressed.
+        json_library: The JSON library encoding compressed request bodies,
+            see `get_json_encoder`.
+
+    Returns:
+        A `requests.Session` shared across callers.
+    """
+    key = (url, max_connections, retries, keep_alive, compress_requests, json_library)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _create_session(
+                max_connections=max_connections,
+                retries=retries,
+                keep_alive=keep_alive,
+                compress_requests=compress_requests,
+                json_library=json_library,
+            )
+            _sessions[key] = session
+    return session
+
+
+def pooled_session_count() -> int:
+    """
+    Return the number of pooled sessions currently open.
+    """
+    return len(_sessions)
+
+
+def close_pooled_sessions() -> None:
+    """
+    Close every pooled session and release the underlying connections.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+class PooledRequestsHTTPTransport(RequestsHTTPTransport):
+    """
+    `RequestsHTTPTransport` that runs every request through a shared,
+    long-lived `requests.Session`.
+
+    The GQL client connects and closes its transport around each execution:
+    here connecting attaches the pooled session and closing detaches it,
+    so TCP connections and TLS sessions are reused across executions
+    and across clients.
+
+    Args:
+        url: The GraphQL endpoint URL.
+        session: The pooled session used to perform requests.
+        **kwargs: Additional arguments passed to `RequestsHTTPTransport`.
+    """
+
+    def __init__(self, url: str, session: requests.Session, **kwargs) -> None:
+        """
+        Initialize the transport on top of the pooled `session`.
+        """
+        super().__init__(url=url, **kwargs)
+        self._pooled_session = session
+
+    def connect(self) -> None:
+        """
+        Attach the pooled session to the transport.
+        """
+        self.session = self._pooled_session
+
+    def close(self) -> None:
+        """
+        Detach the pooled session, leaving its connections open.
+        """
+        self.session = None
+
+
+def resolve_timeout(
+    timeout: Optional[Tuple[Optional[float], Optional[float]]],
+    default: Optional[float],
+) -> Optional[Union[float, Tuple[Optional[float], Optional[float]]]]:
+    """
+    Fill the missing sides of `(connect, read)` timeouts with a default.
+
+    Args:
+        timeout: The `(connect, read)` timeouts, in seconds, if any.
+        default: The timeout of each missing side, e.g. the default
+            timeout of the MQL client transport.
+
+    Returns:
+        `default` if `timeout` is `None`, else the completed timeouts.
+    """
+    if timeout is None:
+        return default
+    connect, read = timeout
+    return (
+        default if connect is None else connect,
+        default if read is None else read,
+    )
+
+
+def use_pooled_transport(
+    gql_client,
+    max_connections: int = 10,
+    keep_alive: bool = True,
+    timeout: Optional[Tuple[Optional[float], Optional[float]]] = None,
+    compress_requests: bool = False,
+    json_library: str = "auto",
+) -> None:
+    """
+    Replace the transport of a GQL client with a `PooledRequestsHTTPTransport`
+    targeting the same URL with the same headers.
+
+    Args:
+        gql_client: The `gql.Client` whose transport will be replaced.
+        max_connections: The maximum number of pooled connections per host.
+        keep_alive: Whether connections are kept open between requests.
+        timeout: The `(connect, read)` timeouts, in seconds, of each request;
+            each missing side defaults to the timeout of the replaced
+            transport.
+        compress_requests: Whether request bodies are gzip-compressed.
+        json_library: The JSON library decoding responses, and encoding
+            compressed request bodies, see `get_json_decoder`.
+    """
+    transport = gql_client.transport
+    session = get_pooled_session(
+        url=transport.url,
+        max_connections=max_connections,
+        retries=getattr(transport, "retries", 0),
+        keep_alive=keep_alive,
+        compress_requests=compress_requests,
+        json_library=json_library,
+    )
+    pooled_transport = PooledRequestsHTTPTransport(
+        url=transport.url,
+        session=session,
+        headers=transport.headers,
+        timeout=resolve_timeout(timeout, getattr(transport, "default_timeout", None)),
+    )
+    # only used by gql releases supporting custom JSON deserializers
+    pooled_transport.json_deserialize = get_json_decoder(json_library)
+    gql_client.transport = pooled_transport
@@ -0,0 +1,46 @@
+"""Client-side validation of requests sent to the Transform MQL server"""
+import difflib
+import re
+from typing import List, Optional
+
+from prefect_transform.catalog import Catalog
+
+OUTPUT_TABLE_PATTERN = re.compile(r"^[^.\s]+\.[^.\s]+$")
+
+
+def validate_materialization(
+    catalog: Catalog,
+    materialization_name: Optional[str],
+    output_table: Optional[str] = None,
+) -> List[str]:
+    """
+    Check a materialization request against the catalog of the Transform model
+    and the documented argument formats, without contacting the MQL server.
+
+    Args:
+        catalog: The `Catalog` of the Transform model.
+        materialization_name: The name of the materialization to create.
+        output_table: The table where the materialization will be created,
+            in the form of `schema_name.table_name`.
+
+    Returns:
+        The problems found with the request; empty if the request is valid.
+    """
+    errors = []
+    if not materialization_name:
+        errors.append("materialization_name is missing")
+    elif not catalog.has_materialization(materialization_name):
+        error = f"unknown materialization {materialization_name!r}"
+        matches = difflib.get_close_matches(
+            materialization_name, catalog.materializations, n=1
+        )
+        if matches:
+            error += f", did you mean {matches[0]!r}?"
+        errors.append(error)
+
+    if output_table is not None and not OUTPUT_TABLE_PATTERN.match(output_table):
+        errors.append(
+            f"invalid output_table {output_table!r}, "
+            "expected the form schema_name.table_name"
+        )
+    return errors
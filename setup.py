@@ -26,7 +26,14 @@ setup(
     packages=find_packages(exclude=("tests", "docs")),
     python_requires=">=3.7",
     install_requires=install_requires,
-    extras_require={"dev": dev_requires},
+    extras_require={
+        "dev": dev_requires,
+        "fast-json": ["orjson"],
+        "arrow": ["pyarrow"],
+        "duckdb": ["duckdb"],
+        "tracing": ["opentelemetry-api"],
+        "prometheus": ["prometheus-client"],
+    },
     classifiers=[
         "Natural Language :: English",
         "Intended Audience :: Developers",
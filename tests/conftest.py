@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def span_exporter():
+    """
+    In-memory exporter of the spans of the global OpenTelemetry tracer provider,
+    which can only be set once per process.
+    """
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry import trace
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return exporter
@@ -0,0 +1,68 @@
+import os
+import time
+
+import pytest
+
+from prefect_transform.cache import QueryResultCache, query_cache_key
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _table(rows):
+    return pa.table({"x": list(range(rows))})
+
+
+def test_query_cache_key_is_canonical():
+    key = query_cache_key(
+        "https://mql.server", metrics=["revenue"], dimensions=[], where=None
+    )
+
+    assert key == query_cache_key("https://mql.server", metrics=["revenue"])
+    assert key != query_cache_key("https://mql.server", metrics=["orders"])
+    assert key != query_cache_key("https://other.server", metrics=["revenue"])
+    assert len(key) == 64
+
+
+def test_cache_round_trip(tmp_path):
+    cache = QueryResultCache(directory=tmp_path)
+
+    assert cache.get("key") is None
+    cache.put("key", _table(3))
+
+    assert cache.get("key").column("x").to_pylist() == [0, 1, 2]
+    assert os.listdir(tmp_path) == ["key.arrow"]
+
+
+def test_cache_expires_entries(tmp_path):
+    cache = QueryResultCache(directory=tmp_path, ttl=60)
+    cache.put("key", _table(3))
+    created = time.time() - 120
+    os.utime(tmp_path / "key.arrow", (created, created))
+
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = QueryResultCache(directory=tmp_path)
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, _table(1000))
+        accessed = time.time() - 100 + index
+        os.utime(tmp_path / f"{key}.arrow", (accessed, accessed))
+    cache.get("a")
+
+    cache.max_size = 2 * os.path.getsize(tmp_path / "a.arrow")
+    cache.evict()
+
+    assert sorted(os.listdir(tmp_path)) == ["a.arrow", "c.arrow"]
+
+
+def test_cache_skips_partially_consumed_results(tmp_path):
+    cache = QueryResultCache(directory=tmp_path)
+
+    tables = cache.write_through("key", [_table(2), _table(2)])
+    next(tables)
+    tables.close()
+
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+from gql.transport.exceptions import TransportQueryError
+
+from prefect_transform.catalog import Catalog, clear_catalogs, get_catalog
+
+CATALOG_DATA = {
+    "metrics": [
+        {"name": "revenue", "dimensionObjects": [{"name": "country"}]},
+        {"name": "orders", "dimensionObjects": [{"name": "country"}, {"name": "ds"}]},
+    ],
+    "materializations": [
+        {
+            "name": "daily_revenue",
+            "metrics": ["revenue"],
+            "dimensions": ["country"],
+            "destinationTable": "analytics.daily_revenue",
+        }
+    ],
+}
+
+
+class MockMQLInterface:
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, query, variable_values=None):
+        self.calls += 1
+        return CATALOG_DATA
+
+
+class MockMQLClient:
+    def __init__(self, commit="abc", error=None):
+        self.commit = commit
+        self.error = error
+        self.context = SimpleNamespace(mql_client=MockMQLInterface())
+
+    def get_current_model_key(self):
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(commit=self.commit)
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    clear_catalogs()
+    yield
+    clear_catalogs()
+
+
+def test_catalog_lookups():
+    catalog = Catalog.from_gql(CATALOG_DATA, version="abc")
+
+    assert catalog.has_metric("revenue")
+    assert not catalog.has_metric("revenu")
+    assert catalog.get_dimensions("orders") == ["country", "ds"]
+    assert catalog.get_metrics_by_dimension("country") == ["revenue", "orders"]
+    assert catalog.get_materialization("daily_revenue")["destination_table"] == (
+        "analytics.daily_revenue"
+    )
+    assert catalog.get_materializations_by_metric("revenue") == ["daily_revenue"]
+    assert Catalog.from_dict(catalog.to_dict()).metrics == catalog.metrics
+
+
+def test_get_catalog_caches_within_ttl():
+    mql_client = MockMQLClient()
+
+    first = get_catalog("url", lambda: mql_client)
+    second = get_catalog("url", lambda: mql_client)
+
+    assert first is second
+    assert mql_client.context.mql_client.calls == 1
+
+
+def test_get_catalog_refreshes_conditionally():
+    mql_client = MockMQLClient()
+    catalog = get_catalog("url", lambda: mql_client, ttl=0)
+    catalog.loaded_at -= 1
+
+    assert get_catalog("url", lambda: mql_client, ttl=0) is catalog
+    assert mql_client.context.mql_client.calls == 1
+
+    mql_client.commit = "def"
+    catalog.loaded_at -= 1
+    refreshed = get_catalog("url", lambda: mql_client, ttl=0)
+
+    assert refreshed is not catalog
+    assert refreshed.version == "def"
+    assert mql_client.context.mql_client.calls == 2
+
+
+def test_get_catalog_shares_disk_cache(tmp_path):
+    mql_client = MockMQLClient()
+    get_catalog("url", lambda: mql_client, cache_dir=str(tmp_path))
+    clear_catalogs()
+
+    catalog = get_catalog("url", lambda: None, cache_dir=str(tmp_path))
+
+    assert catalog.has_materialization("daily_revenue")
+    assert mql_client.context.mql_client.calls == 1
+
+
+@pytest.mark.parametrize(
+    "error", [TransportQueryError("no model"), requests.ConnectionError("down")]
+)
+def test_get_catalog_without_version_on_transport_errors(error):
+    catalog = get_catalog("url", lambda: MockMQLClient(error=error))
+
+    assert catalog.version is None
+    assert catalog.has_materialization("daily_revenue")
+
+
+def test_get_catalog_raises_unexpected_version_errors():
+    with pytest.raises(AttributeError):
+        get_catalog("url", lambda: MockMQLClient(error=AttributeError("bug")))
@@ -0,0 +1,99 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "check_regressions",
+    Path(__file__).parents[1] / "benchmarks" / "check_regressions.py",
+)
+check_regressions = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_regressions)
+
+
+def _metric(value, higher_is_better):
+    return {"value": value, "unit": "s", "higher_is_better": higher_is_better}
+
+
+@pytest.mark.parametrize(
+    "current, higher_is_better, expected",
+    [
+        (100.0, True, "ok"),
+        (85.0, True, "ok"),
+        (75.0, True, "regressed"),
+        (125.0, True, "improved"),
+        (115.0, False, "ok"),
+        (125.0, False, "regressed"),
+        (75.0, False, "improved"),
+        # a lower-is-better metric 20% lower is within tolerance
+        (80.0, False, "ok"),
+    ],
+)
+def test_compare_applies_relative_change_in_metric_direction(
+    current, higher_is_better, expected
+):
+    baseline = {"latency": _metric(100.0, higher_is_better)}
+    results = {"latency": _metric(current, higher_is_better)}
+
+    (comparison,) = check_regressions.compare(baseline, results, {}, 0.2)
+
+    assert comparison.status == expected
+    assert comparison.change == pytest.approx(current / 100.0 - 1)
+
+
+def test_compare_reports_missing_and_new_metrics():
+    baseline = {"a": _metric(1.0, False), "b": _metric(1.0, False)}
+    results = {"b": _metric(1.0, False), "c": _metric(1.0, False)}
+
+    comparisons = check_regressions.compare(baseline, results, {})
+
+    assert [(c.metric, c.status) for c in comparisons] == [
+        ("a", "missing"),
+        ("b", "ok"),
+        ("c", "new"),
+    ]
+
+
+def test_compare_handles_zero_baseline():
+    baseline = {"a": _metric(0.0, False), "b": _metric(0.0, False)}
+    results = {"a": _metric(0.0, False), "b": _metric(1.0, False)}
+
+    comparisons = check_regressions.compare(baseline, results, {})
+
+    assert [c.status for c in comparisons] == ["ok", "regressed"]
+
+
+@pytest.mark.parametrize(
+    "metric, expected",
+    [
+        ("import.own", 0.5),
+        ("get_client.cold.latency", 0.3),
+        ("get_client.cold.throughput", 0.4),
+        ("wait_for_completion.cpu_per_poll", 0.1),
+    ],
+)
+def test_get_tolerance(metric, expected):
+    tolerances = {
+        "import.own": 0.5,
+        "get_client.*": 0.4,
+        "get_client.*.latency": 0.3,
+    }
+
+    assert check_regressions.get_tolerance(metric, tolerances, 0.1) == expected
+
+
+def test_environment_mismatches():
+    baseline = {"cpus": "1", "python": "3.11.7"}
+
+    assert (
+        check_regressions.environment_mismatches(
+            baseline, {"cpus": "1", "python": "3.11.9"}
+        )
+        == []
+    )
+    assert check_regressions.environment_mismatches(
+        baseline, {"cpus": "8", "python": "3.10.0"}
+    ) == [
+        "cpus: 1 in the baseline, 8 in the results",
+        "python: 3.11.7 in the baseline, 3.10.0 in the results",
+    ]
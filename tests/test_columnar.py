@@ -0,0 +1,148 @@
+import pandas as pd
+import pytest
+
+from prefect_transform.columnar import (
+    collect_tables,
+    concat_tables,
+    iter_chunks,
+    page_to_table,
+    tables_to_reader,
+    write_tables,
+)
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _page(df, index=False):
+    return df.to_json(orient="table", index=index).encode()
+
+
+def test_page_to_table_maps_table_schema_types():
+    df = pd.DataFrame(
+        {
+            "metric_time": pd.to_datetime(["2022-01-01", "2022-01-02"]),
+            "country": ["US", None],
+            "orders": [1, 2],
+            "revenue": [1.5, None],
+            "is_new": [True, False],
+        }
+    )
+    df["created_at"] = df["metric_time"].dt.tz_localize("UTC")
+
+    table = page_to_table(_page(df, index=True))
+
+    assert table.column_names == [
+        "metric_time",
+        "country",
+        "orders",
+        "revenue",
+        "is_new",
+        "created_at",
+    ]
+    assert table.schema.field("metric_time").type == pa.timestamp("ms")
+    assert table.schema.field("created_at").type == pa.timestamp("ms", tz="UTC")
+    assert table.schema.field("orders").type == pa.int64()
+    assert table.schema.field("is_new").type == pa.bool_()
+    assert table.column("country").to_pylist() == ["US", None]
+    assert table.column("revenue").null_count == 1
+
+
+def test_page_to_table_parses_naive_datetimes_with_zone_suffix():
+    # pandas < 1.5 writes naive datetimes with a `Z` suffix
+    page = (
+        b'{"schema":{"fields":[{"name":"metric_time","type":"datetime"}],'
+        b'"pandas_version":"0.20.0"},'
+        b'"data":[{"metric_time":"2022-01-01T00:00:00.000Z"},'
+        b'{"metric_time":null}]}'
+    )
+
+    table = page_to_table(page)
+
+    assert table.schema.field("metric_time").type == pa.timestamp("ms")
+    assert table.column("metric_time").to_pylist() == [
+        pd.Timestamp("2022-01-01").to_pydatetime(),
+        None,
+    ]
+
+
+def test_page_to_table_keeps_null_columns_and_empty_pages():
+    df = pd.DataFrame({"country": [None, None], "revenue": [1.0, 2.0]})
+
+    table = page_to_table(_page(df))
+    empty = page_to_table(_page(df.iloc[:0]))
+
+    assert table.schema.field("country").type == pa.string()
+    assert table.column("country").null_count == 2
+    assert empty.num_rows == 0
+    assert empty.schema == table.schema
+
+
+def test_iter_chunks_regroups_tables():
+    tables = [pa.table({"x": [1, 2, 3]}), pa.table({"x": [4]}), pa.table({"x": [5]})]
+
+    chunks = list(iter_chunks(tables, 2, concat_tables))
+
+    assert [chunk.column("x").to_pylist() for chunk in chunks] == [[1, 2], [3, 4], [5]]
+    assert all(chunk.column("x").num_chunks == 1 for chunk in chunks)
+
+
+def test_tables_to_reader_streams_batches():
+    tables = iter([pa.table({"x": [1, 2]}), pa.table({"x": [3]})])
+
+    reader = tables_to_reader(tables)
+
+    assert reader.schema == pa.schema([("x", pa.int64())])
+    assert reader.read_all().column("x").to_pylist() == [1, 2, 3]
+
+
+def test_collect_tables_keeps_small_results_in_memory(tmp_path):
+    tables = [pa.table({"x": [1, 2]}), pa.table({"x": [3]})]
+
+    table = collect_tables(tables, spill_threshold=1 << 20, spill_directory=tmp_path)
+
+    assert table.column("x").to_pylist() == [1, 2, 3]
+    assert table.column("x").num_chunks == 1
+
+
+def test_collect_tables_spills_large_results(tmp_path):
+    tables = [pa.table({"x": list(range(1000))}) for _ in range(5)]
+    allocated = pa.total_allocated_bytes()
+
+    table = collect_tables(tables, spill_threshold=10_000, spill_directory=tmp_path)
+
+    assert table.num_rows == 5000
+    assert table.column("x").to_pylist()[998:1002] == [998, 999, 0, 1]
+    assert pa.total_allocated_bytes() == allocated
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_tables_casts_null_columns_to_the_first_schema(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    tables = [
+        pa.table({"country": ["US"], "revenue": [1.0]}),
+        pa.table({"country": pa.nulls(1), "revenue": [2.0]}),
+    ]
+
+    with open(tmp_path / "result.parquet", "wb") as sink:
+        rows = write_tables(tables, sink, "parquet")
+
+    assert rows == 2
+    table = pq.read_table(tmp_path / "result.parquet")
+    assert table.column("country").to_pylist() == ["US", None]
+
+
+def test_write_tables_raises_on_other_columns(tmp_path):
+    tables = [pa.table({"country": ["US"]}), pa.table({"revenue": [1.0]})]
+
+    with open(tmp_path / "result.csv", "wb") as sink:
+        with pytest.raises(ValueError, match="with columns \\['revenue'\\]"):
+            write_tables(tables, sink, "csv")
+
+
+def test_write_tables_requires_a_schema_without_tables(tmp_path):
+    with open(tmp_path / "result.csv", "wb") as sink:
+        with pytest.raises(ValueError, match="empty result without a schema"):
+            write_tables([], sink, "csv")
+        write_tables([], sink, "csv", schema=pa.schema([("country", pa.string())]))
+
+    assert (tmp_path / "result.csv").read_text() == '"country"\n'
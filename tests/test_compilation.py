@@ -0,0 +1,28 @@
+from unittest import mock
+
+from prefect_transform.compilation import (
+    clear_compiled_sql,
+    get_compiled_sql,
+    put_compiled_sql,
+    strip_zero_limit,
+)
+
+
+@mock.patch("prefect_transform.compilation.MAX_COMPILED_SQL", 2)
+def test_compiled_sql_cache_evicts_least_recently_used():
+    clear_compiled_sql()
+    put_compiled_sql("a", "SELECT 1")
+    put_compiled_sql("b", "SELECT 2")
+    get_compiled_sql("a")
+    put_compiled_sql("c", "SELECT 3")
+
+    assert get_compiled_sql("a") == "SELECT 1"
+    assert get_compiled_sql("b") is None
+    assert get_compiled_sql("c") == "SELECT 3"
+    clear_compiled_sql()
+
+
+def test_strip_zero_limit():
+    assert strip_zero_limit("SELECT a FROM t\nLIMIT 0") == "SELECT a FROM t"
+    assert strip_zero_limit("SELECT a FROM t limit 0;") == "SELECT a FROM t"
+    assert strip_zero_limit("SELECT a FROM t LIMIT 10") == "SELECT a FROM t LIMIT 10"
@@ -1,10 +1,32 @@
+import gzip
+import json
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
+from gql.transport.requests import RequestsHTTPTransport
 from pydantic import SecretStr
+from requests import Response
+from requests.adapters import HTTPAdapter
 
 from prefect_transform.credentials import TransformCredentials
 from prefect_transform.exceptions import TransformAuthException
+from prefect_transform.transport import (
+    GzipSession,
+    PooledRequestsHTTPTransport,
+    close_pooled_sessions,
+    get_pooled_session,
+)
+
+
+def _mock_mql_client():
+    transport = RequestsHTTPTransport(
+        url="https://mql.server/graphql", headers={"foo": "bar"}, retries=2, timeout=90
+    )
+    gql_client = SimpleNamespace(transport=transport)
+    return SimpleNamespace(
+        context=SimpleNamespace(mql_client=SimpleNamespace(gql_client=gql_client))
+    )
 
 
 def test_credentials_construction():
@@ -47,3 +69,168 @@ def test_mql_client_creation_succeed(mock_mql_client):
     ).get_client()
 
     assert hasattr(mql_client, "a_method")
+    mock_mql_client.assert_called_once_with(
+        api_key="foo", mql_server_url="foo", override_config=False
+    )
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_mql_client_uses_pooled_transport(mock_mql_client):
+    mock_mql_client.side_effect = lambda **kwargs: _mock_mql_client()
+
+    credentials = TransformCredentials(
+        api_key=SecretStr("foo"),
+        mql_server_url="foo",
+        max_connections=4,
+        connect_timeout=5,
+        read_timeout=30,
+    )
+    first_client = credentials.get_client()
+    second_client = credentials.get_client()
+
+    first_transport = first_client.context.mql_client.gql_client.transport
+    second_transport = second_client.context.mql_client.gql_client.transport
+
+    assert isinstance(first_transport, PooledRequestsHTTPTransport)
+    assert first_transport.headers == {"foo": "bar"}
+    assert first_transport.default_timeout == (5, 30)
+
+    first_transport.connect()
+    second_transport.connect()
+    assert first_transport.session is second_transport.session
+    assert first_transport.session.get_adapter("https://").poolmanager is not None
+
+    first_transport.close()
+    assert first_transport.session is None
+    assert second_transport.session is not None
+
+    close_pooled_sessions()
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_mql_client_pooled_transport_keeps_default_timeout(mock_mql_client):
+    mock_mql_client.side_effect = lambda **kwargs: _mock_mql_client()
+
+    mql_client = TransformCredentials(
+        api_key=SecretStr("foo"), mql_server_url="foo"
+    ).get_client()
+
+    transport = mql_client.context.mql_client.gql_client.transport
+    assert isinstance(transport, PooledRequestsHTTPTransport)
+    assert transport.default_timeout == 90
+
+    close_pooled_sessions()
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_mql_client_pooled_transport_fills_missing_timeout(mock_mql_client):
+    mock_mql_client.side_effect = lambda **kwargs: _mock_mql_client()
+
+    mql_client = TransformCredentials(
+        api_key=SecretStr("foo"), mql_server_url="foo", connect_timeout=5
+    ).get_client()
+
+    transport = mql_client.context.mql_client.gql_client.transport
+    assert transport.default_timeout == (5, 90)
+
+    close_pooled_sessions()
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_mql_client_without_connection_reuse(mock_mql_client, caplog):
+    mock_mql_client.side_effect = lambda **kwargs: _mock_mql_client()
+
+    mql_client = TransformCredentials(
+        api_key=SecretStr("foo"),
+        mql_server_url="foo",
+        reuse_connections=False,
+        read_timeout=30,
+        compress_requests=True,
+    ).get_client()
+
+    transport = mql_client.context.mql_client.gql_client.transport
+    assert not isinstance(transport, PooledRequestsHTTPTransport)
+    assert transport.default_timeout == (90, 30)
+    assert "compress_requests only apply when reuse_connections is True" in (
+        caplog.text
+    )
+
+
+def test_pooled_sessions_retry_server_errors():
+    session = get_pooled_session("https://mql.server/graphql")
+
+    retry = session.get_adapter("https://").max_retries
+    assert retry.total == 2
+    assert set(retry.status_forcelist) == {500, 502, 503, 504}
+
+    close_pooled_sessions()
+
+
+class CaptureAdapter(HTTPAdapter):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"data": {"version": "1.0"}}'
+        return response
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_mql_client_compresses_requests(mock_mql_client):
+    mock_mql_client.side_effect = lambda **kwargs: _mock_mql_client()
+
+    mql_client = TransformCredentials(
+        api_key=SecretStr("foo"),
+        mql_server_url="foo",
+        compress_requests=True,
+        json_library="json",
+    ).get_client()
+
+    transport = mql_client.context.mql_client.gql_client.transport
+    transport.connect()
+    assert isinstance(transport.session, GzipSession)
+    assert transport.json_deserialize is json.loads
+
+    adapter = CaptureAdapter()
+    transport.session.mount("https://", adapter)
+    transport.session.post(transport.url, json={"query": "{ version }"})
+
+    request = adapter.requests[0]
+    assert request.headers["Content-Encoding"] == "gzip"
+    # encoded by the configured library: the stdlib adds spaces
+    assert gzip.decompress(request.body) == b'{"query": "{ version }"}'
+
+    close_pooled_sessions()
+
+
+def test_pooled_sessions_are_keyed_by_json_library():
+    stdlib_session = get_pooled_session("https://mql.server", json_library="json")
+
+    assert get_pooled_session("https://mql.server", json_library="json") is (
+        stdlib_session
+    )
+    assert get_pooled_session("https://mql.server") is not stdlib_session
+
+    close_pooled_sessions()
+
+
+@mock.patch("prefect_transform.credentials.get_catalog")
+def test_get_catalog_uses_credentials_settings(mock_get_catalog):
+    credentials = TransformCredentials(
+        api_key=SecretStr("foo"), mql_server_url="foo", catalog_ttl=60
+    )
+
+    credentials.get_catalog(model_key_id=3)
+
+    args, kwargs = mock_get_catalog.call_args
+    assert args[0] == "foo"
+    assert kwargs == {
+        "model_key_id": 3,
+        "ttl": 60,
+        "cache_dir": None,
+        "refresh": False,
+    }
@@ -0,0 +1,44 @@
+import pytest
+
+from prefect_transform.detectors import SlowMaterializationDetector
+from prefect_transform.histograms import LatencyHistogramStore
+
+
+def test_detector_flags_runs_slower_than_history(tmp_path):
+    store = LatencyHistogramStore(tmp_path / "histograms.json")
+    flagged = []
+    detector = SlowMaterializationDetector(
+        store, percentile=90, tolerance=1.5, min_samples=10, callback=flagged.append
+    )
+    tags = {
+        "materialization_name": "mt_name",
+        "mode": "sync",
+        "outcome": "success",
+        "query_id": "query_0",
+        "status_history": "SUBMITTED:0.100,PENDING:0.300,SUCCESSFUL:2.900",
+    }
+
+    for _ in range(10):
+        detector.record("create_materialization", {"running": 1.0}, tags)
+    detector.record("create_materialization", {"running": 1.4}, tags)
+    detector.record("create_materialization", {"running": 9.0}, tags)
+    failure_tags = {**tags, "outcome": "failure"}
+    detector.record("create_materialization", {"running": 9.0}, failure_tags)
+    for mode in ("async", "preview", "local"):
+        detector.record(
+            "create_materialization", {"running": 9.0}, {**tags, "mode": mode}
+        )
+
+    (slow,) = flagged
+    assert slow.duration == 9.0
+    assert slow.threshold == pytest.approx(1.5, rel=0.01)
+    assert slow.baseline_count == 11
+    assert slow.status_history == [
+        ("SUBMITTED", 0.1),
+        ("PENDING", 0.3),
+        ("SUCCESSFUL", 2.9),
+    ]
+    markdown = slow.to_markdown()
+    assert "| running | 9.000 | 100% |" in markdown
+    assert "| PENDING | 0.300 |" in markdown
+    assert store.get_histogram("mt_name").count == 12
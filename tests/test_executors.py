@@ -0,0 +1,46 @@
+import pytest
+
+from prefect_transform.executors import (
+    DuckDBExecutor,
+    MaterializationExecutor,
+    SQLiteExecutor,
+)
+
+SQL = "SELECT country, SUM(revenue) AS revenue FROM orders GROUP BY country"
+
+
+def _create_orders(connection):
+    connection.execute("CREATE TABLE orders (country VARCHAR, revenue DOUBLE)")
+    connection.execute(
+        "INSERT INTO orders VALUES ('US', 1.0), ('US', 2.0), ('IT', 3.0)"
+    )
+
+
+def test_sqlite_executor_creates_and_replaces_tables(tmp_path):
+    executor = SQLiteExecutor(str(tmp_path / "dev.db"))
+    _create_orders(executor.connection)
+
+    assert executor.execute(SQL, "analytics", "revenue") == 2
+    assert executor.execute(SQL + " HAVING country = 'IT'", "analytics", "revenue") == 1
+    assert (tmp_path / "dev_analytics.db").exists()
+    executor.close()
+
+
+def test_duckdb_executor_creates_and_replaces_tables():
+    pytest.importorskip("duckdb")
+    executor = DuckDBExecutor()
+    _create_orders(executor.connection)
+
+    assert executor.execute(SQL, "analytics", "revenue") == 2
+    assert executor.execute(SQL + " HAVING country = 'IT'", "analytics", "revenue") == 1
+    rows = executor.connection.execute("SELECT * FROM analytics.revenue").fetchall()
+    assert rows == [("IT", 3.0)]
+    executor.close()
+
+
+def test_materialization_executor_requires_execute():
+    class IncompleteExecutor(MaterializationExecutor):
+        pass
+
+    with pytest.raises(TypeError, match="abstract method"):
+        IncompleteExecutor()
@@ -0,0 +1,159 @@
+import random
+import time
+
+import pytest
+import requests
+from prefect import flow
+from pydantic import SecretStr
+
+from prefect_transform.credentials import TransformCredentials
+from prefect_transform.exceptions import TransformRuntimeException
+from prefect_transform.fake_server import FakeMQLServer, parse_latency
+from prefect_transform.queries import build_materializations_mutation
+from prefect_transform.tasks import create_materialization, query_metrics
+
+
+@pytest.fixture
+def start_server(tmp_path, monkeypatch):
+    """
+    Start fake MQL servers targeted by the Transform configuration
+    of a temporary directory, stopping them after the test.
+    """
+    monkeypatch.setenv("TFD_CONFIG_DIR", str(tmp_path))
+    servers = []
+
+    def start(**kwargs):
+        server = FakeMQLServer(seed=0, **kwargs).start()
+        server.write_transform_config(tmp_path)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def _credentials(server):
+    return TransformCredentials(
+        api_key=SecretStr("tfdk-fake-key"), mql_server_url=server.url
+    )
+
+
+def _submit(server, *names):
+    document, variables = build_materializations_mutation(
+        [{"materializationName": name} for name in names]
+    )
+    response = requests.post(
+        f"{server.url}/graphql", json={"query": document, "variables": variables}
+    )
+    return response
+
+
+@pytest.mark.parametrize(
+    "latency, expected",
+    [(0.5, 0.5), ("0.5", 0.5), ("constant:2", 2.0), ("uniform:1,1", 1.0)],
+)
+def test_parse_latency(latency, expected):
+    assert parse_latency(latency)(random.Random(0)) == expected
+
+
+def test_parse_latency_raises_on_invalid_spec():
+    with pytest.raises(ValueError, match="Invalid latency 'gamma:1'"):
+        parse_latency("gamma:1")
+
+
+def test_fake_server_materializes_through_mql_client(start_server):
+    server = start_server(run_latency=0.05)
+
+    @flow(name="test_fake_server_flow")
+    def test_flow():
+        return create_materialization(
+            credentials=_credentials(server),
+            materialization_name="mt_1",
+            return_mode="compact",
+        )
+
+    result = test_flow()
+
+    assert result.query_id == "fake_0"
+    assert result.fully_qualified_name == "analytics.mt_1"
+    assert result.timings["running"] > 0
+    assert server.stats["submissions"] == 1
+    assert server.stats["polls"] >= 2
+
+
+def test_fake_server_injects_query_failures(start_server):
+    server = start_server(run_latency=0, failure_rate=1)
+
+    @flow(name="test_fake_server_failure_flow")
+    def test_flow():
+        return create_materialization(
+            credentials=_credentials(server), materialization_name="mt_1"
+        )
+
+    with pytest.raises(TransformRuntimeException, match="Injected failure"):
+        test_flow()
+
+
+def test_fake_server_serves_paginated_results(start_server):
+    server = start_server(run_latency=0, result_rows=5, page_size=2)
+
+    @flow(name="test_fake_server_query_flow")
+    def test_flow():
+        return query_metrics(
+            credentials=_credentials(server),
+            metrics=["revenue"],
+            dimensions=["country"],
+        )
+
+    df = test_flow()
+
+    assert list(df.columns) == ["country", "revenue"]
+    assert df["revenue"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_fake_server_queues_beyond_concurrency_limit(start_server):
+    server = start_server(run_latency=0.5, max_concurrent_queries=1)
+
+    data = _submit(server, "mt_1", "mt_2").json()["data"]
+    queries = [server._queries[data[alias]["id"]] for alias in ("m0", "m1")]
+
+    assert queries[1].started_at == pytest.approx(queries[0].completed_at)
+    assert queries[1].status(time.monotonic()) == "PENDING"
+
+
+def test_fake_server_rate_limits_requests(start_server):
+    server = start_server(rate_limit=0.01, burst=1)
+
+    assert _submit(server, "mt_1").status_code == 200
+    response = _submit(server, "mt_1")
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert server.stats["rate_limited"] == 1
+    assert server.stats["submissions"] == 1
+
+
+def test_fake_server_forgets_completed_queries_after_retention(start_server):
+    server = start_server(run_latency=0, retention=0.05)
+
+    first_id = _submit(server, "mt_1").json()["data"]["m0"]["id"]
+    time.sleep(0.1)
+    second_id = _submit(server, "mt_2").json()["data"]["m0"]["id"]
+
+    assert first_id not in server._queries
+    assert second_id in server._queries
+
+
+def test_fake_server_counts_status_only_lookups_as_polls(start_server):
+    server = start_server(run_latency=0)
+    query_id = _submit(server, "mt_1").json()["data"]["m0"]["id"]
+
+    for fields in ("status error", "status", "status error resultTableName"):
+        response = requests.post(
+            f"{server.url}/graphql",
+            json={"query": f'{{ mqlQuery(id: "{query_id}") {{ {fields} }} }}'},
+        )
+        assert response.json()["data"]["mqlQuery"]["status"] == "SUCCESSFUL"
+
+    assert server.stats["polls"] == 2
@@ -0,0 +1,58 @@
+import pytest
+
+from prefect_transform.histograms import (
+    LatencyHistogram,
+    LatencyHistogramStore,
+    _bucket_index,
+    _bucket_upper_bound,
+)
+
+
+def test_buckets_bound_relative_error():
+    for microseconds in [0, 1, 127, 255, 256, 1000, 123_456, 10**9, 86_400 * 10**6]:
+        upper_bound = _bucket_upper_bound(_bucket_index(microseconds))
+        assert microseconds <= upper_bound <= microseconds * 1.01 + 1
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    for milliseconds in range(1, 1001):
+        histogram.record(milliseconds / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.01)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.01)
+    assert histogram.percentile(0) == 0.001
+    assert histogram.percentile(100) == 1.0
+    with pytest.raises(ValueError, match="Invalid percentile"):
+        histogram.percentile(101)
+
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    restored.merge(histogram)
+    assert restored.count == 2000
+    assert restored.percentile(99) == histogram.percentile(99)
+
+
+def test_latency_histogram_store_persists_histograms(tmp_path):
+    path = tmp_path / "histograms.json"
+    store = LatencyHistogramStore(path)
+    tags = {"materialization_name": "mt_name", "mode": "sync", "outcome": "success"}
+    timings = {"submission": 0.5, "queued": 2.0, "running": 6.0, "polling": 0.25}
+    store.record("create_materialization", timings, tags)
+    store.record("create_materialization", timings, {**tags, "outcome": "failure"})
+    for mode in ("async", "preview", "local"):
+        store.record("create_materialization", timings, {**tags, "mode": mode})
+    store.record("get_client", {"client": 0.1}, {"outcome": "success"})
+
+    percentiles = LatencyHistogramStore(path).percentiles("mt_name", metric="server")
+    assert percentiles == {
+        50: pytest.approx(8.0, rel=0.01),
+        95: pytest.approx(8.0, rel=0.01),
+        99: pytest.approx(8.0, rel=0.01),
+    }
+    assert store.get_histogram("mt_name", "end_to_end").percentile(50) == 8.75
+    assert store.get_histogram("mt_name", "polling").count == 1
+    assert store.percentiles("unknown", percentiles=[90]) == {90: None}
+    with pytest.raises(ValueError, match="Invalid metric"):
+        store.percentiles("mt_name", metric="queue")
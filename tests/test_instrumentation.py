@@ -0,0 +1,85 @@
+import itertools
+from enum import Enum
+
+import pytest
+
+from prefect_transform.instrumentation import (
+    InMemoryMetricsSink,
+    MetricsSink,
+    PhaseTimer,
+    inject_trace_context,
+    publish_timings,
+    register_metrics_sink,
+    set_span_attributes,
+    trace_span,
+    unregister_metrics_sink,
+)
+
+
+class Status(Enum):
+    A = "a"
+
+
+def test_phase_timer_accumulates_phases():
+    timer = PhaseTimer(clock=itertools.count().__next__)
+
+    with timer.phase("client"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.phase("submission"):
+            raise ValueError("boom")
+    with timer.phase("client"):
+        pass
+    timer.add("queued", 2.5)
+
+    assert timer.timings == {"client": 2, "submission": 1, "queued": 2.5}
+    assert timer.total == 5.5
+
+
+def test_publish_timings_isolates_failing_sinks():
+    class FailingSink(MetricsSink):
+        def record(self, operation, timings, tags):
+            raise RuntimeError("unreachable backend")
+
+    failing_sink, sink = FailingSink(), InMemoryMetricsSink()
+    register_metrics_sink(failing_sink)
+    register_metrics_sink(sink)
+    register_metrics_sink(sink)
+    try:
+        publish_timings("get_client", {"client": 0.1}, {"outcome": "success"})
+    finally:
+        unregister_metrics_sink(failing_sink)
+        unregister_metrics_sink(sink)
+    publish_timings("get_client", {"client": 0.2})
+
+    assert sink.records == [("get_client", {"client": 0.1}, {"outcome": "success"})]
+
+
+def test_metrics_sink_requires_record():
+    class CountingSink(MetricsSink):
+        def increment(self, name, value=1, tags=None):
+            pass
+
+    with pytest.raises(TypeError, match="abstract method"):
+        CountingSink()
+
+
+def test_trace_span_records_attributes_and_errors(span_exporter):
+    span_exporter.clear()
+
+    with trace_span("parent", {"model_key_id": None, "status": [Status.A]}) as span:
+        set_span_attributes(span, {"query_id": ["q0", "q1"]})
+        with pytest.raises(ValueError):
+            with trace_span("child"):
+                raise ValueError("boom")
+
+    child, parent = span_exporter.get_finished_spans()
+    assert dict(parent.attributes) == {"status": "a", "query_id": ("q0", "q1")}
+    assert child.parent.span_id == parent.context.span_id
+    assert not child.status.is_ok
+
+
+def test_inject_trace_context(span_exporter):
+    assert inject_trace_context({}) == {}
+    with trace_span("parent"):
+        assert "traceparent" in inject_trace_context({})
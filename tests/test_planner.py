@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from prefect_transform.planner import plan_queries, split_result
+
+
+def _query(metrics, **kwargs):
+    return {"metrics": metrics, "dimensions": ["country"], "where": None, **kwargs}
+
+
+def test_plan_queries_coalesces_compatible_queries():
+    groups = plan_queries(
+        [
+            _query(["revenue"]),
+            _query(["orders"], where="country = 'US'"),
+            _query(["orders", "revenue"]),
+            _query(["orders"], limit="10"),
+            _query(["orders"], where="country = 'US'"),
+        ]
+    )
+
+    assert [group.members for group in groups] == [[0, 2], [1, 4], [3]]
+    assert groups[0].query["metrics"] == ["revenue", "orders"]
+    assert groups[0].query["dimensions"] == ["country"]
+    assert groups[1].query["metrics"] == ["orders"]
+
+
+def test_plan_queries_without_coalescing():
+    groups = plan_queries([_query(["revenue"]), _query(["orders"])], coalesce=False)
+
+    assert [group.members for group in groups] == [[0], [1]]
+
+
+def test_split_result_keeps_member_metrics_and_rows():
+    groups = plan_queries([_query(["revenue"]), _query(["orders"])])
+    df = pd.DataFrame(
+        {
+            "country": ["US", "IT", "FR"],
+            "REVENUE": [1.0, None, 3.0],
+            "orders": [10, 20, None],
+        }
+    )
+
+    revenue, orders = split_result(df, groups[0])
+
+    assert list(revenue.columns) == ["country", "REVENUE"]
+    assert revenue["country"].tolist() == ["US", "FR"]
+    assert list(orders.columns) == ["country", "orders"]
+    assert orders["country"].tolist() == ["US", "IT"]
+    assert orders.index.tolist() == [0, 1]
+
+
+def test_split_result_keeps_rows_with_any_member_metric():
+    groups = plan_queries([_query(["revenue", "orders"]), _query(["visits"])])
+    df = pd.DataFrame(
+        {
+            "country": ["US", "IT", "FR"],
+            "revenue": [1.0, None, None],
+            "orders": [None, 20, None],
+            "visits": [None, None, 5],
+        }
+    )
+
+    both, visits = split_result(df, groups[0])
+
+    assert both["country"].tolist() == ["US", "IT"]
+    assert visits["country"].tolist() == ["FR"]
+
+
+def test_split_result_raises_on_unknown_metric_columns():
+    groups = plan_queries([_query(["revenue"]), _query(["orders"])])
+    df = pd.DataFrame({"country": ["US"], "revenue": [1.0], "total": [10]})
+
+    with pytest.raises(ValueError, match="metrics \\['orders'\\]"):
+        split_result(df, groups[0])
@@ -0,0 +1,76 @@
+import pstats
+from unittest import mock
+
+import pytest
+from pydantic import SecretStr
+
+from prefect_transform.credentials import TransformCredentials
+from prefect_transform.profiling import (
+    PROFILE_DIR_ENV_VAR,
+    PROFILE_ENV_VAR,
+    profiling,
+    profiling_enabled,
+    summarize_profile,
+)
+
+
+@pytest.mark.parametrize(
+    "enabled, env, expected",
+    [(None, "", False), (None, "true", True), (False, "1", False), (True, "", True)],
+)
+def test_profiling_enabled(enabled, env, expected, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, env)
+    assert profiling_enabled(enabled) is expected
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_profiling_saves_outermost_profile(mock_mql_client, monkeypatch, tmp_path):
+    monkeypatch.setenv(PROFILE_ENV_VAR, "1")
+    monkeypatch.setenv(PROFILE_DIR_ENV_VAR, str(tmp_path))
+    credentials = TransformCredentials(api_key=SecretStr("foo"), mql_server_url="foo")
+
+    credentials.get_client()
+    with profiling("outer"):
+        credentials.get_client()
+
+    get_client_path, outer_path = sorted(tmp_path.iterdir())
+    assert get_client_path.name.startswith("get_client-")
+    assert outer_path.name.startswith("outer-")
+    functions = summarize_profile(pstats.Stats(str(outer_path)), top=100)
+    assert any("get_client" in function for function, _, _, _ in functions)
+    cumulative_times = [cumulative_time for _, _, _, cumulative_time in functions]
+    assert cumulative_times == sorted(cumulative_times, reverse=True)
+
+
+def test_profiling_keeps_outcome_when_saving_fails(monkeypatch, tmp_path, caplog):
+    # a file where the profile directory should be
+    (tmp_path / "profiles").write_text("")
+    monkeypatch.setenv(PROFILE_DIR_ENV_VAR, str(tmp_path / "profiles"))
+
+    with pytest.raises(ValueError, match="boom"):
+        with profiling("failing", enabled=True):
+            raise ValueError("boom")
+    with profiling("succeeding", enabled=True):
+        pass
+
+    assert "Cannot save the profile of failing" in caplog.text
+    assert "Cannot save the profile of succeeding" in caplog.text
+
+
+def test_profiling_skips_when_another_profiler_is_active(caplog):
+    profiler = mock.Mock()
+    profiler.enable.side_effect = ValueError("Another profiling tool is active")
+
+    with mock.patch("cProfile.Profile", return_value=profiler):
+        with profiling("concurrent", enabled=True):
+            result = "done"
+
+    assert result == "done"
+    profiler.disable.assert_not_called()
+    assert "Cannot profile concurrent: Another profiling tool" in caplog.text
+
+    # the thread is not left marked as profiled
+    with mock.patch("prefect_transform.profiling._save_profile") as save_profile:
+        with profiling("next", enabled=True):
+            pass
+    save_profile.assert_called_once()
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import pytest
+from pydantic import SecretStr
+from urllib3.exceptions import MaxRetryError, ProtocolError
+
+from prefect_transform.catalog import clear_catalogs
+from prefect_transform.compilation import clear_compiled_sql, put_compiled_sql
+from prefect_transform.credentials import TransformCredentials
+from prefect_transform.instrumentation import (
+    publish_increment,
+    publish_timings,
+    register_metrics_sink,
+    unregister_metrics_sink,
+)
+from prefect_transform.transport import CountingRetry, close_pooled_sessions
+
+pytest.importorskip("prometheus_client")
+
+from prefect_transform.prometheus import PrometheusMetricsSink  # noqa: E402
+
+
+@pytest.fixture
+def sink():
+    clear_catalogs()
+    clear_compiled_sql()
+    sink = PrometheusMetricsSink()
+    register_metrics_sink(sink)
+    yield sink
+    unregister_metrics_sink(sink)
+    clear_compiled_sql()
+
+
+def test_prometheus_sink_collects_metrics(sink):
+    operation = {"operation": "create_materialization"}
+    publish_increment("in_flight", 1, operation)
+    publish_increment("submissions", 1, operation)
+    publish_timings(
+        "create_materialization",
+        {"submission": 0.2, "queued": 3.0},
+        {"outcome": "success"},
+    )
+    publish_timings(
+        "create_materialization",
+        {"submission": 0.1},
+        {"outcome": "failure", "exception": "TransformRuntimeException"},
+    )
+    retry = CountingRetry(total=1, allowed_methods=None)
+    retry = retry.increment("POST", "/api/graphql", error=ProtocolError())
+    # the exhausted attempt raises without being counted
+    with pytest.raises(MaxRetryError):
+        retry.increment("POST", "/api/graphql", error=ProtocolError())
+    put_compiled_sql("key", "SELECT 1")
+
+    def value(name, **labels):
+        return sink.registry.get_sample_value(f"prefect_transform_{name}", labels)
+
+    assert value("in_flight", **operation) == 1
+    assert value("submissions_total", **operation) == 1
+    assert value("successes_total", **operation) == 1
+    assert (
+        value("failures_total", exception="TransformRuntimeException", **operation) == 1
+    )
+    assert value("retries_total") == 1
+    assert value("phase_seconds_count", phase="submission", **operation) == 2
+    assert value("queue_wait_seconds_sum") == 3.0
+    assert value("client_cache_entries", cache="compiled_sql") == 1
+    assert value("client_cache_entries", cache="catalogs") == 0
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_prometheus_sink_exposes_text_format(mock_mql_client, sink, tmp_path):
+    close_pooled_sessions()
+    TransformCredentials(api_key=SecretStr("foo"), mql_server_url="foo").get_client()
+
+    path = tmp_path / "transform.prom"
+    sink.write_textfile(str(path))
+    close_pooled_sessions()
+
+    text = path.read_text()
+    assert 'prefect_transform_successes_total{operation="get_client"} 1.0' in text
+    assert "prefect_transform_pooled_sessions 1.0" in text
+    assert b"prefect_transform_pooled_sessions 0.0" in sink.generate()
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from prefect_transform.serialization import get_json_decoder, get_json_encoder
+
+PAYLOAD = {"data": {"mqlQuery": {"status": "SUCCESSFUL", "warnings": ["été"]}}}
+
+
+@pytest.mark.parametrize("library", ["auto", "orjson", "msgspec", "json"])
+def test_json_decoder_round_trip(library):
+    if library in ("orjson", "msgspec"):
+        pytest.importorskip(library)
+
+    encoded = get_json_encoder(library)(PAYLOAD)
+    decoder = get_json_decoder(library)
+
+    assert isinstance(encoded, bytes)
+    assert decoder(encoded) == PAYLOAD
+    assert decoder(json.dumps(PAYLOAD)) == PAYLOAD
+
+
+def test_json_decoder_raises_on_unknown_library():
+    with pytest.raises(ValueError, match="Invalid JSON library 'yaml'"):
+        get_json_decoder("yaml")
@@ -0,0 +1,117 @@
+from unittest import mock
+
+import pytest
+
+from prefect_transform.instrumentation import (
+    publish_cache_lookup,
+    publish_increment,
+    register_metrics_sink,
+    unregister_metrics_sink,
+)
+from prefect_transform.summary import FlowRunSummary, MaterializationRun
+
+
+def test_flow_run_summary_aggregates_current_flow_run():
+    summary = FlowRunSummary()
+    tags = {"materialization_name": "mt_a", "outcome": "success", "polls": "3"}
+
+    register_metrics_sink(summary)
+    try:
+        with mock.patch(
+            "prefect_transform.summary._current_flow_run_id", return_value="run_1"
+        ):
+            summary.record("create_materialization", {"running": 2.0}, tags)
+            summary.record("get_client", {"client": 1.0}, {"outcome": "success"})
+            publish_cache_lookup("catalog", True)
+            publish_cache_lookup("compiled_sql", False)
+            publish_increment("retries", 2)
+            publish_increment("submissions")
+        with mock.patch(
+            "prefect_transform.summary._current_flow_run_id", return_value=None
+        ):
+            summary.record("create_materialization", {"running": 2.0}, tags)
+    finally:
+        unregister_metrics_sink(summary)
+
+    statistics = summary.get("run_1")
+    assert len(statistics.runs) == 1
+    assert statistics.runs[0].polls == 3
+    assert statistics.retries == 2
+    assert statistics.cache_hits == 1
+    assert statistics.cache_misses == 1
+    assert summary.get() is None
+
+
+def test_flow_run_statistics_throughput():
+    summary = FlowRunSummary()
+    with mock.patch(
+        "prefect_transform.summary._current_flow_run_id", return_value="run_1"
+    ):
+        summary.record("create_materialization", {}, {"materialization_name": "x"})
+    statistics = summary.get("run_1")
+    statistics.runs = [
+        MaterializationRun("mt_a", "query_0", "success", 100.0, 4.0, 2),
+        MaterializationRun("mt_b", "query_1", "success", 101.0, 3.0, 4),
+        MaterializationRun("mt_c", None, "failure", 102.0, 1.0, 0),
+    ]
+
+    assert statistics.failures == 1
+    assert statistics.serial_time == 8.0
+    assert statistics.wall_time == 4.0
+    assert statistics.parallelism == 2.0
+    assert statistics.polls_per_query == 3.0
+    assert [run.materialization_name for run in statistics.slowest(2)] == [
+        "mt_a",
+        "mt_b",
+    ]
+    markdown = statistics.to_markdown(top=1)
+    assert "| Parallelism | 2.00 |" in markdown
+    assert "| mt_a | query_0 | success | 4.000 | 2 |" in markdown
+    assert "mt_b" not in markdown
+
+
+@mock.patch("prefect_transform.summary.create_markdown_artifact")
+def test_flow_run_summary_publish(mock_create_artifact):
+    summary = FlowRunSummary(artifact_key="nightly-summary")
+    assert summary.publish("run_1") is None
+
+    with mock.patch(
+        "prefect_transform.summary._current_flow_run_id", return_value="run_1"
+    ):
+        summary.record(
+            "create_materialization",
+            {"running": 1.0},
+            {"materialization_name": "mt_a", "outcome": "success"},
+        )
+    statistics = summary.publish("run_1")
+
+    assert len(statistics.runs) == 1
+    assert summary.get("run_1") is None
+    kwargs = mock_create_artifact.call_args.kwargs
+    assert kwargs["key"] == "nightly-summary"
+    assert "| Wall time (s) | 1.000 |" in kwargs["markdown"]
+    assert pytest.approx(statistics.wall_time) == 1.0
+
+
+def test_flow_run_summary_evicts_stale_flow_runs():
+    summary = FlowRunSummary(max_flow_runs=2, ttl=60)
+    tags = {"materialization_name": "mt_a", "outcome": "success"}
+
+    def record(flow_run_id, now):
+        with mock.patch(
+            "prefect_transform.summary._current_flow_run_id", return_value=flow_run_id
+        ), mock.patch("prefect_transform.summary.time.monotonic", return_value=now):
+            summary.record("create_materialization", {"running": 1.0}, tags)
+
+    record("run_1", 0)
+    record("run_2", 10)
+    record("run_1", 20)
+    record("run_3", 30)
+    # least recently updated beyond max_flow_runs
+    assert summary.get("run_2") is None
+    assert len(summary.get("run_1").runs) == 2
+
+    record("run_3", 85)
+    # not updated for more than ttl seconds
+    assert summary.get("run_1") is None
+    assert summary.get("run_3") is not None
@@ -1,15 +1,44 @@
-from typing import List, Optional
+import base64
+import pickle
+from types import SimpleNamespace
 from unittest import mock
 
+import fsspec
+import pandas as pd
 import pytest
+from gql.transport.exceptions import TransportQueryError
+from gql.transport.requests import RequestsHTTPTransport
 from prefect import flow
 from pydantic import SecretStr
-from transform.exceptions import QueryRuntimeException
-from transform.models import MqlMaterializeResp, MqlQueryStatus, MqlQueryStatusResp
+from transform.models import MqlQueryStatus
 
+from prefect_transform.cache import QueryResultCache
+from prefect_transform.catalog import clear_catalogs
+from prefect_transform.compilation import clear_compiled_sql
 from prefect_transform.credentials import TransformCredentials
-from prefect_transform.exceptions import TransformRuntimeException
-from prefect_transform.tasks import create_materialization
+from prefect_transform.detectors import SlowMaterializationDetector
+from prefect_transform.exceptions import (
+    TransformConfigurationException,
+    TransformRuntimeException,
+)
+from prefect_transform.executors import SQLiteExecutor
+from prefect_transform.histograms import LatencyHistogramStore
+from prefect_transform.instrumentation import (
+    InMemoryMetricsSink,
+    register_metrics_sink,
+    unregister_metrics_sink,
+)
+from prefect_transform.profiling import PROFILE_DIR_ENV_VAR
+from prefect_transform.queries import STATUS_ONLY_FIELDS, build_statuses_query
+from prefect_transform.results import MaterializationResult
+from prefect_transform.summary import FlowRunSummary
+from prefect_transform.tasks import (
+    create_materialization,
+    create_materializations,
+    export_metrics,
+    query_metrics,
+    query_metrics_batch,
+)
 
 
 class MockTransformCredentials:
@@ -17,6 +46,122 @@ class MockTransformCredentials:
         pass
 
 
+CATALOG_DATA = {
+    "metrics": [{"name": "revenue", "dimensionObjects": [{"name": "country"}]}],
+    "materializations": [
+        {
+            "name": name,
+            "metrics": ["revenue"],
+            "dimensions": ["country"],
+            "destinationTable": None,
+        }
+        for name in ["mt_name", "mt_1", "mt_2", "mt_3"]
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache():
+    clear_catalogs()
+    clear_compiled_sql()
+    yield
+    clear_catalogs()
+    clear_compiled_sql()
+
+
+class MockMQLInterface:
+    def __init__(self, statuses, error=None, polls_before_completion=0, pages=()):
+        self.statuses = statuses
+        self.error = error
+        self.polls_before_completion = polls_before_completion
+        self.pages = list(pages)
+        # errors of the rejected materializations, keyed by name
+        self.rejected = {}
+        self.partial_data = True
+        self.sql = "sql_query"
+        self.calls = []
+        self.gql_client = SimpleNamespace(
+            transport=RequestsHTTPTransport(url="https://mql.server/graphql")
+        )
+
+    def execute(self, query, variable_values=None):
+        self.calls.append(variable_values)
+        if "modelKey" in variable_values:
+            return CATALOG_DATA
+        if "cursor" in variable_values:
+            cursor = variable_values["cursor"]
+            page = self.pages[cursor].to_json(orient="table", index=False)
+            return {
+                "mqlQuery": {
+                    "resultTabular": {
+                        "data": base64.b64encode(page.encode()).decode(),
+                        "nextCursor": (
+                            cursor + 1 if cursor + 1 < len(self.pages) else None
+                        ),
+                    }
+                }
+            }
+        if "queryId0" in variable_values:
+            return {
+                f"q{index}": self._mql_query(variable_values[f"queryId{index}"])
+                for index in range(len(variable_values))
+            }
+        count = len([k for k in variable_values if k.startswith("force")])
+        data = {f"m{index}": {"id": f"query_{index}"} for index in range(count)}
+        errors = []
+        for index in range(count):
+            name = variable_values[f"materializationName{index}"]
+            if name in self.rejected:
+                data[f"m{index}"] = None
+                errors.append({"message": self.rejected[name], "path": [f"m{index}"]})
+        if errors and not self.partial_data:
+            # the error of a non-null mutation field nulls the whole response
+            raise TransportQueryError(errors[0]["message"], errors=errors)
+        if errors:
+            raise TransportQueryError(errors[0]["message"], errors=errors, data=data)
+        return data
+
+    def _mql_query(self, query_id):
+        index = int(query_id.split("_")[-1])
+        status = self.statuses[index]
+        if self.polls_before_completion > 0:
+            self.polls_before_completion -= 1
+            status = MqlQueryStatus.RUNNING
+        return {
+            "status": status.value,
+            "error": self.error or f"error {index}",
+            "sql": self.sql,
+            "warnings": [],
+            "resultTableSchema": "schema",
+            "resultTableName": "table",
+        }
+
+
+class MockMQLClient:
+    def __init__(self, statuses, error=None, polls_before_completion=0, pages=()):
+        self.context = SimpleNamespace(
+            mql_client=MockMQLInterface(
+                statuses,
+                error=error,
+                polls_before_completion=polls_before_completion,
+                pages=pages,
+            )
+        )
+        self.queries = []
+
+    def create_query(self, **kwargs):
+        self.queries.append(kwargs)
+        return SimpleNamespace(query_id="query_0")
+
+    def get_current_model_key(self):
+        return SimpleNamespace(commit="abc")
+
+    def get_model_key(self, model_key_id):
+        return mock.Mock(
+            organization_id=1, repository="repo", branch="main", commit=model_key_id
+        )
+
+
 @mock.patch("prefect_transform.credentials.TransformCredentials")
 @mock.patch("prefect_transform.credentials.MQLClient")
 def test_run_raises_on_create_materialization_async(
@@ -24,30 +169,9 @@ def test_run_raises_on_create_materialization_async(
 ):
     error_msg = "Error while creating async materialization!"
 
-    class MockMQLClient:
-        def create_materialization(
-            materialization_name: str,
-            start_time: Optional[str] = None,
-            end_time: Optional[str] = None,
-            model_key_id: Optional[int] = None,
-            output_table: Optional[str] = None,
-            force: bool = False,
-            warnings: List[str] = None,
-        ):
-            return MqlQueryStatusResp(
-                query_id="xyz",
-                status=MqlQueryStatus.FAILED,
-                sql="sql_query",
-                error=error_msg,
-                chart_value_max=None,
-                chart_value_min=None,
-                result=None,
-                result_primary_time_granularity=None,
-                result_source=None,
-                warnings=[],
-            )
-
-    mock_mql_client.return_value = MockMQLClient
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.FAILED], error=error_msg
+    )
 
     mock_transform_credentials.return_value = MockTransformCredentials
     mock_transform_credentials.get_client.return_value = mock_mql_client
@@ -76,19 +200,9 @@ def test_run_raises_on_create_materialization_sync(
 ):
     error_msg = "Error while creating sync materialization!"
 
-    class MockMQLClient:
-        def materialize(
-            materialization_name: str,
-            start_time: Optional[str] = None,
-            end_time: Optional[str] = None,
-            model_key_id: Optional[int] = None,
-            output_table: Optional[str] = None,
-            force: bool = False,
-            timeout: Optional[int] = None,
-        ):
-            raise QueryRuntimeException(query_id="xyz", msg=error_msg)
-
-    mock_mql_client.return_value = MockMQLClient
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.FAILED], error=error_msg
+    )
 
     mock_transform_credentials.return_value = MockTransformCredentials
     mock_transform_credentials.get_client.return_value = mock_mql_client
@@ -112,30 +226,7 @@ def test_run_raises_on_create_materialization_sync(
 def test_run_on_create_materialization_async_successful_status(
     mock_mql_client, mock_transform_credentials
 ):
-    class MockMQLClient:
-        def create_materialization(
-            materialization_name: str,
-            start_time: Optional[str] = None,
-            end_time: Optional[str] = None,
-            model_key_id: Optional[int] = None,
-            output_table: Optional[str] = None,
-            force: bool = False,
-            warnings: List[str] = None,
-        ):
-            return MqlQueryStatusResp(
-                query_id="xyz",
-                status=MqlQueryStatus.SUCCESSFUL,
-                sql="sql_query",
-                error=None,
-                chart_value_max=None,
-                chart_value_min=None,
-                result=None,
-                result_primary_time_granularity=None,
-                result_source=None,
-                warnings=[],
-            )
-
-    mock_mql_client.return_value = MockMQLClient
+    mock_mql_client.return_value = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
 
     mock_transform_credentials.return_value = MockTransformCredentials
     mock_transform_credentials.get_client.return_value = mock_mql_client
@@ -155,6 +246,7 @@ def test_run_on_create_materialization_async_successful_status(
     assert response.is_complete is True
     assert response.is_successful is True
     assert response.is_failed is False
+    assert response.sql == "sql_query"
 
 
 @mock.patch("prefect_transform.credentials.TransformCredentials")
@@ -162,30 +254,7 @@ def test_run_on_create_materialization_async_successful_status(
 def test_run_on_create_materialization_async_pending_status(
     mock_mql_client, mock_transform_credentials
 ):
-    class MockMQLClient:
-        def create_materialization(
-            materialization_name: str,
-            start_time: Optional[str] = None,
-            end_time: Optional[str] = None,
-            model_key_id: Optional[int] = None,
-            output_table: Optional[str] = None,
-            force: bool = False,
-            warnings: List[str] = None,
-        ):
-            return MqlQueryStatusResp(
-                query_id="xyz",
-                status=MqlQueryStatus.PENDING,
-                sql="sql_query",
-                error=None,
-                chart_value_max=None,
-                chart_value_min=None,
-                result=None,
-                result_primary_time_granularity=None,
-                result_source=None,
-                warnings=[],
-            )
-
-    mock_mql_client.return_value = MockMQLClient
+    mock_mql_client.return_value = MockMQLClient([MqlQueryStatus.PENDING])
 
     mock_transform_credentials.return_value = MockTransformCredentials
     mock_transform_credentials.get_client.return_value = mock_mql_client
@@ -212,30 +281,7 @@ def test_run_on_create_materialization_async_pending_status(
 def test_run_on_create_materialization_async_running_status(
     mock_mql_client, mock_transform_credentials
 ):
-    class MockMQLClient:
-        def create_materialization(
-            materialization_name: str,
-            start_time: Optional[str] = None,
-            end_time: Optional[str] = None,
-            model_key_id: Optional[int] = None,
-            output_table: Optional[str] = None,
-            force: bool = False,
-            warnings: List[str] = None,
-        ):
-            return MqlQueryStatusResp(
-                query_id="xyz",
-                status=MqlQueryStatus.RUNNING,
-                sql="sql_query",
-                error=None,
-                chart_value_max=None,
-                chart_value_min=None,
-                result=None,
-                result_primary_time_granularity=None,
-                result_source=None,
-                warnings=[],
-            )
-
-    mock_mql_client.return_value = MockMQLClient
+    mock_mql_client.return_value = MockMQLClient([MqlQueryStatus.RUNNING])
 
     mock_transform_credentials.return_value = MockTransformCredentials
     mock_transform_credentials.get_client.return_value = mock_mql_client
@@ -262,19 +308,8 @@ def test_run_on_create_materialization_async_running_status(
 def test_run_on_create_materialization_sync(
     mock_mql_client, mock_transform_credentials
 ):
-    class MockMQLClient:
-        def materialize(
-            materialization_name: str,
-            start_time: Optional[str] = None,
-            end_time: Optional[str] = None,
-            model_key_id: Optional[int] = None,
-            output_table: Optional[str] = None,
-            force: bool = False,
-            timeout: Optional[int] = None,
-        ):
-            return MqlMaterializeResp(schema="schema", table="table", query_id="xyz")
-
-    mock_mql_client.return_value = MockMQLClient
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL], polls_before_completion=2)
+    mock_mql_client.return_value = mql_client
 
     mock_transform_credentials.return_value = MockTransformCredentials
     mock_transform_credentials.get_client.return_value = mock_mql_client
@@ -291,3 +326,850 @@ def test_run_on_create_materialization_sync(
     response = test_flow()
 
     assert response.fully_qualified_name == "schema.table"
+    assert response.query_id == "query_0"
+    # submission, 3 status-only polls, one full status, one table lookup
+    assert len(mql_client.context.mql_client.calls) == 6
+
+
+def test_status_only_query_requests_status_and_error():
+    document, variable_values = build_statuses_query(["xyz"], fields=STATUS_ONLY_FIELDS)
+
+    assert variable_values == {"queryId0": "xyz"}
+    assert "sql" not in document
+    assert "result" not in document
+    assert "status" in document and "error" in document
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_create_materializations_batches_submissions(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.PENDING] * 3)
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_13")
+    def test_flow():
+        return create_materializations(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materializations=[
+                {"materialization_name": "mt_1", "model_key_id": 42},
+                {"materialization_name": "mt_2", "output_table": "schema.table"},
+                {"materialization_name": "mt_3", "force": True},
+            ],
+            batch_size=2,
+            validate=True,
+        )
+
+    responses = test_flow()
+
+    assert [r.query_id for r in responses] == ["query_0", "query_1", "query_0"]
+    assert all(r.status == MqlQueryStatus.PENDING for r in responses)
+
+    calls = mql_client.context.mql_client.calls
+    # one catalog load per distinct model, before any submission
+    assert [c["modelKey"] for c in calls[:2]] == [
+        {"organization": 1, "repo": "repo", "branch": "main", "commit": 42},
+        None,
+    ]
+    calls = calls[2:]
+    assert len(calls) == 4
+    assert calls[0]["materializationName0"] == "mt_1"
+    assert calls[0]["modelKey0"]["commit"] == 42
+    assert calls[0]["outputTable1"] == "schema.table"
+    assert calls[1] == {"queryId0": "query_0", "queryId1": "query_1"}
+    assert calls[2]["force0"] is True
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_raises_on_create_materializations_failure(mock_mql_client):
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.PENDING, MqlQueryStatus.FAILED]
+    )
+
+    @flow(name="test_flow_14")
+    def test_flow():
+        return create_materializations(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materializations=[
+                {"materialization_name": "mt_1"},
+                {"materialization_name": "mt_2"},
+            ],
+        )
+
+    msg_match = (
+        "Transform materializations batch creation failed! Errors are: mt_2: error 1"
+    )
+    with pytest.raises(TransformRuntimeException, match=msg_match):
+        test_flow()
+
+
+@pytest.mark.parametrize(
+    "partial_data, expected",
+    [
+        (True, "Errors are: mt_1: bad 1; mt_3: bad 3$"),
+        (
+            False,
+            "Errors are: mt_1: bad 1; "
+            "mt_2: batch rejected, may have been created: bad 1; mt_3: bad 3$",
+        ),
+    ],
+)
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_reports_every_rejected_materialization(
+    mock_mql_client, partial_data, expected
+):
+    mql_client = MockMQLClient([MqlQueryStatus.PENDING] * 3)
+    mql_client.context.mql_client.rejected = {"mt_1": "bad 1", "mt_3": "bad 3"}
+    mql_client.context.mql_client.partial_data = partial_data
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_14_rejected")
+    def test_flow():
+        return create_materializations(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materializations=[
+                {"materialization_name": "mt_1"},
+                {"materialization_name": "mt_2"},
+                {"materialization_name": "mt_3"},
+            ],
+            batch_size=2,
+        )
+
+    with pytest.raises(TransformRuntimeException, match=expected):
+        test_flow()
+
+    calls = mql_client.context.mql_client.calls
+    # rejected batches are never submitted again
+    submissions = [call for call in calls if "materializationName0" in call]
+    assert len(submissions) == 2
+    # the valid materialization of the first batch is still polled
+    assert ({"queryId0": "query_1"} in calls) == partial_data
+
+
+def test_create_materializations_raises_on_invalid_batch_size():
+    with pytest.raises(ValueError, match="batch_size must be at least 1, got 0"):
+        create_materializations.fn(
+            credentials=MockTransformCredentials(),
+            materializations=[{"materialization_name": "mt_1"}],
+            batch_size=0,
+        )
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_create_materialization_compact_result(mock_mql_client):
+    mock_mql_client.return_value = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    credentials = TransformCredentials(api_key=SecretStr("foo"), mql_server_url="foo")
+
+    @flow(name="test_flow_15")
+    def test_flow():
+        return create_materialization(
+            credentials=credentials,
+            materialization_name="mt_name",
+            return_mode="compact",
+        )
+
+    result = test_flow()
+
+    assert isinstance(result, MaterializationResult)
+    assert result.query_id == "query_0"
+    assert result.is_successful is True
+    assert result.fully_qualified_name == "schema.table"
+    assert result.duration >= 0
+    assert not hasattr(result, "__dict__")
+    assert pickle.loads(pickle.dumps(result)) == result
+    assert result.fetch_sql(credentials) == "sql_query"
+
+
+def test_create_materialization_raises_on_invalid_return_mode():
+    @flow(name="test_flow_16")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            return_mode="tiny",
+        )
+
+    with pytest.raises(ValueError, match="Invalid return_mode 'tiny'"):
+        test_flow()
+
+
+RESULT_PAGES = [
+    pd.DataFrame({"country": ["US", "IT", "FR"], "revenue": [1.0, 2.0, 3.0]}),
+    pd.DataFrame({"country": ["DE", "ES"], "revenue": [4.0, 5.0]}),
+]
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_query_metrics(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES)
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_17")
+    def test_flow():
+        return query_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenue"],
+            dimensions=["country"],
+            where="country != 'UK'",
+            limit=10,
+        )
+
+    df = test_flow()
+
+    assert df["country"].tolist() == ["US", "IT", "FR", "DE", "ES"]
+    assert df["revenue"].sum() == 15.0
+    assert mql_client.queries[0]["metrics"] == ["revenue"]
+    assert mql_client.queries[0]["where"] == "country != 'UK'"
+    assert mql_client.queries[0]["limit"] == "10"
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_query_metrics_in_chunks(mock_mql_client):
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES
+    )
+
+    mql_interface = mock_mql_client.return_value.context.mql_client
+
+    @flow(name="test_flow_18")
+    def test_flow():
+        chunks = query_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenue"],
+            dimensions=["country"],
+            chunk_size=2,
+        )
+        fetched_pages = [c for c in mql_interface.calls if "cursor" in c]
+        assert fetched_pages == []
+
+        countries = [chunk["country"].tolist() for chunk in chunks]
+        with pytest.raises(RuntimeError, match="already been consumed"):
+            iter(chunks)
+        return countries
+
+    assert test_flow() == [["US", "IT"], ["FR", "DE"], ["ES"]]
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_raises_on_query_metrics_failure(mock_mql_client):
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.FAILED], error="Unknown metric revenu"
+    )
+
+    @flow(name="test_flow_19")
+    def test_flow():
+        return query_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenu"],
+        )
+
+    msg_match = "Transform metrics query failed! Error is: Unknown metric revenu"
+    with pytest.raises(TransformRuntimeException, match=msg_match):
+        test_flow()
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_query_metrics_as_arrow(mock_mql_client):
+    pa = pytest.importorskip("pyarrow")
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES
+    )
+
+    @flow(name="test_flow_20")
+    def test_flow():
+        credentials = TransformCredentials(
+            api_key=SecretStr("foo"), mql_server_url="foo"
+        )
+        table = query_metrics(
+            credentials=credentials, metrics=["revenue"], output_format="arrow"
+        )
+        chunks = query_metrics(
+            credentials=credentials,
+            metrics=["revenue"],
+            output_format="arrow",
+            chunk_size=4,
+        )
+        return table, [batch.num_rows for batch in chunks.to_reader()]
+
+    table, batch_sizes = test_flow()
+
+    assert isinstance(table, pa.Table)
+    assert table.column("country").to_pylist() == ["US", "IT", "FR", "DE", "ES"]
+    assert batch_sizes == [4, 1]
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_query_metrics_with_cache(mock_mql_client, tmp_path):
+    pytest.importorskip("pyarrow")
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES)
+    mock_mql_client.return_value = mql_client
+    cache = QueryResultCache(directory=tmp_path)
+
+    @flow(name="test_flow_21")
+    def test_flow():
+        credentials = TransformCredentials(
+            api_key=SecretStr("foo"), mql_server_url="foo"
+        )
+        return [
+            query_metrics(credentials=credentials, metrics=["revenue"], cache=cache)
+            for _ in range(2)
+        ]
+
+    first, second = test_flow()
+
+    assert len(mql_client.queries) == 1
+    assert first["country"].tolist() == ["US", "IT", "FR", "DE", "ES"]
+    pd.testing.assert_frame_equal(first, second)
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_query_metrics_with_spill(mock_mql_client, tmp_path):
+    pytest.importorskip("pyarrow")
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES
+    )
+
+    @flow(name="test_flow_22")
+    def test_flow():
+        return query_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenue"],
+            output_format="arrow",
+            spill_threshold=1,
+            spill_directory=str(tmp_path),
+        )
+
+    table = test_flow()
+
+    assert table.column("country").to_pylist() == ["US", "IT", "FR", "DE", "ES"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_query_metrics_spill_requires_arrow():
+    with pytest.raises(ValueError, match="spill_threshold requires"):
+        query_metrics.fn(
+            credentials=MockTransformCredentials(),
+            metrics=["revenue"],
+            spill_threshold=1,
+        )
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_export_metrics_to_parquet(mock_mql_client, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES
+    )
+    path = tmp_path / "revenue.parquet"
+
+    @flow(name="test_flow_23")
+    def test_flow():
+        return export_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenue"],
+            path=str(path),
+            row_group_size=2,
+        )
+
+    result = test_flow()
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.read().column("country").to_pylist() == [
+        "US",
+        "IT",
+        "FR",
+        "DE",
+        "ES",
+    ]
+    assert result.rows == 5
+    assert result.bytes_written == path.stat().st_size
+    assert result.rows_per_second > 0
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_export_metrics_writes_empty_results(mock_mql_client, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pages = [pd.DataFrame({"country": pd.Series([], dtype=str), "revenue": []})]
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], pages=pages
+    )
+    path = tmp_path / "revenue.parquet"
+
+    @flow(name="test_flow_23_empty")
+    def test_flow():
+        return export_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenue"],
+            path=str(path),
+        )
+
+    result = test_flow()
+
+    table = pq.read_table(path)
+    assert result.rows == table.num_rows == 0
+    assert table.column_names == ["country", "revenue"]
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_export_metrics_to_csv_with_fsspec(mock_mql_client):
+    pytest.importorskip("pyarrow")
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], pages=RESULT_PAGES
+    )
+
+    @flow(name="test_flow_24")
+    def test_flow():
+        return export_metrics(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            metrics=["revenue"],
+            path="memory://exports/revenue.csv",
+            file_format="csv",
+        )
+
+    result = test_flow()
+
+    with fsspec.open("memory://exports/revenue.csv", "rb") as f:
+        content = f.read()
+    assert content.decode().splitlines()[:2] == ['"country","revenue"', '"US",1']
+    assert result.bytes_written == len(content)
+    assert result.file_format == "csv"
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_query_metrics_batch(mock_mql_client):
+    pages = [
+        pd.DataFrame(
+            {"country": ["US", "IT"], "revenue": [1.0, 2.0], "orders": [10, 20]}
+        )
+    ]
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL], pages=pages)
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_25")
+    def test_flow():
+        return query_metrics_batch(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            queries=[
+                {"metrics": ["revenue"], "dimensions": ["country"]},
+                {"metrics": ["orders"], "dimensions": ["country"]},
+                {"metrics": ["revenue"], "dimensions": ["country"], "limit": 1},
+            ],
+            coalesce=True,
+        )
+
+    revenue, orders, top_revenue = test_flow()
+
+    assert [query["metrics"] for query in mql_client.queries] == [
+        ["revenue", "orders"],
+        ["revenue"],
+    ]
+    assert list(revenue.columns) == ["country", "revenue"]
+    assert list(orders.columns) == ["country", "orders"]
+    assert orders["orders"].tolist() == [10, 20]
+    assert mql_client.queries[1]["limit"] == "1"
+    assert len(top_revenue) == 2
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_raises_on_invalid_materialization(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_26")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_nme",
+            validate=True,
+        )
+
+    msg_match = "unknown materialization 'mt_nme', did you mean 'mt_name'"
+    with pytest.raises(TransformConfigurationException, match=msg_match):
+        test_flow()
+    assert len(mql_client.context.mql_client.calls) == 1
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_raises_on_invalid_materializations_before_submission(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL] * 3)
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_27")
+    def test_flow():
+        return create_materializations(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materializations=[
+                {"materialization_name": "mt_1", "output_table": "table"},
+                {"materialization_name": "mt_2"},
+                {"materialization_name": "unknown"},
+            ],
+            validate=True,
+        )
+
+    with pytest.raises(TransformConfigurationException) as exc_info:
+        test_flow()
+
+    assert "#0 'mt_1': invalid output_table 'table'" in str(exc_info.value)
+    assert "#2 'unknown': unknown materialization" in str(exc_info.value)
+    assert "mt_2" not in str(exc_info.value)
+    assert all("modelKey" in call for call in mql_client.context.mql_client.calls)
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_create_materialization_preview_sql(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_28")
+    def test_flow():
+        credentials = TransformCredentials(
+            api_key=SecretStr("foo"), mql_server_url="foo"
+        )
+        return [
+            create_materialization(
+                credentials=credentials,
+                materialization_name="mt_name",
+                start_time="2022-01-01",
+                output_table="schema.table",
+                preview_sql=True,
+            )
+            for _ in range(2)
+        ]
+
+    first, second = test_flow()
+
+    assert first.sql == "sql_query"
+    assert first.metrics == ["revenue"]
+    assert first.output_table == "schema.table"
+    assert not first.cached and second.cached
+    assert mql_client.queries == [
+        {
+            "metrics": ["revenue"],
+            "dimensions": ["country"],
+            "model_key_id": None,
+            "start_time": "2022-01-01",
+            "end_time": None,
+            "limit": "0",
+        }
+    ]
+    calls = mql_client.context.mql_client.calls
+    assert not any("materializationName0" in call for call in calls)
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_raises_on_create_materialization_preview_sql_failure(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    mql_client.create_query = mock.Mock(side_effect=Exception("Query refused"))
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_28_failure")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            preview_sql=True,
+        )
+
+    msg_match = "compilation failed! Error is: Query refused"
+    with pytest.raises(TransformRuntimeException, match=msg_match):
+        test_flow()
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_on_create_materialization_with_local_executor(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    mql_client.context.mql_client.sql = "SELECT 'US' AS country, 1.0 AS revenue LIMIT 0"
+    mock_mql_client.return_value = mql_client
+    executor = SQLiteExecutor()
+
+    @flow(name="test_flow_29")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            executor=executor,
+        )
+
+    response = test_flow()
+
+    assert response.fully_qualified_name == "main.mt_name"
+    rows = executor.connection.execute("SELECT * FROM main.mt_name").fetchall()
+    assert rows == [("US", 1.0)]
+    calls = mql_client.context.mql_client.calls
+    assert not any("materializationName0" in call for call in calls)
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_raises_on_local_executor_failure(mock_mql_client):
+    mql_client = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    mql_client.context.mql_client.sql = "SELECT * FROM missing_table LIMIT 0"
+    mock_mql_client.return_value = mql_client
+
+    @flow(name="test_flow_29_failure")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            executor=SQLiteExecutor(),
+        )
+
+    msg_match = "local execution failed! Error is: no such table: missing_table"
+    with pytest.raises(TransformRuntimeException, match=msg_match):
+        test_flow()
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_run_local_executor_with_sql_without_mql_server(mock_mql_client):
+    executor = SQLiteExecutor()
+
+    @flow(name="test_flow_29_sql")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            output_table="main.mt_copy",
+            executor=executor,
+            sql="SELECT 'US' AS country, 1.0 AS revenue",
+        )
+
+    response = test_flow()
+
+    assert response.fully_qualified_name == "main.mt_copy"
+    rows = executor.connection.execute("SELECT * FROM main.mt_copy").fetchall()
+    assert rows == [("US", 1.0)]
+    mock_mql_client.assert_not_called()
+
+
+def test_run_raises_on_local_output_table_without_schema():
+    @flow(name="test_flow_29_invalid_table")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            output_table="mt_copy",
+            executor=SQLiteExecutor(),
+            sql="SELECT 1 AS one",
+        )
+
+    msg_match = "invalid output_table 'mt_copy', expected the form"
+    with pytest.raises(TransformConfigurationException, match=msg_match):
+        test_flow()
+
+
+@pytest.mark.parametrize("executor, preview_sql", [(None, False), ("sqlite", True)])
+def test_create_materialization_raises_on_sql_without_executor(executor, preview_sql):
+    with pytest.raises(ValueError, match="sql is only run by an executor"):
+        create_materialization.fn(
+            credentials=MockTransformCredentials(),
+            materialization_name="mt_name",
+            executor=executor and SQLiteExecutor(),
+            preview_sql=preview_sql,
+            sql="SELECT 1 AS one",
+        )
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_create_materialization_reports_phase_timings(mock_mql_client):
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], polls_before_completion=1
+    )
+    sink = InMemoryMetricsSink()
+
+    @flow(name="test_flow_30")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            return_mode="compact",
+        )
+
+    register_metrics_sink(sink)
+    try:
+        result = test_flow()
+    finally:
+        unregister_metrics_sink(sink)
+
+    phases = ["client", "submission", "running", "polling", "fetch", "result"]
+    assert list(result.timings) == phases
+    assert all(seconds >= 0 for seconds in result.timings.values())
+    operations = [operation for operation, _, _ in sink.records]
+    assert operations == ["get_client", "create_materialization"]
+    _, timings, tags = sink.records[-1]
+    assert timings == result.timings
+    assert tags["outcome"] == "success"
+    assert tags["mode"] == "sync"
+    assert tags["query_id"] == "query_0"
+    statuses = [item.split(":")[0] for item in tags["status_history"].split(",")]
+    assert statuses == ["SUBMITTED", "RUNNING", "SUCCESSFUL"]
+
+
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_create_materialization_traces_transform_calls(mock_mql_client, span_exporter):
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], polls_before_completion=1
+    )
+    span_exporter.clear()
+
+    @flow(name="test_flow_31")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            model_key_id=42,
+        )
+
+    test_flow()
+
+    spans = {span.name: span for span in span_exporter.get_finished_spans()}
+    task_span = spans["create_materialization"]
+    assert task_span.attributes["materialization_name"] == "mt_name"
+    assert task_span.attributes["model_key_id"] == 42
+    assert task_span.attributes["query_id"] == "query_0"
+    assert "prefect.task_run.id" in task_span.attributes
+    for name in ["transform.get_client", "transform.submit", "transform.poll"]:
+        assert spans[name].parent.span_id == task_span.context.span_id
+    assert spans["transform.submit"].attributes["query_id"] == "query_0"
+    assert spans["transform.poll"].attributes["status"] == "SUCCESSFUL"
+    assert spans["transform.fetch"].attributes["status"] == "SUCCESSFUL"
+    assert spans["transform.fetch_table"].attributes["query_id"] == "query_0"
+
+
+@mock.patch("prefect_transform.profiling.create_markdown_artifact")
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_create_materialization_profile(
+    mock_mql_client, mock_create_artifact, monkeypatch, tmp_path
+):
+    mock_mql_client.return_value = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    monkeypatch.setenv(PROFILE_DIR_ENV_VAR, str(tmp_path))
+
+    @flow(name="test_flow_32")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+            profile=True,
+        )
+
+    test_flow()
+
+    (path,) = tmp_path.iterdir()
+    assert path.name.startswith("create_materialization-")
+    kwargs = mock_create_artifact.call_args.kwargs
+    assert kwargs["key"] == "profile-create-materialization"
+    assert "| Function | Calls | Own time (s) | Cumulative time (s) |" in (
+        kwargs["markdown"]
+    )
+
+
+@mock.patch("prefect_transform.detectors.create_markdown_artifact")
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_create_materialization_flags_slow_runs(
+    mock_mql_client, mock_create_artifact, tmp_path
+):
+    mock_mql_client.return_value = MockMQLClient([MqlQueryStatus.SUCCESSFUL])
+    store = LatencyHistogramStore(tmp_path / "histograms.json")
+    for _ in range(3):
+        store.add("mt_name", {"end_to_end": 0.0})
+    flagged = []
+    detector = SlowMaterializationDetector(
+        store, min_samples=3, callback=flagged.append
+    )
+
+    @flow(name="test_flow_33")
+    def test_flow():
+        return create_materialization(
+            credentials=TransformCredentials(
+                api_key=SecretStr("foo"), mql_server_url="foo"
+            ),
+            materialization_name="mt_name",
+        )
+
+    register_metrics_sink(detector)
+    try:
+        test_flow()
+    finally:
+        unregister_metrics_sink(detector)
+
+    (slow,) = flagged
+    assert slow.query_id == "query_0"
+    assert [status for status, _ in slow.status_history][0] == "SUBMITTED"
+    kwargs = mock_create_artifact.call_args.kwargs
+    assert kwargs["key"] == "slow-materialization-mt-name"
+    assert "Query `query_0`" in kwargs["markdown"]
+    assert store.get_histogram("mt_name").count == 4
+
+
+@mock.patch("prefect_transform.summary.create_markdown_artifact")
+@mock.patch("prefect_transform.credentials.MQLClient")
+def test_create_materialization_flow_summary(mock_mql_client, mock_create_artifact):
+    mock_mql_client.return_value = MockMQLClient(
+        [MqlQueryStatus.SUCCESSFUL], polls_before_completion=1
+    )
+    summary = FlowRunSummary()
+
+    @flow(name="test_flow_34")
+    def test_flow():
+        credentials = TransformCredentials(
+            api_key=SecretStr("foo"), mql_server_url="foo"
+        )
+        for name in ("mt_1", "mt_2"):
+            create_materialization(credentials=credentials, materialization_name=name)
+        return summary.publish()
+
+    register_metrics_sink(summary)
+    try:
+        statistics = test_flow()
+    finally:
+        unregister_metrics_sink(summary)
+
+    assert [run.materialization_name for run in statistics.runs] == ["mt_1", "mt_2"]
+    assert statistics.failures == 0
+    assert statistics.polls_per_query >= 1
+    assert statistics.serial_time <= statistics.wall_time + 1e-6
+    kwargs = mock_create_artifact.call_args.kwargs
+    assert kwargs["key"] == "transform-materializations-summary"
+    assert "| Materializations | 2 |" in kwargs["markdown"]
+    assert summary.get(statistics.flow_run_id) is None
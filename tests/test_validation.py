@@ -0,0 +1,30 @@
+from prefect_transform.catalog import Catalog
+from prefect_transform.validation import validate_materialization
+
+CATALOG = Catalog(
+    metrics={"revenue": ["country"]},
+    materializations={
+        "daily_revenue": {
+            "metrics": ["revenue"],
+            "dimensions": ["country"],
+            "destination_table": None,
+        }
+    },
+)
+
+
+def test_validate_materialization_accepts_valid_request():
+    assert validate_materialization(CATALOG, "daily_revenue", "analytics.rev") == []
+
+
+def test_validate_materialization_reports_every_problem():
+    errors = validate_materialization(CATALOG, "daily_revnue", "analytics rev")
+
+    assert errors == [
+        "unknown materialization 'daily_revnue', did you mean 'daily_revenue'?",
+        "invalid output_table 'analytics rev', "
+        "expected the form schema_name.table_name",
+    ]
+    assert validate_materialization(CATALOG, None) == [
+        "materialization_name is missing"
+    ]